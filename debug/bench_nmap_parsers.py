@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK DOS PARSERS DO NMAP
+- Gera uma varredura sintética (mesmos hosts nos formatos texto e XML)
+- Compara o parser de texto (NmapTextParser) com o de XML (NmapXmlParser):
+  tempo, hosts/s e pico de memória, com a saída inteira e em pedaços de
+  4 KB (como chega do pipe); "fluxo" descarta cada host após o parse e
+  mede só a memória do parser, que deve ficar constante
+- Confere se os dois produzem os mesmos dispositivos
+
+Uso:
+    python3 debug/bench_nmap_parsers.py                 # 254, 2.000 e 20.000 hosts
+    python3 debug/bench_nmap_parsers.py --hosts 50000 --runs 1
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+from xml.sax.saxutils import quoteattr
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "src", "network", "painelip"))
+from network import NmapTextParser
+from nmap_xml import NmapXmlParser
+
+CHUNK = 4096
+SERVICES = [(22, "ssh", "OpenSSH", "8.4p1"), (80, "http", "nginx", "1.18.0"),
+            (443, "https", "", ""), (554, "rtsp", "Hikvision rtspd", ""),
+            (3389, "ms-wbt-server", "", ""), (445, "microsoft-ds", "", ""),
+            (8080, "http-proxy", "", "")]
+VENDORS = ["Hikvision Digital Technology", "Raspberry Pi Trading", "Intel Corporate", "TP-Link"]
+OSES = ["Linux 4.15 - 5.6", "Microsoft Windows 10 1709 - 21H2", "Linux 3.2 - 4.9"]
+
+
+def synthetic_hosts(count, seed=1):
+    """Hosts aleatórios reproduzíveis: (ip, hostname, mac, vendor, portas, os)."""
+    rng = random.Random(seed)
+    hosts = []
+    for i in range(count):
+        ip = f"10.{i // 65025 % 256}.{i // 255 % 255}.{i % 255 + 1}"
+        hostname = rng.choice(["", f"host-{i}.lan", f"nas-{i}.lan"])
+        mac, vendor = "", ""
+        if rng.random() < 0.8:
+            mac = f"AA:BB:{i >> 16 & 255:02X}:{i >> 8 & 255:02X}:{i & 255:02X}:01"
+            vendor = rng.choice(VENDORS)
+        ports = [(svc, rng.choice(["open", "open", "filtered", "closed"]))
+                 for svc in rng.sample(SERVICES, 3)]
+        os_name = rng.choice(OSES) if rng.random() < 0.5 else ""
+        hosts.append((ip, hostname, mac, vendor, ports, os_name))
+    return hosts
+
+
+def to_text(hosts):
+    out = ["Starting Nmap 7.93 ( https://nmap.org ) at 2026-10-19 14:00 UTC"]
+    for ip, hostname, mac, vendor, ports, os_name in hosts:
+        out.append(f"Nmap scan report for {hostname} ({ip})" if hostname else f"Nmap scan report for {ip}")
+        out.append("Host is up (0.0021s latency).")
+        out.append("PORT     STATE    SERVICE VERSION")
+        for (port, name, product, version), state in ports:
+            out.append(f"{port}/tcp {state} {name} {product} {version}".rstrip())
+        if mac:
+            out.append(f"MAC Address: {mac} ({vendor})")
+        if os_name:
+            out.append(f"OS details: {os_name}")
+        out.append("")
+    out.append(f"Nmap done: {len(hosts)} IP addresses ({len(hosts)} hosts up) scanned in 1.00 seconds")
+    return "\n".join(out) + "\n"
+
+
+def to_xml(hosts):
+    out = ['<?xml version="1.0" encoding="UTF-8"?>',
+           '<nmaprun scanner="nmap" args="nmap -oX -" version="7.93">']
+    for ip, hostname, mac, vendor, ports, os_name in hosts:
+        out.append('<host><status state="up" reason="arp-response"/>')
+        out.append(f'<address addr="{ip}" addrtype="ipv4"/>')
+        if mac:
+            out.append(f'<address addr="{mac}" addrtype="mac" vendor={quoteattr(vendor)}/>')
+        out.append("<hostnames>")
+        if hostname:
+            out.append(f'<hostname name="{hostname}" type="PTR"/>')
+        out.append("</hostnames><ports>")
+        for (port, name, product, version), state in ports:
+            out.append(f'<port protocol="tcp" portid="{port}"><state state="{state}"/>'
+                       f'<service name="{name}" product={quoteattr(product)} version="{version}"/></port>')
+        out.append("</ports>")
+        if os_name:
+            out.append(f'<os><osmatch name={quoteattr(os_name)} accuracy="98"/></os>')
+        out.append("</host>")
+    out.append("</nmaprun>")
+    return "\n".join(out) + "\n"
+
+
+def run_parser(factory, text, chunked, keep=True):
+    parser = factory()
+    if chunked:
+        devices = []
+        for i in range(0, len(text), CHUNK):
+            completed = parser.feed(text[i:i + CHUNK])
+            if keep:
+                devices += completed
+    else:
+        devices = parser.feed(text)
+    return devices + parser.close()
+
+
+def measure(factory, text, chunked, runs, keep=True):
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        devices = run_parser(factory, text, chunked, keep)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    run_parser(factory, text, chunked, keep)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, devices
+
+
+def key(device):
+    return (device.ip, device.hostname, device.mac, device.vendor,
+            tuple(sorted(device.open_ports.items())), device.os)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os parsers de texto e XML do nmap")
+    parser.add_argument("--hosts", type=int, action="append", help="Hosts sintéticos (pode repetir)")
+    parser.add_argument("--runs", type=int, default=3, help="Execuções por medição (vale a menor)")
+    args = parser.parse_args()
+
+    for count in args.hosts or [254, 2000, 20000]:
+        hosts = synthetic_hosts(count)
+        text, xml = to_text(hosts), to_xml(hosts)
+        print(f"\n📦 {count} hosts: texto {len(text) / 1024:.0f} KB, XML {len(xml) / 1024:.0f} KB")
+        results = {}
+        for label, factory, data in (("texto", NmapTextParser, text), ("XML", NmapXmlParser, xml)):
+            for chunked, keep in ((False, True), (True, True), (True, False)):
+                elapsed, peak, devices = measure(factory, data, chunked, args.runs, keep)
+                if keep:
+                    results[label] = devices
+                mode = "fluxo (descarta)" if not keep else "pedaços de 4 KB" if chunked else "inteiro"
+                print(f"   {label:>5} {mode:<16} {elapsed * 1000:8.1f} ms  "
+                      f"{count / elapsed:9.0f} hosts/s  pico {peak / 1024:8.0f} KB")
+        same = sorted(map(key, results["texto"])) == sorted(map(key, results["XML"]))
+        print(f"   {'✅ mesmos dispositivos' if same else '❌ resultados diferentes'}"
+              f" ({len(results['texto'])} / {len(results['XML'])})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK DO VERIFICADOR DE PORTAS (prober.PortProber)
+- Abre listeners em vários endereços de loopback (127.0.1.x), cada um
+  com parte das portas abertas; as demais são recusadas (RST)
+- Mede portas/s com diferentes limites de concorrência e taxa por host
+- Confere se as portas abertas encontradas são exatamente as esperadas
+
+Uso:
+    python3 debug/bench_port_prober.py                    # 64 hosts x 64 portas
+    python3 debug/bench_port_prober.py --hosts 16 --ports 256 --concurrency 128 512
+    python3 debug/bench_port_prober.py --rate 200         # com limite por host
+"""
+
+import os
+import sys
+import time
+import random
+import socket
+import asyncio
+import argparse
+import resource
+import selectors
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "src", "network", "painelip"))
+from prober import OPEN, PortProber
+
+BASE_PORT = 20000
+
+
+class Listeners:
+    """Listeners de loopback; uma thread aceita e fecha as conexões."""
+
+    def __init__(self, hosts, ports, open_ratio, seed=1):
+        rng = random.Random(seed)
+        self.expected = {}
+        self.sockets = []
+        self.selector = selectors.DefaultSelector()
+        for i in range(hosts):
+            ip = f"127.0.1.{i + 1}"
+            chosen = sorted(rng.sample(ports, max(1, int(len(ports) * open_ratio))))
+            self.expected[ip] = set(chosen)
+            for port in chosen:
+                sock = socket.socket()
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind((ip, port))
+                sock.listen(1024)
+                sock.setblocking(False)
+                self.selector.register(sock, selectors.EVENT_READ)
+                self.sockets.append(sock)
+        self.running = True
+        self.thread = threading.Thread(target=self._accept, daemon=True)
+        self.thread.start()
+
+    def _accept(self):
+        while self.running:
+            for key, _ in self.selector.select(0.1):
+                try:
+                    while True:
+                        conn, _ = key.fileobj.accept()
+                        conn.close()
+                except (BlockingIOError, ConnectionAbortedError):
+                    pass
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        for sock in self.sockets:
+            sock.close()
+
+
+def run(listeners, ports, concurrency, rate, timeout):
+    prober = PortProber(concurrency=concurrency, per_host=concurrency, rate=rate, timeout=timeout)
+    results = asyncio.run(prober.scan(list(listeners.expected), ports))
+    found = {ip: {port for port, result in res.items() if result is OPEN}
+             for ip, res in results.items()}
+    return prober, found == listeners.expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a vazão do PortProber em loopback")
+    parser.add_argument("--hosts", type=int, default=64, help="Endereços de loopback")
+    parser.add_argument("--ports", type=int, default=64, help="Portas por endereço")
+    parser.add_argument("--open", type=float, default=0.1, help="Fração de portas abertas")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[64, 256, 1024])
+    parser.add_argument("--rate", type=float, default=0, help="Tentativas/s por host (0 = sem limite)")
+    parser.add_argument("--timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = max(args.concurrency) + int(args.hosts * args.ports * args.open) + 64
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+    ports = list(range(BASE_PORT, BASE_PORT + args.ports))
+    listeners = Listeners(args.hosts, ports, args.open)
+    total = args.hosts * args.ports
+    print(f"📦 {args.hosts} hosts x {args.ports} portas = {total} tentativas, "
+          f"{len(listeners.sockets)} abertas, taxa por host {args.rate or 'sem limite'}")
+    try:
+        for concurrency in args.concurrency:
+            t0 = time.perf_counter()
+            prober, correct = run(listeners, ports, concurrency, args.rate, args.timeout)
+            wall = time.perf_counter() - t0
+            print(f"   concorrência {concurrency:>5}: {wall * 1000:8.1f} ms  "
+                  f"{total / wall:9.0f} portas/s  {'✅' if correct else '❌ resultado diferente'}")
+            print(f"      {prober.summary()}")
+    finally:
+        listeners.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+ORÇAMENTO DE TEMPO DE IMPORT DOS PONTOS DE ENTRADA
+- Importa cada ponto de entrada num interpretador novo com -X importtime
+- Falha se o import passar do orçamento (ms), se carregar um módulo
+  proibido (ex.: numpy no broker de toque) ou se tiver efeitos colaterais:
+  abrir /dev ou /sys/class, criar processos, threads ou sockets
+- Mostra os imports mais pesados de cada um
+
+Uso:
+    python3 debug/check_import_time.py              # orçamentos do Raspberry Pi
+    python3 debug/check_import_time.py --scale 0.2  # máquina de desenvolvimento
+    python3 debug/check_import_time.py painelv3 --top 15
+
+Os efeitos colaterais são detectados por um audit hook (sys.addaudithook)
+instalado antes do import.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+HEAVY = ("numpy", "PIL")
+# Só para caminhos frios (decodificar GIF sem cache, CLI)
+DEFERRED = ("concurrent.futures", "multiprocessing", "PIL.ImageSequence", "argparse")
+
+# nome -> (diretório no sys.path, módulo, orçamento em ms no Pi, módulos proibidos)
+ENTRY_POINTS = {
+    "menu_manager": (ROOT_DIR, "menu_manager", 250, HEAVY + DEFERRED),
+    "touch_broker": (SRC_DIR, "core.touch_broker", 150, HEAVY + DEFERRED),
+    "supervisor": (SRC_DIR, "core.supervisor", 100, HEAVY + DEFERRED),
+    "zygote": (SRC_DIR, "core.zygote", 200, HEAVY + DEFERRED),
+    "painelip": (os.path.join(SRC_DIR, "network"), "painelip", 100, HEAVY + DEFERRED),
+    "menu": (SRC_DIR, "core.touch_menu_visual", 1500, DEFERRED),
+    "panel_host": (SRC_DIR, "core.panel_host", 1500, DEFERRED),
+    "painelv3": (os.path.join(SRC_DIR, "modules"), "painelv3", 1500, DEFERRED),
+    "painel_gif": (os.path.join(SRC_DIR, "modules"), "painel_gif", 1500, DEFERRED),
+    "network_panel": (os.path.join(SRC_DIR, "network", "painelip"), "panel", 1500, DEFERRED),
+}
+
+MARKER = "-- painel: import --"
+
+# Executado no interpretador filho: audit hook, marcador e o import medido
+# (@PATH@, @MARKER@ e @MODULE@ são substituídos em probe())
+PROBE = r"""
+import sys, time
+WATCHED = ("subprocess.Popen", "os.system", "os.fork", "os.forkpty", "os.exec",
+           "os.posix_spawn", "os.spawn", "_thread.start_new_thread",
+           "socket.connect", "socket.bind")
+def hook(event, args):
+    if event == "open":
+        path = str(args[0])
+        if path.startswith(("/dev/", "/sys/class/")):
+            sys.stderr.write(f"SIDE-EFFECT: open {path}\n")
+    elif event in WATCHED:
+        sys.stderr.write(f"SIDE-EFFECT: {event} {args[0]!r}\n")
+sys.path.insert(0, @PATH@)
+sys.stderr.write(@MARKER@ + "\n")
+sys.stderr.flush()
+sys.addaudithook(hook)
+t0 = time.perf_counter()
+import @MODULE@
+sys.stderr.write(f"WALL: {(time.perf_counter() - t0) * 1000:.1f}\n")
+# Sem evento de auditoria para threads antes do Python 3.13
+import threading
+for thread in threading.enumerate()[1:]:
+    sys.stderr.write(f"SIDE-EFFECT: thread {thread.name}\n")
+"""
+
+
+def probe(path, module):
+    """
+    Importa o módulo num interpretador novo.
+
+    Returns:
+        Tupla (ms de parede, {módulo: (self_us, cumulativo_us, nível)},
+        efeitos colaterais, erro ou None)
+    """
+    code = (PROBE.replace("@PATH@", repr(path)).replace("@MARKER@", repr(MARKER))
+            .replace("@MODULE@", module))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=ROOT_DIR)
+    imports, effects, wall = {}, [], None
+    started = False
+    for line in result.stderr.splitlines():
+        if line == MARKER:
+            started = True
+        elif not started:
+            continue
+        elif line.startswith("import time:"):
+            fields = line[len("import time:"):].split("|")
+            if len(fields) != 3 or not fields[0].strip().isdigit():
+                continue
+            name = fields[2].rstrip()
+            level = (len(name) - len(name.lstrip())) // 2
+            imports[name.strip()] = (int(fields[0]), int(fields[1]), level)
+        elif line.startswith("SIDE-EFFECT:"):
+            effects.append(line[len("SIDE-EFFECT:"):].strip())
+        elif line.startswith("WALL:"):
+            wall = float(line.split()[1])
+    error = None
+    if result.returncode != 0 or wall is None:
+        error = (result.stderr.strip().splitlines() or ["sem saída"])[-1]
+    return wall, imports, effects, error
+
+
+def check(name, runs, scale, top):
+    path, module, budget, forbidden = ENTRY_POINTS[name]
+    budget *= scale
+    best = None
+    for _ in range(runs):
+        wall, imports, effects, error = probe(path, module)
+        if error:
+            print(f"❌ {name}: import falhou: {error}")
+            return False
+        if best is None or wall < best[0]:
+            best = (wall, imports, effects)
+    wall, imports, effects = best
+
+    loaded = [m for m in forbidden if any(i == m or i.startswith(m + ".") for i in imports)]
+    ok = wall <= budget and not loaded and not effects
+    print(f"{'✅' if ok else '❌'} {name:<14} {wall:7.1f} ms (orçamento {budget:.0f} ms)")
+    for m in loaded:
+        print(f"     🚫 importa {m}")
+    for effect in effects:
+        print(f"     ⚠️  efeito colateral: {effect}")
+    if top:
+        # Imports diretos do ponto de entrada (nível 1) e os demais de nível 0
+        heaviest = sorted(((cum, mod) for mod, (_, cum, level) in imports.items()
+                           if level <= 1 and mod != module), reverse=True)[:top]
+        for cum, mod in heaviest:
+            print(f"     {cum / 1000:7.1f} ms  {mod}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica o orçamento de import dos pontos de entrada")
+    parser.add_argument("names", nargs="*",
+                        help=f"Pontos de entrada (padrão: todos): {', '.join(ENTRY_POINTS)}")
+    parser.add_argument("--runs", type=int, default=3, help="Execuções por ponto (vale a menor)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiplicador dos orçamentos (feitos para o Raspberry Pi)")
+    parser.add_argument("--top", type=int, default=5, help="Imports mais pesados exibidos")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"ponto de entrada desconhecido: {', '.join(unknown)}")
+    names = args.names or list(ENTRY_POINTS)
+    failed = [name for name in names if not check(name, args.runs, args.scale, args.top)]
+    if failed:
+        print(f"\n❌ Fora do orçamento: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"\n✅ {len(names)} pontos de entrada dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
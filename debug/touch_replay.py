@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+GRAVAÇÃO E REPRODUÇÃO DE TOQUES
+- Grava o fluxo evdev bruto do touchscreen num arquivo
+- Reproduz a gravação por uma FIFO que o menu/painéis abrem no lugar de
+  /dev/input/eventN (variável PAINEL_TOUCH_DEVICE)
+- Com um framebuffer virtual (PAINEL_FB) permite medir sessões inteiras
+  do menu fora do Raspberry Pi, sempre com a mesma entrada
+
+Uso:
+    sudo python3 debug/touch_replay.py record sessao.touch [--duration 30]
+    python3 debug/touch_replay.py info sessao.touch
+    python3 debug/touch_replay.py replay sessao.touch [--fast | --speed 2] [--loop 3]
+    sudo python3 debug/touch_replay.py replay sessao.touch --fb /tmp/fb.raw \\
+        --run python3 src/core/touch_menu_visual.py
+
+O arquivo guarda registros independentes da arquitetura (timestamp
+relativo em float64, tipo, código, valor); na reprodução os eventos são
+reescritos no formato nativo de struct input_event com o horário atual.
+"""
+
+import os
+import sys
+import time
+import struct
+import signal
+import argparse
+import subprocess
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from core.evdev import (EVENT_FORMAT, EVENT_SIZE, EV_SYN, SYN_REPORT,
+                        EV_ABS, ABS_PRESSURE, TOUCH_DEVICE_ENV, find_touch_device)
+
+MAGIC = b"PTOUCH1\n"
+RECORD = struct.Struct("<dHHi")  # t relativo (s), tipo, código, valor
+FIFO_PATH = "/tmp/painel-touch.fifo"
+SCREEN_WIDTH = 480
+SCREEN_HEIGHT = 320
+
+
+def record(path, device=None, duration=None):
+    """Grava eventos brutos do dispositivo até Ctrl+C ou duration segundos."""
+    device = device or find_touch_device()
+    fd = os.open(device, os.O_RDONLY)
+    count = 0
+    t0 = None
+    deadline = time.monotonic() + duration if duration else None
+    print(f"⏺️  Gravando {device} -> {path} (Ctrl+C para parar)")
+    try:
+        with open(path, "wb") as out:
+            out.write(MAGIC)
+            while deadline is None or time.monotonic() < deadline:
+                data = os.read(fd, EVENT_SIZE * 64)
+                if not data:
+                    break
+                usable = len(data) - len(data) % EVENT_SIZE
+                for sec, usec, type_, code, value in struct.iter_unpack(EVENT_FORMAT, data[:usable]):
+                    t = sec + usec / 1e6
+                    if t0 is None:
+                        t0 = t
+                    out.write(RECORD.pack(t - t0, type_, code, value))
+                    count += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(fd)
+    print(f"✅ {count} eventos gravados")
+
+
+def load(path):
+    """Lê uma gravação: lista de (t, tipo, código, valor)."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} não é uma gravação de toque")
+        data = f.read()
+    usable = len(data) - len(data) % RECORD.size
+    return list(RECORD.iter_unpack(data[:usable]))
+
+
+def frames(events):
+    """Agrupa os eventos em frames fechados por SYN_REPORT."""
+    out, current = [], []
+    for ev in events:
+        current.append(ev)
+        if ev[1] == EV_SYN and ev[2] == SYN_REPORT:
+            out.append(current)
+            current = []
+    if current:
+        out.append(current)
+    return out
+
+
+def info(path):
+    events = load(path)
+    reports = frames(events)
+    presses = 0
+    pressed = False
+    for frame in reports:
+        for _, type_, code, value in frame:
+            if type_ == EV_ABS and code == ABS_PRESSURE:
+                if value > 0 and not pressed:
+                    presses += 1
+                pressed = value > 0
+    duration = events[-1][0] if events else 0.0
+    print(f"📼 {path}: {len(events)} eventos, {len(reports)} frames, "
+          f"{presses} toques, {duration:.2f} s")
+
+
+def replay(events, fd, speed=1.0, fast=False):
+    """
+    Escreve os frames na FIFO respeitando o tempo original (ou não).
+
+    Returns:
+        Tupla (eventos escritos, frames escritos, segundos)
+    """
+    start = time.monotonic()
+    written = 0
+    reports = frames(events)
+    for frame in reports:
+        if not fast:
+            delay = frame[0][0] / speed - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        now = time.time()
+        sec, usec = int(now), int((now % 1) * 1e6)
+        payload = b"".join(struct.pack(EVENT_FORMAT, sec, usec, type_, code, value)
+                           for _, type_, code, value in frame)
+        os.write(fd, payload)
+        written += len(frame)
+    return written, len(reports), time.monotonic() - start
+
+
+def make_fifo(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    os.mkfifo(path, 0o666)
+
+
+def make_virtual_fb(path, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    """Framebuffer virtual: arquivo com uma tela RGB565 preta."""
+    with open(path, "wb") as f:
+        f.write(b"\x00\x00" * (width * height))
+
+
+def run_replay(args):
+    events = load(args.file)
+    make_fifo(args.fifo)
+
+    child = None
+    if args.run:
+        env = dict(os.environ)
+        env[TOUCH_DEVICE_ENV] = args.fifo
+        # Socket inexistente: o alvo lê a FIFO direto em vez de um broker em execução
+        env["PAINEL_TOUCH_SOCKET"] = args.fifo + ".nobroker"
+        if args.fb:
+            make_virtual_fb(args.fb)
+            env["PAINEL_FB"] = args.fb
+        print(f"🚀 Iniciando: {' '.join(args.run)}")
+        child = subprocess.Popen(args.run, env=env)
+    else:
+        print(f"👉 Rode o alvo com {TOUCH_DEVICE_ENV}={args.fifo}")
+
+    # Bloqueia até o alvo abrir a FIFO para leitura
+    print(f"⏳ Aguardando leitor em {args.fifo}...")
+    fd = os.open(args.fifo, os.O_WRONLY)
+    if args.warmup:
+        time.sleep(args.warmup)
+
+    try:
+        total_events = total_frames = 0
+        total_time = 0.0
+        for i in range(args.loop):
+            n_events, n_frames, elapsed = replay(events, fd, args.speed, args.fast)
+            total_events += n_events
+            total_frames += n_frames
+            total_time += elapsed
+            print(f"▶️  Volta {i + 1}/{args.loop}: {n_events} eventos em {elapsed:.3f} s")
+        rate = total_events / total_time if total_time else float("inf")
+        print(f"📊 {total_events} eventos, {total_frames} frames em {total_time:.3f} s "
+              f"({rate:.0f} eventos/s)")
+    finally:
+        os.close(fd)
+
+    if child is not None:
+        time.sleep(args.settle)
+        if child.poll() is None:
+            # Pede o histograma de latência (core.latency) e encerra o alvo
+            child.send_signal(signal.SIGUSR1)
+            time.sleep(0.2)
+            child.terminate()
+            try:
+                child.wait(5)
+            except subprocess.TimeoutExpired:
+                child.kill()
+        print("📄 Latências em /tmp/painel-latency-*.txt")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grava e reproduz toques do touchscreen")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Grava o fluxo evdev bruto")
+    rec.add_argument("file")
+    rec.add_argument("--device", help="Dispositivo evdev (padrão: detecção automática)")
+    rec.add_argument("--duration", type=float, help="Segundos de gravação")
+
+    inf = sub.add_parser("info", help="Resumo de uma gravação")
+    inf.add_argument("file")
+
+    rep = sub.add_parser("replay", help="Reproduz uma gravação por uma FIFO")
+    rep.add_argument("file")
+    rep.add_argument("--fifo", default=FIFO_PATH, help="Caminho da FIFO")
+    rep.add_argument("--fast", action="store_true", help="Sem esperas: o mais rápido possível")
+    rep.add_argument("--speed", type=float, default=1.0, help="Multiplicador de velocidade")
+    rep.add_argument("--loop", type=int, default=1, help="Repetições da gravação")
+    rep.add_argument("--warmup", type=float, default=0.0,
+                     help="Espera após o alvo abrir a FIFO (ex.: carregar o GIF do menu)")
+    rep.add_argument("--settle", type=float, default=1.0,
+                     help="Espera após o fim antes de encerrar o alvo")
+    rep.add_argument("--fb", help="Framebuffer virtual (arquivo) passado via PAINEL_FB")
+    rep.add_argument("--run", nargs=argparse.REMAINDER, help="Comando alvo (resto da linha)")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.file, args.device, args.duration)
+    elif args.command == "info":
+        info(args.file)
+    else:
+        run_replay(args)
+
+
+if __name__ == "__main__":
+    main()
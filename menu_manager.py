@@ -4,15 +4,18 @@
 import os
 import sys
 import time
-import struct
-import signal
 import subprocess
 import threading
 from threading import Lock
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from core.evdev import PressDetector, PRESS
+from core.touch_broker import open_touch_source
+from core.supervisor import SUPERVISOR
+from core.zygote import spawn
+
 # Configurações
-TOUCH_DEVICE = "/dev/input/event0"
-FRAMEBUFFER = "/dev/fb0"
+FRAMEBUFFER = os.environ.get("PAINEL_FB", "/dev/fb0")  # PAINEL_FB: framebuffer virtual (arquivo)
 SCREEN_WIDTH = 480
 SCREEN_HEIGHT = 320
 
@@ -29,46 +32,30 @@ def clear_screen():
     except:
         pass
 
-def kill_process_group(pid):
-    """Mata um grupo de processos."""
-    try:
-        os.killpg(os.getpgid(pid), signal.SIGTERM)
-        time.sleep(0.5)
-        os.killpg(os.getpgid(pid), signal.SIGKILL)
-    except:
-        pass
-
 def monitor_touch():
     """Monitora toque para voltar ao menu."""
     global should_return
     
     try:
-        # Aguarda 3 segundos antes de aceitar toque
-        time.sleep(3.0)
         print("👆 Toque na tela para voltar ao menu...")
         
-        last_touch_time = 0
+        reader = open_touch_source()
+        # Descarta o toque que iniciou o script (timestamp anterior a este instante)
+        presses = PressDetector(threshold=200)
         
-        with open(TOUCH_DEVICE, 'rb') as f:
+        def on_sample(sample):
+            global should_return
+            if should_return or presses.feed(sample) != PRESS:
+                return
+            print("🔴 Toque detectado - saindo...")
+            should_return = True
+        
+        reader.subscribe(on_sample)
+        try:
             while not should_return:
-                data = f.read(24)
-                if len(data) < 24:
-                    continue
-                    
-                sec, usec, type_, code, value = struct.unpack('llHHi', data)
-                
-                if type_ == 3 and code == 24 and value > 200:
-                    current_time = time.time()
-                    
-                    # Debounce: ignora toques muito rápidos (< 1 segundo)
-                    if current_time - last_touch_time < 1.0:
-                        print("⚡ Toque muito rápido - ignorado")
-                        continue
-                        
-                    last_touch_time = current_time
-                    print("🔴 Toque detectado - saindo...")
-                    should_return = True
-                    break
+                reader.poll(0.2)
+        finally:
+            reader.close()
                     
     except Exception as e:
         print(f"❌ Erro monitorando toque: {e}")
@@ -90,11 +77,13 @@ def run_script(script_path, script_name):
         print(f"📁 Diretório: {script_dir}")
         print(f"📄 Script: {script_file}")
         
-        # Executa script
-        cmd = ["python3", script_file]
-        print(f"⚡ Comando: {' '.join(cmd)}")
+        # Executa script: fork do zygote (core.zygote) ou python3 a frio, em sessão própria
+        print(f"⚡ Comando: python3 {script_file}")
         
-        current_process = subprocess.Popen(cmd, preexec_fn=os.setsid)
+        # PAINEL_ISOLATED (core.panel_host): o painel roda sozinho, sem abrir o menu
+        env = dict(os.environ, PAINEL_ISOLATED="1")
+        current_process = SUPERVISOR.adopt(spawn(os.path.abspath(script_file), env=env, cwd=script_dir),
+                                           script_name)
         print(f"✅ Processo iniciado (PID: {current_process.pid})")
         
         # Inicia monitor de toque
@@ -104,13 +93,13 @@ def run_script(script_path, script_name):
         touch_thread.start()
         
         # Aguarda até toque ou processo terminar
-        while current_process.poll() is None and not should_return:
+        while SUPERVISOR.poll(current_process) is None and not should_return:
             time.sleep(0.1)
         
-        # Para processo se ainda estiver rodando
-        if current_process and current_process.poll() is None:
+        # Para o grupo do processo (SIGTERM → SIGKILL) se ainda estiver rodando
+        if SUPERVISOR.poll(current_process) is None:
             print("🛑 Parando processo...")
-            kill_process_group(current_process.pid)
+        SUPERVISOR.stop(current_process)
         
         current_process = None
         
@@ -123,12 +112,8 @@ def run_script(script_path, script_name):
         clear_screen()
         time.sleep(1)
         
-        # Mata qualquer processo restante
-        if current_process:
-            try:
-                kill_process_group(current_process.pid)
-            except:
-                pass
+        # Encerra qualquer processo restante
+        SUPERVISOR.stop_all()
         
         print("🔄 Voltando ao menu principal...")
         
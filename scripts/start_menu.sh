@@ -20,10 +20,9 @@ if [ ! -f "assets/kakashicute.gif" ]; then
     exit 1
 fi
 
-# Mata processos anteriores se existirem
+# Encerra a instância anterior (serviços registrados pelo supervisor, por PID)
 echo "🧹 Limpando processos anteriores..."
-sudo pkill -f "python3.*painel" 2>/dev/null || true
-sudo pkill -f "touch_menu_visual" 2>/dev/null || true
+sudo python3 src/core/supervisor.py stop 2>/dev/null || true
 
 # Limpa framebuffer
 echo "🖥️  Limpando tela..."
@@ -39,7 +38,16 @@ if [ "$EUID" -ne 0 ]; then
     exit $?
 fi
 
+# Broker de toque: dono único do touchscreen, repassa os toques ao painel em primeiro plano
+echo "📡 Iniciando broker de toque..."
+python3 src/core/supervisor.py start touch_broker -- python3 src/core/touch_broker.py --grab
+
+# Zygote: NumPy, PIL e fontes já carregados; painéis isolados sobem por fork()
+echo "🧬 Iniciando zygote..."
+python3 src/core/supervisor.py start zygote -- python3 src/core/zygote.py
+
 # Inicia o menu principal
 echo "🚀 Iniciando menu touchscreen..."
 echo ""
+python3 src/core/supervisor.py register menu $$
 exec python3 src/core/touch_menu_visual.py
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Compilador de animações em frames delta.
+
+Cada GIF é decodificado uma única vez, composto no canvas do tamanho
+exato da tela e guardado como plano de índices uint8 + tabela (LUT) de
+256 cores RGB565 por frame. O primeiro frame é guardado inteiro
+(keyframe); os demais guardam apenas os retângulos que mudaram
+em relação ao frame anterior. Como a comparação é feita entre canvases
+já compostos pelo Pillow, os métodos de disposal do GIF (manter,
+restaurar fundo, restaurar anterior) são respeitados automaticamente.
+
+O último frame também tem um delta para o primeiro, então a animação
+pode ficar em loop sem reenviar a tela inteira.
+"""
+
+import os
+import numpy as np
+from PIL import Image
+
+# Linhas/colunas inalteradas entre dois trechos alterados que ainda são
+# unidas num único retângulo (evita dezenas de retângulos minúsculos)
+ROW_MERGE_GAP = 8
+COL_MERGE_GAP = 16
+
+# Colunas da tabela de retângulos: frame, x, y, largura, altura, offset no pool
+RECT_FIELDS = 6
+
+
+def rgb_to_rgb565(pil_img):
+    """Converte uma imagem PIL RGB em array [H,W] uint16 RGB565."""
+    arr = np.asarray(pil_img, dtype=np.uint8)
+    r = (arr[..., 0] >> 3).astype(np.uint16)
+    g = (arr[..., 1] >> 2).astype(np.uint16)
+    b = (arr[..., 2] >> 3).astype(np.uint16)
+    return (r << 11) | (g << 5) | b
+
+
+def _palette_lut(pal_img):
+    """LUT RGB565 [256] a partir da paleta de uma imagem modo P."""
+    palette = np.zeros(768, dtype=np.uint8)
+    raw = pal_img.getpalette()[:768]
+    palette[:len(raw)] = raw
+    return rgb_to_rgb565(palette.reshape(1, 256, 3))[0]
+
+
+def index_frame(pil_img, palette_img=None):
+    """
+    Converte uma imagem RGB em plano de índices + LUT RGB565.
+
+    Sem paleta dada, a conversão é exata se o frame tiver até 256 cores
+    distintas em RGB565 (caso comum em GIFs sem redimensionamento);
+    senão a imagem é quantizada para 256 cores. Com paleta dada, a
+    imagem é sempre mapeada nela.
+
+    Returns:
+        Tupla (índices [H,W] uint8, lut [256] uint16)
+    """
+    if palette_img is None:
+        colors = rgb_to_rgb565(pil_img)
+        uniq, inverse = np.unique(colors, return_inverse=True)
+        if uniq.size <= 256:
+            lut = np.zeros(256, dtype=np.uint16)
+            lut[:uniq.size] = uniq
+            return inverse.reshape(colors.shape).astype(np.uint8), lut
+        palette_img = pil_img.quantize(256, method=Image.Quantize.FASTOCTREE)
+
+    quant = pil_img.quantize(palette=palette_img, dither=Image.Dither.NONE)
+    return np.asarray(quant, dtype=np.uint8), _palette_lut(quant)
+
+
+def index_frames(images):
+    """
+    Converte uma sequência de imagens RGB em frames paletizados.
+
+    Quando algum frame precisa de quantização, todos usam uma paleta
+    comum calculada sobre a sequência inteira: assim as regiões paradas
+    recebem os mesmos índices em todos os frames e o delta fica pequeno.
+    """
+    if all(np.unique(rgb_to_rgb565(img)).size <= 256 for img in images):
+        return [IndexedFrame(*index_frame(img)) for img in images]
+
+    w, h = images[0].size
+    mosaic = Image.new("RGB", (w, h * len(images)))
+    for i, img in enumerate(images):
+        mosaic.paste(img, (0, i * h))
+    palette_img = mosaic.quantize(256, method=Image.Quantize.FASTOCTREE)
+    return [IndexedFrame(*index_frame(img, palette_img)) for img in images]
+
+
+def lut_to_palette(lut):
+    """Expande uma LUT RGB565 em paleta PIL (lista de 768 valores RGB)."""
+    r = ((lut >> 11) & 0x1F) << 3
+    g = ((lut >> 5) & 0x3F) << 2
+    b = (lut & 0x1F) << 3
+    return np.stack([r, g, b], axis=-1).astype(np.uint8).ravel().tolist()
+
+
+class IndexedFrame:
+    """Frame paletizado: índices uint8 + LUT de 256 cores RGB565."""
+
+    def __init__(self, indices, lut):
+        self.indices = indices
+        self.lut = lut
+
+    @classmethod
+    def from_image(cls, pil_img):
+        return cls(*index_frame(pil_img.convert("RGB")))
+
+    @property
+    def width(self):
+        return self.indices.shape[1]
+
+    @property
+    def height(self):
+        return self.indices.shape[0]
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + self.lut.nbytes
+
+    def expand(self):
+        """Frame RGB565 [H,W] via gather vetorizado na LUT."""
+        return self.lut[self.indices]
+
+    def to_image(self):
+        """Imagem PIL modo P (sem cópia para RGB) para compor com Pillow."""
+        img = Image.fromarray(self.indices, mode="P")
+        img.putpalette(lut_to_palette(self.lut))
+        return img
+
+
+def _runs(mask, gap):
+    """Retorna intervalos [início, fim) de valores True, unindo buracos < gap."""
+    idx = np.flatnonzero(mask)
+    if idx.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(idx) > gap)
+    starts = np.concatenate(([idx[0]], idx[breaks + 1]))
+    ends = np.concatenate((idx[breaks], [idx[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def diff_rects(prev, cur):
+    """
+    Calcula os retângulos alterados entre dois frames RGB565.
+
+    Returns:
+        Lista de (x, y, largura, altura)
+    """
+    changed = prev != cur
+    rects = []
+    for y0, y1 in _runs(changed.any(axis=1), ROW_MERGE_GAP):
+        band = changed[y0:y1]
+        for x0, x1 in _runs(band.any(axis=0), COL_MERGE_GAP):
+            # Ajusta as linhas ao trecho realmente alterado nessas colunas
+            rows = np.flatnonzero(band[:, x0:x1].any(axis=1))
+            top, bottom = y0 + int(rows[0]), y0 + int(rows[-1]) + 1
+            rects.append((x0, top, x1 - x0, bottom - top))
+    return rects
+
+
+def compose_gif_frames(path, width, height, rotate_deg=0):
+    """
+    Decodifica um GIF em canvases RGB do tamanho da tela.
+
+    Returns:
+        Tupla (lista de imagens PIL, lista de durações em segundos)
+    """
+    canvases, durations = [], []
+    from PIL import ImageSequence
+    with Image.open(path) as gif:
+        for f in ImageSequence.Iterator(gif):
+            fr = f.convert("RGB")
+            # Ajuste de tamanho: caber na tela mantendo proporção
+            fr.thumbnail((width, height))
+            canvas = Image.new("RGB", (width, height), "black")
+            canvas.paste(fr, ((width - fr.width) // 2, (height - fr.height) // 2))
+            if rotate_deg:
+                canvas = canvas.rotate(rotate_deg, expand=False)
+            canvases.append(canvas)
+            durations.append(f.info.get("duration", 100) / 1000.0)
+    return canvases, durations
+
+
+class DeltaAnimation:
+    """
+    Animação armazenada como keyframe + retângulos alterados por frame.
+
+    Os dados ficam em poucos arrays planos (fáceis de salvar/mapear):
+        keyframe:     [H,W] uint8   - índices do frame 0 completo
+        luts:         [F,256] uint16 - LUT RGB565 de cada frame
+        rects:        [N,6] int32   - frame, x, y, w, h, offset no pool
+        frame_starts: [F+1] int32   - primeiro retângulo de cada frame
+        pool:         [P]   uint8   - índices de todos os retângulos
+        durations:    [F]   float32
+    O delta do frame 0 leva do último frame de volta ao primeiro (loop).
+    Os pixels só viram RGB565 na hora do blit, por gather na LUT do frame.
+    """
+
+    def __init__(self, width, height, keyframe, luts, rects, frame_starts, pool, durations, name=""):
+        self.width = width
+        self.height = height
+        self.keyframe = keyframe
+        self.luts = luts
+        self.rects = rects
+        self.frame_starts = frame_starts
+        self.pool = pool
+        self.durations = durations
+        self.name = name
+
+    def __len__(self):
+        return len(self.durations)
+
+    def frame_rects(self, index):
+        """Retorna os retângulos (x, y, pixels[h,w] RGB565) do frame."""
+        start, end = self.frame_starts[index], self.frame_starts[index + 1]
+        lut = self.luts[index]
+        out = []
+        for _, x, y, w, h, off in self.rects[start:end]:
+            out.append((int(x), int(y), lut[self.pool[off:off + w * h]].reshape(h, w)))
+        return out
+
+    def show_keyframe(self, writer):
+        """Escreve o frame 0 completo (início da reprodução)."""
+        writer.write_full(self.luts[0][self.keyframe])
+
+    def show_frame(self, index, writer):
+        """Escreve apenas o que mudou do frame anterior para o frame index."""
+        writer.write_rects(self.frame_rects(index))
+
+    def stats(self):
+        """
+        Estatísticas de armazenamento e de bytes SPI por frame.
+
+        O custo SPI considera o intervalo de linhas tocadas (o fbtft
+        envia linhas inteiras), comparado a uma tela cheia por frame.
+        """
+        frames = len(self)
+        frame_bytes = self.width * self.height * 2
+        stored = (self.keyframe.nbytes + self.luts.nbytes + self.rects.nbytes +
+                  self.frame_starts.nbytes + self.pool.nbytes + self.durations.nbytes)
+
+        spi_total = 0
+        for i in range(frames):
+            chunk = self.rects[self.frame_starts[i]:self.frame_starts[i + 1]]
+            if len(chunk):
+                top = chunk[:, 2].min()
+                bottom = (chunk[:, 2] + chunk[:, 4]).max()
+                spi_total += int(bottom - top) * self.width * 2
+
+        return {
+            "frames": frames,
+            "rects": len(self.rects),
+            "full_bytes": frames * frame_bytes,
+            "stored_bytes": int(stored),
+            "full_spi_per_frame": frame_bytes,
+            "spi_per_frame": spi_total / frames if frames else 0,
+        }
+
+    def report(self):
+        """Texto curto com os números de armazenamento e SPI."""
+        s = self.stats()
+        return (f"{self.name}: {s['frames']} frames, {s['rects']} retângulos | "
+                f"armazenamento {s['full_bytes'] / 1024:.0f} KB -> {s['stored_bytes'] / 1024:.0f} KB | "
+                f"SPI/frame {s['full_spi_per_frame'] / 1024:.0f} KB -> {s['spi_per_frame'] / 1024:.1f} KB")
+
+
+def compile_delta_animation(path, width, height, rotate_deg=0):
+    """
+    Compila um GIF em DeltaAnimation para a geometria da tela.
+
+    Args:
+        path: Caminho do GIF
+        width: Largura da tela
+        height: Altura da tela
+        rotate_deg: Rotação aplicada ao canvas
+
+    Returns:
+        DeltaAnimation pronta para reprodução
+    """
+    canvases, durations = compose_gif_frames(path, width, height, rotate_deg)
+    indexed = index_frames(canvases)
+    # A comparação usa o RGB565 final (o que de fato vai para a tela)
+    frames = [f.expand() for f in indexed]
+
+    rect_rows, pool_parts, frame_starts = [], [], [0]
+    offset = 0
+    for i, cur in enumerate(frames):
+        prev = frames[i - 1]  # frame 0 compara com o último (loop)
+        for x, y, w, h in diff_rects(prev, cur):
+            block = indexed[i].indices[y:y + h, x:x + w]
+            rect_rows.append((i, x, y, w, h, offset))
+            pool_parts.append(block.ravel())
+            offset += w * h
+        frame_starts.append(len(rect_rows))
+
+    rects = np.array(rect_rows, dtype=np.int32).reshape(-1, RECT_FIELDS)
+    pool = np.concatenate(pool_parts) if pool_parts else np.zeros(0, dtype=np.uint8)
+    return DeltaAnimation(
+        width, height,
+        keyframe=indexed[0].indices,
+        luts=np.stack([f.lut for f in indexed]),
+        rects=rects,
+        frame_starts=np.array(frame_starts, dtype=np.int32),
+        pool=pool,
+        durations=np.array(durations, dtype=np.float32),
+        name=os.path.basename(path),
+    )
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Compilador de assets do display.
+
+Percorre assets/ e gera artefatos prontos para a tela, por geometria e
+rotação, que os painéis carregam com np.load(mmap_mode="r") em vez de
+redimensionar/converter as mesmas imagens a cada execução (ou frame):
+
+    animation: GIF composto na tela e codificado em frames delta
+               (índices uint8 + LUT RGB565 por frame)
+    frames:    GIF redimensionado, frame a frame paletizado
+               (para quem compõe o GIF com texto via Pillow)
+    sprite:    PNG com alpha convertido para RGB565 pré-multiplicado
+               + plano de alpha, mesclado direto no frame RGB565
+
+Os artefatos ficam em assets/compiled/ com um manifest.json que guarda
+mtime/tamanho da fonte: se a fonte mudou, o loader devolve None e o
+painel usa o arquivo original.
+
+Uso:
+    python3 src/core/assets.py [--geometry 480x320] [--rotate 0] [--clean]
+"""
+
+import os
+import sys
+import json
+import time
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.animation import (
+    DeltaAnimation, IndexedFrame, compile_delta_animation, index_frames
+)
+
+ASSETS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "assets")
+COMPILED_DIRNAME = "compiled"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+DEFAULT_GEOMETRIES = [(480, 320)]
+DEFAULT_ROTATIONS = [0]
+
+# GIFs consumidos frame a frame: (arquivo, tamanho ou "screen", ajuste)
+FRAME_TARGETS = [
+    ("narutowalking.gif", (300, 280), "resize"),        # TouchMenu.GIF_SIZE
+    ("gifs2/kakashicute.gif", "screen", "thumbnail"),   # LOADING_GIF_PATH do painelip
+]
+
+ANIMATION_ARRAYS = ("keyframe", "luts", "rects", "frame_starts", "pool", "durations")
+
+
+# ===== SPRITES =====
+
+def rotated_position(x, y, w, h, width, height, rotate_deg):
+    """
+    Posição do canto superior esquerdo de um sprite depois de girar a tela.
+
+    Reproduz Image.rotate(rotate_deg, expand=False): rotação anti-horária
+    em torno do centro da tela.
+
+    Returns:
+        Tupla (x, y) do sprite já girado
+    """
+    k = (rotate_deg // 90) % 4
+    dx = x + w / 2 - width / 2
+    dy = y + h / 2 - height / 2
+    for _ in range(k):
+        dx, dy = dy, -dx
+    rw, rh = (h, w) if k % 2 else (w, h)
+    return int(round(width / 2 + dx - rw / 2)), int(round(height / 2 + dy - rh / 2))
+
+
+class Sprite:
+    """Sprite RGB565 com alpha pré-multiplicado."""
+
+    def __init__(self, color, alpha, rotate_deg=0):
+        self.color = color  # [H,W] uint16 RGB565 já multiplicado pelo alpha
+        self.alpha = alpha  # [H,W] uint8
+        self.rotate_deg = rotate_deg
+
+    @classmethod
+    def from_image(cls, pil_img, rotate_deg=0):
+        """Cria o sprite a partir de uma imagem PIL (fallback sem artefato)."""
+        rgba = np.asarray(pil_img.convert("RGBA"), dtype=np.uint16)
+        a = rgba[..., 3]
+        r = (rgba[..., 0] * a + 127) // 255
+        g = (rgba[..., 1] * a + 127) // 255
+        b = (rgba[..., 2] * a + 127) // 255
+        color = ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
+        k = (rotate_deg // 90) % 4
+        return cls(np.ascontiguousarray(np.rot90(color.astype(np.uint16), k)),
+                   np.ascontiguousarray(np.rot90(a.astype(np.uint8), k)), rotate_deg)
+
+    @property
+    def width(self):
+        return self.color.shape[1]
+
+    @property
+    def height(self):
+        return self.color.shape[0]
+
+    @property
+    def image_size(self):
+        """(largura, altura) da imagem original, antes da rotação."""
+        if (self.rotate_deg // 90) % 2:
+            return self.height, self.width
+        return self.width, self.height
+
+    def blend_into(self, frame, x, y):
+        """Mescla o sprite em um frame RGB565 [H,W] na posição (x, y)."""
+        fh, fw = frame.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + self.width, fw), min(y + self.height, fh)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        src = self.color[y0 - y:y1 - y, x0 - x:x1 - x]
+        inv = 255 - self.alpha[y0 - y:y1 - y, x0 - x:x1 - x].astype(np.uint16)
+        dst = frame[y0:y1, x0:x1]
+
+        r = (src >> 11) + (((dst >> 11) & 0x1F) * inv + 127) // 255
+        g = ((src >> 5) & 0x3F) + (((dst >> 5) & 0x3F) * inv + 127) // 255
+        b = (src & 0x1F) + ((dst & 0x1F) * inv + 127) // 255
+        frame[y0:y1, x0:x1] = (np.minimum(r, 0x1F) << 11) | (np.minimum(g, 0x3F) << 5) | np.minimum(b, 0x1F)
+
+
+# ===== FRAMES PALETIZADOS =====
+
+def build_frames(path, size, fit="thumbnail"):
+    """
+    Decodifica um GIF em frames paletizados no tamanho pedido.
+
+    Args:
+        path: Caminho do GIF
+        size: (largura, altura) alvo
+        fit: "thumbnail" (mantém proporção) ou "resize" (estica, LANCZOS)
+
+    Returns:
+        Tupla (lista de IndexedFrame, durações em segundos)
+    """
+    from PIL import ImageSequence
+    frames, durations = [], []
+    with Image.open(path) as gif:
+        for f in ImageSequence.Iterator(gif):
+            if fit == "resize":
+                fr = f.copy().resize(size, Image.Resampling.LANCZOS).convert("RGB")
+            else:
+                fr = f.convert("RGB")
+                fr.thumbnail(size)
+            frames.append(fr)
+            durations.append(f.info.get("duration", 100) / 1000.0)
+    return index_frames(frames), durations
+
+
+# ===== MANIFEST / LOADERS =====
+
+def compiled_dir(assets_dir=ASSETS_DIR):
+    return os.path.join(assets_dir, COMPILED_DIRNAME)
+
+
+def artifact_key(kind, relpath, size, rotate_deg=0, fit=""):
+    """Chave do artefato no manifest (size=None para tamanho nativo)."""
+    geometry = f"{size[0]}x{size[1]}" if size else "native"
+    suffix = f"_{fit}" if fit else ""
+    return f"{kind}/{geometry}_r{rotate_deg}{suffix}/{relpath}"
+
+
+_manifest_cache = {}
+
+
+def _read_manifest(assets_dir):
+    """Lê o manifest (com cache por mtime)."""
+    path = os.path.join(compiled_dir(assets_dir), MANIFEST_NAME)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _manifest_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    _manifest_cache[path] = (mtime, manifest)
+    return manifest
+
+
+def _lookup(kind, source, size, rotate_deg=0, fit="", assets_dir=ASSETS_DIR):
+    """
+    Encontra um artefato válido para a fonte.
+
+    Returns:
+        Tupla ({nome: array mapeado}, entrada do manifest), ou
+        (None, None) se ausente/desatualizado
+    """
+    manifest = _read_manifest(assets_dir)
+    if not manifest:
+        return None, None
+    relpath = os.path.relpath(os.path.realpath(source), os.path.realpath(assets_dir))
+    if relpath.startswith(".."):
+        return None, None
+    entry = manifest["artifacts"].get(artifact_key(kind, relpath, size, rotate_deg, fit))
+    if not entry:
+        return None, None
+    try:
+        st = os.stat(source)
+    except OSError:
+        return None, None
+    if entry["source_mtime_ns"] != st.st_mtime_ns or entry["source_size"] != st.st_size:
+        return None, None  # Fonte alterada depois da compilação
+
+    base = compiled_dir(assets_dir)
+    try:
+        arrays = {name: np.load(os.path.join(base, fname), mmap_mode="r")
+                  for name, fname in entry["files"].items()}
+    except (OSError, ValueError):
+        return None, None
+    return arrays, entry
+
+
+def load_sprite(source, rotate_deg=0, assets_dir=ASSETS_DIR):
+    """Sprite pré-compilado (mmap) ou None para usar a imagem original."""
+    arrays, entry = _lookup("sprite", source, None, rotate_deg, assets_dir=assets_dir)
+    if arrays is None:
+        return None
+    return Sprite(arrays["color"], arrays["alpha"], rotate_deg)
+
+
+def load_animation(source, width, height, rotate_deg=0, assets_dir=ASSETS_DIR):
+    """DeltaAnimation pré-compilada (mmap) ou None para compilar do GIF."""
+    arrays, entry = _lookup("animation", source, (width, height), rotate_deg, assets_dir=assets_dir)
+    if arrays is None:
+        return None
+    return DeltaAnimation(width, height, name=os.path.basename(source),
+                          **{name: arrays[name] for name in ANIMATION_ARRAYS})
+
+
+def load_frames(source, size, fit="thumbnail", assets_dir=ASSETS_DIR):
+    """
+    Frames paletizados pré-compilados (mmap) ou None.
+
+    Returns:
+        Tupla (lista de IndexedFrame, durações em segundos) ou None
+    """
+    arrays, entry = _lookup("frames", source, size, 0, fit, assets_dir=assets_dir)
+    if arrays is None:
+        return None
+    frames = [IndexedFrame(arrays["indices"][i], arrays["luts"][i])
+              for i in range(len(arrays["durations"]))]
+    return frames, [float(d) for d in arrays["durations"]]
+
+
+# ===== COMPILADOR =====
+
+class AssetCompiler:
+    """Gera artefatos e o manifest em assets/compiled/."""
+
+    def __init__(self, assets_dir=ASSETS_DIR):
+        self.assets_dir = assets_dir
+        self.out_dir = compiled_dir(assets_dir)
+        self.artifacts = {}
+        self.total_bytes = 0
+
+    def _save(self, key, source, arrays, meta):
+        """Salva os arrays (.npy) de um artefato e registra no manifest."""
+        files = {}
+        stem = key.replace("/", "__")
+        for name, arr in arrays.items():
+            fname = f"{stem}.{name}.npy"
+            np.save(os.path.join(self.out_dir, fname), np.ascontiguousarray(arr))
+            files[name] = fname
+            self.total_bytes += arr.nbytes
+        st = os.stat(source)
+        self.artifacts[key] = {
+            "kind": key.split("/", 1)[0],
+            "source": os.path.relpath(source, self.assets_dir),
+            "source_mtime_ns": st.st_mtime_ns,
+            "source_size": st.st_size,
+            "files": files,
+            "meta": meta,
+        }
+
+    def sources(self, suffixes):
+        """Arquivos de assets/ (recursivo) com as extensões dadas."""
+        found = []
+        for root, dirs, files in os.walk(self.assets_dir):
+            dirs[:] = sorted(d for d in dirs if d != COMPILED_DIRNAME)
+            for name in sorted(files):
+                if name.lower().endswith(suffixes):
+                    found.append(os.path.join(root, name))
+        return found
+
+    def compile_sprite(self, source, rotate_deg):
+        rel = os.path.relpath(source, self.assets_dir)
+        with Image.open(source) as img:
+            sprite = Sprite.from_image(img, rotate_deg)
+        self._save(artifact_key("sprite", rel, None, rotate_deg), source,
+                   {"color": sprite.color, "alpha": sprite.alpha},
+                   {"width": sprite.width, "height": sprite.height})
+
+    def compile_animation(self, source, width, height, rotate_deg):
+        rel = os.path.relpath(source, self.assets_dir)
+        anim = compile_delta_animation(source, width, height, rotate_deg)
+        self._save(artifact_key("animation", rel, (width, height), rotate_deg), source,
+                   {name: getattr(anim, name) for name in ANIMATION_ARRAYS},
+                   anim.stats())
+        print(f"   🎬 {anim.report()}")
+
+    def compile_frames(self, source, size, fit):
+        rel = os.path.relpath(source, self.assets_dir)
+        frames, durations = build_frames(source, size, fit)
+        self._save(artifact_key("frames", rel, size, 0, fit), source,
+                   {"indices": np.stack([f.indices for f in frames]),
+                    "luts": np.stack([f.lut for f in frames]),
+                    "durations": np.array(durations, dtype=np.float32)},
+                   {"frames": len(frames), "width": frames[0].width, "height": frames[0].height})
+
+    def run(self, geometries, rotations, clean=False):
+        if clean and os.path.isdir(self.out_dir):
+            import shutil
+            shutil.rmtree(self.out_dir)
+        os.makedirs(self.out_dir, exist_ok=True)
+        started = time.time()
+
+        for source in self.sources((".png",)):
+            print(f"🖼️  {os.path.relpath(source, self.assets_dir)}")
+            for rot in rotations:
+                self.compile_sprite(source, rot)
+
+        for source in self.sources((".gif",)):
+            print(f"📽️  {os.path.relpath(source, self.assets_dir)}")
+            for width, height in geometries:
+                for rot in rotations:
+                    self.compile_animation(source, width, height, rot)
+
+        for rel, target, fit in FRAME_TARGETS:
+            source = os.path.join(self.assets_dir, rel)
+            if not os.path.exists(source):
+                continue
+            sizes = geometries if target == "screen" else [target]
+            for size in sizes:
+                print(f"🎞️  {rel} ({size[0]}x{size[1]}, {fit})")
+                self.compile_frames(source, size, fit)
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "created": time.time(),
+            "artifacts": self.artifacts,
+        }
+        tmp = os.path.join(self.out_dir, MANIFEST_NAME + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, os.path.join(self.out_dir, MANIFEST_NAME))
+
+        print(f"✅ {len(self.artifacts)} artefatos ({self.total_bytes / 1024 / 1024:.1f} MB) "
+              f"em {self.out_dir} ({time.time() - started:.1f}s)")
+
+
+def _parse_geometry(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Pré-compila os assets do display")
+    parser.add_argument("--assets", default=ASSETS_DIR, help="diretório de assets")
+    parser.add_argument("--geometry", action="append", type=_parse_geometry,
+                        help="geometria da tela LxA (pode repetir; padrão 480x320)")
+    parser.add_argument("--rotate", action="append", type=int, choices=[0, 90, 180, 270],
+                        help="rotação da tela (pode repetir; padrão 0)")
+    parser.add_argument("--clean", action="store_true", help="apaga artefatos antigos antes")
+    args = parser.parse_args()
+
+    compiler = AssetCompiler(args.assets)
+    compiler.run(args.geometry or DEFAULT_GEOMETRIES, args.rotate or DEFAULT_ROTATIONS, args.clean)
+
+
+if __name__ == "__main__":
+    main()
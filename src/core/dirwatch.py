@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Observador de diretório baseado em inotify (com polling como fallback).
+
+Usa inotify_init1/inotify_add_watch da libc via ctypes, em modo não
+bloqueante: changes() pode ser chamado a cada frame sem custo quando
+nada mudou. Se o inotify não estiver disponível, compara snapshots de
+(mtime, tamanho) a cada POLL_INTERVAL segundos.
+
+Se o próprio diretório é removido, movido ou substituído (deploy, rsync
+--delay-updates, rm -r + recriação), o watch antigo deixa de valer: o
+inotify é reaberto no caminho, ou, se o diretório ainda não existe, o
+polling assume e volta ao inotify quando ele reaparecer.
+"""
+
+import os
+import time
+import struct
+import ctypes
+import ctypes.util
+
+# Máscaras do inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+POLL_INTERVAL = 2.0
+
+CHANGED = "changed"
+REMOVED = "removed"
+
+
+class DirectoryWatcher:
+    """Informa arquivos criados/alterados/removidos num diretório."""
+
+    def __init__(self, path, suffix=""):
+        self.path = path
+        self.suffix = suffix.lower()
+        self.fd = None
+        self._rewatch = False  # Watch perdido: tenta reabrir o inotify no polling
+        self._snapshot = self._scan()
+        self._last_poll = time.monotonic()
+        self._init_inotify()
+
+    @property
+    def backend(self):
+        return "inotify" if self.fd is not None else "polling"
+
+    def _init_inotify(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            if libc.inotify_add_watch(fd, os.fsencode(self.path), WATCH_MASK) < 0:
+                os.close(fd)
+                return
+            self.fd = fd
+            self._rewatch = False
+        except (OSError, AttributeError):
+            self.fd = None
+
+    def _reopen_inotify(self):
+        """Diretório removido/movido: descarta o watch antigo e observa o caminho de novo."""
+        os.close(self.fd)
+        self.fd = None
+        self._rewatch = True
+        self._init_inotify()
+        print(f"🔁 {self.path} substituído; observando via {self.backend}")
+
+    def _wanted(self, name):
+        return name.lower().endswith(self.suffix)
+
+    def _scan(self):
+        """Snapshot {nome: (mtime, tamanho)} dos arquivos do diretório."""
+        snap = {}
+        try:
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if entry.is_file() and self._wanted(entry.name):
+                        st = entry.stat()
+                        snap[entry.name] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+        return snap
+
+    def files(self):
+        """Lista ordenada dos arquivos atualmente conhecidos."""
+        return sorted(self._snapshot)
+
+    def _diff_snapshot(self):
+        """Compara com o snapshot anterior (usado no polling e em overflow)."""
+        new = self._scan()
+        changes = {name: REMOVED for name in self._snapshot if name not in new}
+        for name, sig in new.items():
+            if self._snapshot.get(name) != sig:
+                changes[name] = CHANGED
+        self._snapshot = new
+        return changes
+
+    def changes(self):
+        """
+        Retorna as mudanças desde a última chamada, sem bloquear.
+
+        Returns:
+            Dicionário {nome_do_arquivo: CHANGED | REMOVED}
+        """
+        if self.fd is None:
+            now = time.monotonic()
+            if now - self._last_poll < POLL_INTERVAL:
+                return {}
+            self._last_poll = now
+            if self._rewatch and os.path.isdir(self.path):
+                self._init_inotify()
+            return self._diff_snapshot()
+
+        changes = {}
+        reopen = False
+        while not reopen:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+                offset += length
+
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    # O watch não segue mais o caminho: o resto do buffer é do watch velho
+                    reopen = True
+                    break
+                if mask & IN_Q_OVERFLOW:
+                    # Eventos perdidos: reconcilia tudo
+                    changes.update(self._diff_snapshot())
+                    continue
+                if not name or not self._wanted(name):
+                    continue
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    changes[name] = REMOVED
+                    self._snapshot.pop(name, None)
+                else:
+                    changes[name] = CHANGED
+                    try:
+                        st = os.stat(os.path.join(self.path, name))
+                        self._snapshot[name] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        changes[name] = REMOVED
+                        self._snapshot.pop(name, None)
+        if reopen:
+            self._reopen_inotify()
+            changes.update(self._diff_snapshot())
+        return changes
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
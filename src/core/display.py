@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tela compartilhada pelo host de painéis.
+
+Localiza o framebuffer do TFT pelo nome do driver (fb_ili9486), lê a
+geometria uma única vez e mantém um FramebufferWriter aberto, para que
+a troca de painel não reabra nem reconsulte nada. PAINEL_FB aponta para
+um framebuffer virtual (arquivo), usado com debug/touch_replay.py.
+"""
+
+import os
+import sys
+import glob
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.animation import rgb_to_rgb565
+from core.fbwriter import FramebufferWriter
+from core.latency import TRACER
+
+FB_TARGET = "fb_ili9486"
+FB_ENV = "PAINEL_FB"
+FALLBACK_FB = "/dev/fb0"
+# Geometria do TFT 3.5" (480x320 RGB565) quando não há sysfs (arquivo virtual)
+DEFAULT_GEOMETRY = (480, 320, 16, 480 * 2)
+
+
+def read(path, as_int=False, default=None):
+    try:
+        with open(path) as f:
+            s = f.read().strip()
+        return int(s) if as_int else s
+    except (OSError, ValueError):
+        return default
+
+
+def find_fb_by_name(target=FB_TARGET):
+    """Retorna /dev/fbN do driver informado, ou None."""
+    for p in glob.glob("/sys/class/graphics/fb*/name"):
+        if read(p) == target:
+            return f"/dev/{os.path.basename(os.path.dirname(p))}"
+    return None
+
+
+def fb_geometry(fbdev):
+    """Largura, altura, bpp e stride do framebuffer."""
+    import re
+    import subprocess
+    idx = int(os.path.basename(fbdev)[2:])
+    # 1) tentar via fbset
+    w = h = None
+    try:
+        out = subprocess.check_output(["fbset", "-s", "-fb", fbdev], text=True,
+                                      stderr=subprocess.DEVNULL)
+        m = re.search(r"geometry\s+(\d+)\s+(\d+)", out)
+        if m:
+            w, h = int(m.group(1)), int(m.group(2))
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    # 2) fallback: alguns kernels têm virtual_size
+    if not (w and h):
+        vs = read(f"/sys/class/graphics/fb{idx}/virtual_size")
+        if vs and "," in vs:
+            a, b = vs.replace(" ", "").split(",")
+            w, h = int(a), int(b)
+    # 3) último recurso: padrão da MPI3501
+    if not (w and h):
+        w, h = 320, 480
+
+    bpp = read(f"/sys/class/graphics/fb{idx}/bits_per_pixel", as_int=True, default=16)
+    stride = (read(f"/sys/class/graphics/fb{idx}/stride", as_int=True) or
+              read(f"/sys/class/graphics/fb{idx}/fb_fix/line_length", as_int=True) or
+              w * (bpp // 8))
+    return w, h, bpp, stride
+
+
+class Display:
+    """Framebuffer aberto uma vez e compartilhado por todos os painéis."""
+
+    def __init__(self, fbdev=None):
+        override = os.environ.get(FB_ENV)
+        if fbdev is None and override:
+            fbdev = override
+            geometry = DEFAULT_GEOMETRY
+        else:
+            fbdev = fbdev or find_fb_by_name() or FALLBACK_FB
+            geometry = fb_geometry(fbdev) if os.path.basename(fbdev)[2:].isdigit() else DEFAULT_GEOMETRY
+        self.fbdev = fbdev
+        self.width, self.height, self.bpp, self.stride = geometry
+        self.writer = (FramebufferWriter(fbdev, self.width, self.height, self.stride)
+                       if self.bpp == 16 else None)
+        print(f"[fb] {fbdev}: {self.width}x{self.height} @{self.bpp}bpp stride={self.stride}")
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def show_rgb565(self, frame):
+        """Escreve um frame RGB565 [H,W] completo."""
+        self.writer.write_full(frame)
+
+    def show_image(self, img):
+        """Escreve uma imagem PIL RGB do tamanho da tela."""
+        if self.writer is not None:
+            self.writer.write_full(rgb_to_rgb565(img))
+            return
+        # Outros formatos de pixel: bytes crus, respeitando o stride
+        import numpy as np
+        raw = img.tobytes()
+        row_bytes = img.width * (len(raw) // (img.width * img.height))
+        rows = np.frombuffer(raw, dtype=np.uint8).reshape(img.height, row_bytes)
+        buf = np.zeros((img.height, max(self.stride, row_bytes)), dtype=np.uint8)
+        buf[:, :row_bytes] = rows
+        with open(self.fbdev, "wb") as f:
+            f.write(buf.tobytes())
+        TRACER.frame_written()
+
+    def clear(self):
+        """Preenche a tela com preto."""
+        if self.writer is not None:
+            self.writer.clear()
+        else:
+            with open(self.fbdev, "wb") as f:
+                f.write(b"\x00" * (self.stride * self.height))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
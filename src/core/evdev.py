@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Leitor evdev em lote para o touchscreen.
+
+O tamanho de struct input_event depende da plataforma: timeval usa dois
+`long`, então são 16 bytes no Raspberry Pi OS 32-bit e 24 bytes no
+64-bit. O formato nativo "llHHi" resolve isso via struct.calcsize.
+
+O descritor é aberto em modo não bloqueante e monitorado com epoll; a
+cada despertar todos os eventos pendentes são lidos e decodificados de
+uma vez (struct.iter_unpack). Os eventos são agrupados até o
+SYN_REPORT e entregues aos assinantes como um TouchSample.
+
+Os timestamps são pedidos ao kernel em CLOCK_MONOTONIC (EVIOCSCLOCKID),
+comparáveis com time.monotonic() em qualquer processo. Se o ioctl não
+for suportado, o horário de parede é convertido na decodificação.
+"""
+
+import os
+import stat
+import time
+import glob
+import fcntl
+import select
+import struct
+import threading
+from collections import namedtuple
+
+# struct input_event { struct timeval time; __u16 type; __u16 code; __s32 value; }
+EVENT_FORMAT = "llHHi"
+EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+BATCH_EVENTS = 64  # Eventos lidos por syscall
+
+# Tipos e códigos (linux/input-event-codes.h)
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+SYN_REPORT = 0
+SYN_DROPPED = 3
+ABS_X = 0x00
+ABS_Y = 0x01
+ABS_PRESSURE = 0x18
+BTN_TOUCH = 0x14a
+
+# ioctl EVIOCGRAB = _IOW('E', 0x90, int): acesso exclusivo ao dispositivo
+EVIOCGRAB = 0x40044590
+# ioctl EVIOCSCLOCKID = _IOW('E', 0xa0, int): relógio dos timestamps
+EVIOCSCLOCKID = 0x400445a0
+CLOCK_MONOTONIC = 1
+
+TOUCH_NAMES = ['ads7846', 'touchscreen', 'touch', 'ft6236', 'goodix']
+
+# Força o dispositivo de toque (ex.: FIFO do debug/touch_replay.py)
+TOUCH_DEVICE_ENV = "PAINEL_TOUCH_DEVICE"
+
+# Amostra completa de toque (fechada por SYN_REPORT)
+#   timestamp: horário do kernel (segundos, CLOCK_MONOTONIC) do SYN_REPORT
+TouchSample = namedtuple("TouchSample", "x y pressure touching timestamp")
+
+# Resultado de PressDetector.feed()
+PRESS = "press"
+STALE = "stale"
+
+# Um toque que começa até este tempo após a transição é o dedo que
+# continuou na tela (ninguém reage tão rápido a uma tela nova)
+HELD_WINDOW = 0.1
+
+
+def find_touch_device():
+    """Encontra automaticamente o dispositivo de touchscreen"""
+    override = os.environ.get(TOUCH_DEVICE_ENV)
+    if override:
+        print(f"✅ Touchscreen definido por {TOUCH_DEVICE_ENV}: {override}")
+        return override
+
+    for event_path in sorted(glob.glob('/dev/input/event*')):
+        try:
+            event_name = event_path.split('/')[-1]  # ex: event2
+            name_path = f'/sys/class/input/{event_name}/device/name'
+            with open(name_path, 'r') as f:
+                device_name = f.read().strip()
+            
+            # Procura por dispositivos de touchscreen conhecidos
+            if any(touch_name in device_name.lower() for touch_name in TOUCH_NAMES):
+                print(f"✅ Touchscreen encontrado: {event_path} ({device_name})")
+                return event_path
+        except OSError:
+            continue
+    
+    # Fallback para event0 se não encontrar
+    print("⚠️  Usando fallback: /dev/input/event0")
+    return '/dev/input/event0'
+
+
+class PressDetector:
+    """
+    Converte amostras em toques (borda de pressão) sem esperas fixas.
+
+    Em vez de dormir e esvaziar o dispositivo após uma troca de tela,
+    guarda o instante da transição (reset) e compara com o timestamp do
+    kernel: toques que começaram antes dela, ou que seguem pressionados
+    logo após, são descartados; o próximo toque novo é aceito na hora.
+    Cada toque dispara uma única vez, até o dedo ser levantado.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.accept_after = time.monotonic()
+        self._down = False
+
+    def reset(self, when=None):
+        """Marca uma transição: só toques posteriores são aceitos."""
+        self.accept_after = time.monotonic() if when is None else when
+
+    def feed(self, sample):
+        """
+        Returns:
+            PRESS para um toque novo, STALE para um toque descartado por
+            ser anterior à transição, None para as demais amostras
+        """
+        if not sample.touching or sample.pressure <= 0:
+            self._down = False
+            return None
+        # Histerese: variações de pressão no meio do toque não o repetem
+        if self._down or sample.pressure <= self.threshold:
+            return None
+        self._down = True
+        if sample.timestamp <= self.accept_after + HELD_WINDOW:
+            return STALE
+        return PRESS
+
+
+class EvdevReader:
+    """Lê o dispositivo de toque e entrega amostras aos assinantes."""
+
+    def __init__(self, device):
+        self.device = device
+        self.fd = None
+        self.epoll = None
+        self.subscribers = []
+        self.running = False
+        self.thread = None
+
+        # Estado acumulado entre SYN_REPORTs
+        self.x = 0
+        self.y = 0
+        self.pressure = 0
+        self.btn_touch = None
+        self._dropping = False
+        self._partial = b""
+        self.monotonic = False  # Kernel já entrega CLOCK_MONOTONIC?
+
+        # Estatísticas
+        self.reads = 0
+        self.events = 0
+        self.samples = 0
+        self.dropped = 0  # SYN_DROPPED recebidos
+
+    def open(self):
+        """Abre o dispositivo (não bloqueante) e registra no epoll."""
+        if self.fd is not None:
+            return
+        mode = os.O_RDONLY
+        if stat.S_ISFIFO(os.stat(self.device).st_mode):
+            # FIFO (replay): abrir também para escrita evita EPOLLHUP contínuo
+            # quando o gravador fecha a ponta dele
+            mode = os.O_RDWR
+        self.fd = os.open(self.device, mode | os.O_NONBLOCK)
+        self.epoll = select.epoll()
+        self.epoll.register(self.fd, select.EPOLLIN)
+        try:
+            fcntl.ioctl(self.fd, EVIOCSCLOCKID, struct.pack("i", CLOCK_MONOTONIC))
+            self.monotonic = True
+        except OSError:
+            self.monotonic = False
+
+    def close(self):
+        """Fecha o epoll e o dispositivo."""
+        if self.epoll is not None:
+            self.epoll.close()
+            self.epoll = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def subscribe(self, callback):
+        """Registra callback(sample) chamado a cada SYN_REPORT."""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def _read_available(self):
+        """Lê todos os eventos pendentes (vários por syscall)."""
+        chunks = []
+        while True:
+            try:
+                data = os.read(self.fd, EVENT_SIZE * BATCH_EVENTS)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            self.reads += 1
+            chunks.append(data)
+            if len(data) < EVENT_SIZE * BATCH_EVENTS:
+                break
+        data = self._partial + b"".join(chunks)
+        usable = len(data) - len(data) % EVENT_SIZE
+        self._partial = data[usable:]
+        return data[:usable]
+
+    def _decode(self, data):
+        """Decodifica um lote de eventos e retorna as amostras completas."""
+        samples = []
+        # Sem EVIOCSCLOCKID: converte o horário de parede para monotônico
+        offset = 0.0 if self.monotonic else time.monotonic() - time.time()
+        for sec, usec, type_, code, value in struct.iter_unpack(EVENT_FORMAT, data):
+            self.events += 1
+            if type_ == EV_SYN:
+                if code == SYN_DROPPED:
+                    # Buffer do kernel estourou: descarta até o próximo SYN_REPORT
+                    self._dropping = True
+                    self.dropped += 1
+                elif code == SYN_REPORT:
+                    if self._dropping:
+                        self._dropping = False
+                        continue
+                    touching = self.btn_touch if self.btn_touch is not None else self.pressure > 0
+                    samples.append(TouchSample(self.x, self.y, self.pressure,
+                                               bool(touching), sec + usec / 1e6 + offset))
+            elif self._dropping:
+                continue
+            elif type_ == EV_ABS:
+                if code == ABS_X:
+                    self.x = value
+                elif code == ABS_Y:
+                    self.y = value
+                elif code == ABS_PRESSURE:
+                    self.pressure = value
+            elif type_ == EV_KEY and code == BTN_TOUCH:
+                self.btn_touch = value
+        return samples
+
+    def grab(self, exclusive=True):
+        """EVIOCGRAB: impede que outros leitores recebam os eventos."""
+        self.open()
+        fcntl.ioctl(self.fd, EVIOCGRAB, 1 if exclusive else 0)
+
+    def process(self):
+        """
+        Lê e entrega tudo o que está pendente, sem esperar.
+
+        Para quem já monitora self.fd num epoll próprio (ex.: o broker).
+
+        Returns:
+            Lista de TouchSample lidas nesta chamada
+        """
+        samples = self._decode(self._read_available())
+        self.samples += len(samples)
+        for sample in samples:
+            for callback in list(self.subscribers):
+                callback(sample)
+        return samples
+
+    def poll(self, timeout=None):
+        """
+        Aguarda eventos (até timeout segundos) e entrega as amostras.
+
+        Returns:
+            Lista de TouchSample lidas nesta chamada
+        """
+        self.open()
+        if not self.epoll.poll(-1 if timeout is None else timeout):
+            return []
+        return self.process()
+
+    def run(self):
+        """Loop de leitura até stop()."""
+        self.running = True
+        try:
+            self.open()
+            while self.running:
+                self.poll(0.2)
+        except OSError as e:
+            print(f"❌ Erro lendo toque: {e}")
+        finally:
+            self.close()
+
+    def start(self):
+        """Inicia a leitura numa thread daemon."""
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
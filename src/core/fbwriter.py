@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Escrita no framebuffer com suporte a atualizações parciais.
+
+O framebuffer é mapeado em memória (mmap) e exposto como um array
+numpy [altura, largura] de pixels RGB565. Assim é possível escrever
+apenas os retângulos que mudaram entre dois frames: o driver fbtft
+(ILI9486 via SPI) só envia pelo barramento as linhas tocadas.
+Se o mmap não estiver disponível, usa pwrite() linha a linha.
+"""
+
+import os
+import sys
+import mmap
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.latency import TRACER
+
+
+class FramebufferWriter:
+    """Escreve frames RGB565 completos ou retângulos no framebuffer."""
+
+    def __init__(self, fbdev, width, height, stride):
+        self.fbdev = fbdev
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.fd = os.open(fbdev, os.O_RDWR)
+        self._mm = None
+        self.pixels = None
+
+        # Estatísticas de bytes enviados
+        self.frames = 0
+        self.bytes_written = 0
+        self.spi_bytes = 0
+
+        try:
+            self._mm = mmap.mmap(self.fd, stride * height, mmap.MAP_SHARED,
+                                 mmap.PROT_READ | mmap.PROT_WRITE)
+            rows = np.frombuffer(self._mm, dtype=np.uint16).reshape(height, stride // 2)
+            self.pixels = rows[:, :width]
+        except (OSError, ValueError):
+            # Alguns drivers não suportam mmap - usa pwrite()
+            self._mm = None
+            self.pixels = None
+
+    def write_full(self, frame):
+        """Escreve um frame RGB565 completo [H,W] (uint16)."""
+        if self.pixels is not None:
+            self.pixels[:, :] = frame
+        else:
+            row_bytes = self.width * 2
+            buf = np.zeros((self.height, self.stride), dtype=np.uint8)
+            buf[:, :row_bytes] = frame.view(np.uint8).reshape(self.height, row_bytes)
+            os.pwrite(self.fd, buf.tobytes(), 0)
+
+        self.frames += 1
+        self.bytes_written += frame.nbytes
+        self.spi_bytes += self.height * self.width * 2
+        TRACER.frame_written()
+
+    def write_rects(self, rects):
+        """
+        Escreve uma lista de retângulos (x, y, pixels[h,w]) no framebuffer.
+
+        O custo SPI é estimado pelo intervalo de linhas tocadas, pois o
+        fbtft atualiza linhas inteiras entre a menor e a maior linha suja.
+        """
+        y_min, y_max = self.height, 0
+        for x, y, block in rects:
+            h, w = block.shape
+            if self.pixels is not None:
+                self.pixels[y:y + h, x:x + w] = block
+            else:
+                for row in range(h):
+                    offset = (y + row) * self.stride + x * 2
+                    os.pwrite(self.fd, block[row].tobytes(), offset)
+            self.bytes_written += block.nbytes
+            y_min = min(y_min, y)
+            y_max = max(y_max, y + h)
+
+        self.frames += 1
+        if y_max > y_min:
+            self.spi_bytes += (y_max - y_min) * self.width * 2
+        TRACER.frame_written()
+
+    def clear(self):
+        """Preenche a tela com preto."""
+        self.write_full(np.zeros((self.height, self.width), dtype=np.uint16))
+
+    def close(self):
+        """Libera o mmap e o descritor do framebuffer."""
+        self.pixels = None
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass
+            self._mm = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
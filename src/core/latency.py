@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Rastreamento de latência toque→tela.
+
+Cada toque aceito carrega o timestamp do kernel (CLOCK_MONOTONIC, ver
+core.evdev) por três marcos:
+
+    kernel→leitura   evento gerado até a amostra chegar ao processo
+    leitura→tratado  amostra lida até _handle_touch/should_exit agir
+    tratado→tela     ação decidida até a próxima escrita completa
+                     no framebuffer
+
+Quando a resposta acontece em outro processo (botão de script isolado
+no core.panel_host), o toque pendente segue pela variável de ambiente
+PAINEL_TOUCH_TRACE e é fechado pela primeira escrita do filho, e não
+pela tela preta que o host desenha antes de lançá-lo. Como
+CLOCK_MONOTONIC é o mesmo para todo o sistema, os tempos continuam
+comparáveis. Filhos do zygote herdam o TRACER pré-carregado e chamam
+reset() depois de receber o ambiente. A volta do painel ao menu é no
+mesmo processo e não precisa de repasse.
+
+O sudo limpa o ambiente (env_reset): um processo relançado por ele só
+recebe o toque com `sudo --preserve-env=PAINEL_TOUCH_TRACE ...`. A
+antiga volta ao menu via `subprocess.run(["sudo", "python3", ...])`
+perdia o toque por isso.
+
+O histograma é impresso e salvo em /tmp/painel-latency-<processo>.txt
+ao receber SIGUSR1 e na saída:
+
+    sudo pkill -USR1 -f touch_menu_visual
+"""
+
+import os
+import sys
+import time
+import bisect
+import atexit
+import signal
+import threading
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+STAGES = ("kernel→leitura", "leitura→tratado", "tratado→tela", "total")
+TRACE_ENV = "PAINEL_TOUCH_TRACE"
+LATENCY_DIR = "/tmp"
+
+
+class Histogram:
+    """Histograma de latências em baldes fixos (ms)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        """Limite superior do balde que contém o percentil p (ms)."""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100.0
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def buckets(self):
+        """Texto "≤Nms: contagem" dos baldes não vazios."""
+        labels = [f"≤{b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return " | ".join(f"{label}: {n}" for label, n in zip(labels, self.counts) if n)
+
+
+class LatencyTracer:
+    """Acompanha o toque mais recente até a tela refletir a resposta."""
+
+    def __init__(self, name=None):
+        self.name = name or os.path.splitext(os.path.basename(sys.argv[0] or ""))[0] or "painel"
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.ignored_counts = {}
+        self._lock = threading.Lock()
+        self._touch = None    # (kernel, leitura) do último toque aceito
+        self._pending = None  # (kernel, leitura, tratado) aguardando a tela
+        self._installed = False
+        self._resume_from_env()
+
+    def reset(self, name=None):
+        """Estado de processo novo (filho do zygote): zera e retoma o toque do ambiente."""
+        with self._lock:
+            self.name = name or os.path.splitext(os.path.basename(sys.argv[0] or ""))[0] or "painel"
+            self.histograms = {stage: Histogram() for stage in STAGES}
+            self.ignored_counts = {}
+            self._touch = None
+            self._pending = None
+        self._resume_from_env()
+
+    def _resume_from_env(self):
+        """Retoma o toque repassado pelo processo anterior, se houver."""
+        value = os.environ.pop(TRACE_ENV, None)
+        if not value:
+            return
+        try:
+            kernel, read, handled = (float(v) for v in value.split(","))
+        except ValueError:
+            return
+        self._pending = (kernel, read, handled)
+
+    def touch(self, sample):
+        """Amostra de toque lida pelo processo (thread de leitura)."""
+        with self._lock:
+            self._touch = (sample.timestamp, time.monotonic())
+
+    def ignored(self, reason):
+        """Toque descartado (debounce, carência...): só contado."""
+        with self._lock:
+            self.ignored_counts[reason] = self.ignored_counts.get(reason, 0) + 1
+            self._touch = None
+
+    def handled(self, handoff=False):
+        """
+        O toque foi tratado; a próxima escrita no framebuffer fecha o ciclo.
+
+        Args:
+            handoff: a resposta será desenhada por outro processo: o toque
+                segue pelo ambiente (copiado por quem lança o filho) em vez
+                de esperar uma escrita deste processo. Via sudo, só com
+                --preserve-env=PAINEL_TOUCH_TRACE.
+        """
+        with self._lock:
+            if self._touch is None:
+                return
+            pending = self._touch + (time.monotonic(),)
+            self._touch = None
+            if handoff:
+                os.environ[TRACE_ENV] = ",".join(f"{t:.6f}" for t in pending)
+            else:
+                self._pending = pending
+
+    def frame_written(self):
+        """Uma escrita no framebuffer terminou."""
+        if self._pending is None:
+            return
+        with self._lock:
+            if self._pending is None:
+                return
+            kernel, read, handled = self._pending
+            self._pending = None
+            now = time.monotonic()
+            for stage, seconds in zip(STAGES, (read - kernel, handled - read,
+                                               now - handled, now - kernel)):
+                self.histograms[stage].add(max(0.0, seconds) * 1000)
+
+    def summary(self):
+        """Texto com a quebra por etapa, histograma total e descartes."""
+        total = self.histograms["total"]
+        lines = [f"⏱️  Latência toque→tela ({self.name}, pid {os.getpid()}, {total.count} toques)",
+                 f"{'etapa':<16} {'n':>5} {'média':>8} {'p50':>7} {'p95':>7} {'máx':>8}"]
+        for stage in STAGES:
+            h = self.histograms[stage]
+            lines.append(f"{stage:<16} {h.count:>5} {h.mean():>8.1f} {h.percentile(50):>7.0f} "
+                         f"{h.percentile(95):>7.0f} {h.max:>8.1f}")
+        if total.count:
+            lines.append(f"histograma total: {total.buckets()}")
+        if self.ignored_counts:
+            ignored = ", ".join(f"{k}={v}" for k, v in sorted(self.ignored_counts.items()))
+            lines.append(f"toques ignorados: {ignored}")
+        return "\n".join(lines)
+
+    def dump(self, path=None):
+        """Imprime o resumo e salva em arquivo."""
+        text = self.summary()
+        print(text)
+        path = path or os.path.join(LATENCY_DIR, f"painel-latency-{self.name}.txt")
+        try:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+        except OSError as e:
+            print(f"⚠️  Não foi possível salvar {path}: {e}")
+
+    def dump_if_used(self):
+        """dump() apenas se algum toque foi registrado (saída, exec)."""
+        if self.histograms["total"].count or self.ignored_counts:
+            self.dump()
+
+    def install(self):
+        """Salva o histograma em SIGUSR1 e na saída do processo."""
+        if self._installed:
+            return
+        self._installed = True
+        atexit.register(self.dump_if_used)
+        try:
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.dump())
+        except ValueError:
+            # signal.signal só funciona na thread principal
+            pass
+
+
+# Instância do processo
+TRACER = LatencyTracer()
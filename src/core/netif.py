@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Estado das interfaces de rede (endereços IPv4) com cache.
+
+Substitui o `ip -4 -o addr show` que os painéis executavam a cada frame
+(um fork por chamada). Os endereços são lidos por um socket rtnetlink
+(dump RTM_GETADDR) e ficam em cache; o mesmo socket assina os grupos
+de notificação de endereço e link do kernel, então o cache só é relido
+quando algo muda (ou, por segurança, a cada NETLINK_TTL segundos).
+Consultar o estado custa um recv() não bloqueante e um dicionário.
+
+Sem netlink, usa /proc/net/dev e ioctl (SIOCGIFADDR/SIOCGIFNETMASK),
+relidos a cada POLL_TTL segundos, como o polling do dirwatch.
+
+O socket é aberto no primeiro uso (nada acontece no import) e reaberto
+após um fork, então o zygote pode pré-carregar o módulo.
+"""
+
+import os
+import time
+import fcntl
+import socket
+import struct
+import ipaddress
+
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_LABEL = 3
+
+SIOCGIFADDR = 0x8915
+SIOCGIFNETMASK = 0x891B
+
+NLMSG_HEADER = struct.Struct("=IHHII")  # len, type, flags, seq, pid
+IFADDRMSG = struct.Struct("=BBBBI")     # family, prefixlen, flags, scope, index
+RTATTR = struct.Struct("=HH")           # len, type
+
+NETLINK_TTL = 60.0  # Releitura de segurança (notificações perdidas)
+POLL_TTL = 2.0      # Releitura sem netlink
+
+
+def _align(length):
+    return (length + 3) & ~3
+
+
+def _netlink_dump():
+    """
+    Endereços IPv4 via dump rtnetlink.
+
+    Returns:
+        Lista de (índice, interface, "ip/prefixo") na ordem do kernel
+    """
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_CLOEXEC, NETLINK_ROUTE)
+    try:
+        sock.settimeout(1.0)
+        body = IFADDRMSG.pack(socket.AF_INET, 0, 0, 0, 0)
+        sock.send(NLMSG_HEADER.pack(NLMSG_HEADER.size + len(body), RTM_GETADDR,
+                                    NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + body)
+        addresses = []
+        while True:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + NLMSG_HEADER.size <= len(data):
+                length, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+                if length < NLMSG_HEADER.size:
+                    return addresses
+                if msg_type == NLMSG_DONE:
+                    return addresses
+                if msg_type == NLMSG_ERROR:
+                    raise OSError("rtnetlink: RTM_GETADDR recusado")
+                if msg_type == RTM_NEWADDR:
+                    entry = _parse_addr(data[offset + NLMSG_HEADER.size:offset + length])
+                    if entry:
+                        addresses.append(entry)
+                offset += _align(length)
+    finally:
+        sock.close()
+
+
+def _parse_addr(msg):
+    """Converte uma mensagem RTM_NEWADDR em (índice, interface, cidr)."""
+    family, prefix, _, _, index = IFADDRMSG.unpack_from(msg)
+    if family != socket.AF_INET:
+        return None
+    attrs = {}
+    offset = IFADDRMSG.size
+    while offset + RTATTR.size <= len(msg):
+        length, attr_type = RTATTR.unpack_from(msg, offset)
+        if length < RTATTR.size:
+            break
+        attrs[attr_type] = msg[offset + RTATTR.size:offset + length]
+        offset += _align(length)
+    # IFA_LOCAL é o endereço da interface; IFA_ADDRESS difere em ponto a ponto
+    raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+    if not raw:
+        return None
+    try:
+        name = socket.if_indextoname(index)
+    except OSError:
+        name = attrs.get(IFA_LABEL, b"").rstrip(b"\0").decode(errors="replace")
+    return index, name, f"{socket.inet_ntoa(raw[:4])}/{prefix}"
+
+
+def _ioctl_addresses():
+    """Endereços IPv4 via /proc/net/dev + ioctl (um endereço por interface)."""
+    try:
+        with open("/proc/net/dev") as f:
+            names = [line.split(":", 1)[0].strip() for line in f.read().splitlines()[2:]]
+    except OSError:
+        names = [name for _, name in socket.if_nameindex()]
+    addresses = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for name in names:
+            request = struct.pack("256s", name.encode()[:15])
+            try:
+                addr = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)[20:24]
+                mask = fcntl.ioctl(sock.fileno(), SIOCGIFNETMASK, request)[20:24]
+                index = socket.if_nametoindex(name)
+            except OSError:
+                continue  # Sem IPv4 ou interface removida
+            prefix = ipaddress.IPv4Network(f"0.0.0.0/{socket.inet_ntoa(mask)}").prefixlen
+            addresses.append((index, name, f"{socket.inet_ntoa(addr)}/{prefix}"))
+    return addresses
+
+
+class InterfaceState:
+    """Endereços IPv4 por interface, em cache e atualizados por notificação."""
+
+    def __init__(self):
+        self.version = 0  # Incrementado quando os endereços mudam
+        self._addresses = {}
+        self._fd = None
+        self._pid = None
+        self._dirty = True
+        self._expires = 0.0
+        self._netlink = True
+
+    @property
+    def backend(self):
+        return "netlink" if self._netlink else "ioctl"
+
+    def _open(self):
+        """Socket de notificações (no primeiro uso e após fork)."""
+        self._close()
+        self._pid = os.getpid()
+        self._dirty = True
+        if not self._netlink:
+            return
+        try:
+            sock = socket.socket(socket.AF_NETLINK,
+                                 socket.SOCK_RAW | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+                                 NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR))
+            self._fd = sock
+        except (OSError, AttributeError):
+            self._netlink = False
+
+    def _close(self):
+        if self._fd is not None:
+            self._fd.close()
+            self._fd = None
+
+    def _drain(self):
+        """Consome as notificações pendentes; True se houve alguma."""
+        changed = False
+        while True:
+            try:
+                if not self._fd.recv(65536):
+                    break
+                changed = True
+            except BlockingIOError:
+                break
+            except OSError:
+                # ENOBUFS: notificações perdidas, relê tudo
+                changed = True
+                break
+        return changed
+
+    def _refresh(self):
+        addresses = None
+        if self._netlink:
+            try:
+                addresses = _netlink_dump()
+            except OSError as e:
+                print(f"⚠️  rtnetlink indisponível ({e}), usando ioctl")
+                self._netlink = False
+                self._close()
+        if addresses is None:
+            addresses = _ioctl_addresses()
+        # Mesma ordem do `ip addr` (índice da interface); o último endereço vale
+        current = {}
+        for _, name, cidr in sorted(addresses, key=lambda entry: entry[0]):
+            current[name] = cidr
+        if current != self._addresses:
+            self._addresses = current
+            self.version += 1
+        self._dirty = False
+        self._expires = time.monotonic() + (NETLINK_TTL if self._netlink else POLL_TTL)
+
+    def ipv4(self):
+        """
+        Interfaces IPv4 ativas (inclusive lo).
+
+        Returns:
+            Dicionário {interface: "ip/prefixo"} (não modificar)
+        """
+        if self._pid != os.getpid():
+            self._open()
+        if self._fd is not None and self._drain():
+            self._dirty = True
+        if self._dirty or time.monotonic() >= self._expires:
+            self._refresh()
+        return self._addresses
+
+    def close(self):
+        self._close()
+        self._pid = None
+
+
+INTERFACES = InterfaceState()
+
+
+if __name__ == "__main__":
+    state = InterfaceState()
+    t0 = time.perf_counter()
+    addresses = state.ipv4()
+    print(f"🌐 {state.backend}: {(time.perf_counter() - t0) * 1000:.2f} ms")
+    for name, cidr in addresses.items():
+        print(f"   {name:<10} {cidr}")
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        state.ipv4()
+    print(f"⏱️  consulta em cache: {(time.perf_counter() - t0) * 1000:.1f} µs")
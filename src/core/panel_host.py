@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Host de painéis: menu e painéis num único processo de longa duração.
+
+Antes, o menu fazia execvp() do painel e o painel voltava com
+subprocess.run(["sudo", "python3", ".../touch_menu_visual.py"]): cada
+ida e volta empilhava mais um interpretador (com NumPy e PIL
+recarregados) sob o anterior. Aqui cada painel é um plugin com ciclo
+de vida:
+
+    start(display)  assume a tela (recursos caros ficam em cache entre usos)
+    step()          desenha um frame; retorna os segundos até o próximo
+    stop()          libera o que não deve continuar rodando (ex.: nmap)
+
+Os painéis são importados na primeira vez que são abertos e reutilizados
+depois, então trocar de painel leva milissegundos e a memória não cresce.
+O loop principal espera pelo toque (epoll) até o próximo frame: um toque
+é tratado assim que chega, sem polling.
+
+Botões cujo script não é um plugin rodam isolados num processo filho,
+criado por fork() do zygote (core.zygote) quando ele está rodando; o
+host espera o filho terminar e volta ao menu.
+"""
+
+import os
+import sys
+import time
+import importlib
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SRC_DIR)
+from core.display import Display
+from core.evdev import PressDetector, PRESS, STALE
+from core.latency import TRACER, TRACE_ENV
+from core.touch_broker import open_touch_source
+from core.supervisor import SUPERVISOR
+from core.zygote import spawn, report_launch
+
+MENU = "menu"
+
+# Plugins: chave -> (diretório em src/, módulo, classe)
+PANELS = {
+    MENU: ("core", "touch_menu_visual", "TouchMenu"),
+    "sysinfo": ("modules", "painelv3", "SysInfoPanel"),
+    "gif": ("modules", "painel_gif", "GifPanel"),
+    "network": ("network/painelip", "panel", "NetworkPanel"),
+}
+
+# Definida no filho de run_isolated(): o painel roda sozinho e sai no toque
+ISOLATED_ENV = "PAINEL_ISOLATED"
+
+DEFAULT_INTERVAL = 0.1  # Segundos entre frames quando step() não informa
+ERROR_INTERVAL = 1.0    # Espera após um erro em step()
+REOPEN_DELAY = 0.5      # Primeira espera para reabrir a fonte de toque
+REOPEN_MAX_DELAY = 8.0  # Espera máxima entre tentativas (dobra a cada falha)
+
+
+class PanelHost:
+    """Executa o menu e os painéis no mesmo processo."""
+
+    def __init__(self, initial=MENU, panels=None, exit_on_return=False):
+        """
+        Args:
+            initial: Painel exibido ao iniciar
+            panels: Instâncias já criadas {chave: painel} (ex.: o próprio
+                script em execução, para não importá-lo duas vezes)
+            exit_on_return: Toque num painel encerra o host em vez de
+                voltar ao menu (processo isolado)
+        """
+        self.initial = initial
+        self.panels = dict(panels or {})
+        self.exit_on_return = exit_on_return
+        self.display = None
+        self.source = None
+        self.presses = PressDetector(threshold=100)
+        self.current_key = None
+        self.current = None
+        self.running = False
+        self._press = None
+        self._next_step = 0.0
+        self._reopen_at = 0.0
+        self._reopen_delay = REOPEN_DELAY
+
+    def _load(self, key):
+        """Instância do painel (importada e criada só na primeira vez)."""
+        panel = self.panels.get(key)
+        if panel is None:
+            directory, module_name, class_name = PANELS[key]
+            path = os.path.join(SRC_DIR, directory)
+            if path not in sys.path:
+                sys.path.append(path)
+            t0 = time.monotonic()
+            module = importlib.import_module(module_name)
+            panel = getattr(module, class_name)()
+            self.panels[key] = panel
+            print(f"📦 Painel '{key}' carregado em {(time.monotonic() - t0) * 1000:.0f} ms")
+        return panel
+
+    def switch(self, key):
+        """Para o painel atual e inicia outro."""
+        t0 = time.monotonic()
+        if self.current is not None:
+            try:
+                self.current.stop()
+            except Exception as e:
+                print(f"⚠️  Erro parando '{self.current_key}': {e}")
+        self.current = None
+        try:
+            panel = self._load(key)
+            panel.start(self.display)
+        except Exception as e:
+            print(f"❌ Erro iniciando '{key}': {e}")
+            if key == MENU or self.exit_on_return:
+                raise
+            return self.switch(MENU)
+        self.current_key = key
+        self.current = panel
+        # Toques que começaram antes da troca não valem para o novo painel
+        self.presses.reset()
+        self._next_step = 0.0
+        print(f"🔀 Painel '{key}' em {(time.monotonic() - t0) * 1000:.1f} ms")
+
+    def run_isolated(self, script):
+        """Roda um script fora do host e volta ao menu quando ele termina."""
+        if self.current is not None:
+            self.current.stop()
+            self.current = None
+        self.display.clear()
+        # Toque repassado por handled(handoff=True): vai para o filho, não fica no host
+        env = dict(os.environ)
+        os.environ.pop(TRACE_ENV, None)
+        env[ISOLATED_ENV] = "1"
+        print(f"⚡ Executando isolado: {script}")
+        try:
+            SUPERVISOR.wait(SUPERVISOR.adopt(spawn(script, env=env), script))
+        except OSError as e:
+            print(f"❌ Erro executando {script}: {e}")
+        self.switch(MENU)
+
+    def _on_sample(self, sample):
+        result = self.presses.feed(sample)
+        if result is None:
+            return
+        TRACER.touch(sample)
+        if result == STALE:
+            TRACER.ignored("toque_anterior")
+        elif result == PRESS:
+            self._press = sample
+
+    def _handle_press(self, sample):
+        if self.current_key != MENU:
+            # Toque em qualquer painel volta ao menu
+            print("🔴 TOQUE DETECTADO - VOLTANDO AO MENU!")
+            TRACER.handled()
+            if self.exit_on_return:
+                self.running = False
+            else:
+                self.switch(MENU)
+            return
+
+        button = self.current.button_at(sample.x, sample.y)
+        if button is None:
+            TRACER.ignored("fora_dos_botoes")
+            return
+        key = button.get("panel")
+        if key in PANELS:
+            TRACER.handled()
+            self.switch(key)
+        else:
+            # A resposta é o primeiro frame do script, não a tela preta do host
+            TRACER.handled(handoff=True)
+            self.run_isolated(button["script"])
+
+    def _open_source(self):
+        """Abre a fonte de toque (broker ou dispositivo); False se falhou."""
+        try:
+            self.source = open_touch_source()
+        except OSError as e:
+            print(f"❌ Fonte de toque indisponível: {e} (nova tentativa em {self._reopen_delay:.1f} s)")
+            self.source = None
+            self._reopen_at = time.monotonic() + self._reopen_delay
+            self._reopen_delay = min(REOPEN_MAX_DELAY, self._reopen_delay * 2)
+            return False
+        self.source.subscribe(self._on_sample)
+        self._reopen_delay = REOPEN_DELAY
+        return True
+
+    def _poll_touch(self, timeout):
+        """
+        Espera por toque até timeout. Se o broker cair ou reiniciar, a fonte
+        é reaberta com espera crescente e os frames continuam enquanto isso.
+        """
+        if self.source is None:
+            if time.monotonic() < self._reopen_at or not self._open_source():
+                time.sleep(min(timeout, max(0.0, self._reopen_at - time.monotonic())))
+                return
+        try:
+            self.source.poll(timeout)
+        except OSError as e:  # Inclui ConnectionError do TouchClient
+            print(f"⚠️  Fonte de toque perdida: {e}")
+            try:
+                self.source.close()
+            except OSError:
+                pass
+            self.source = None
+            self.presses.reset()
+            self._reopen_at = time.monotonic() + self._reopen_delay
+
+    def run(self):
+        """Loop principal: toques via epoll, frames no ritmo de cada painel."""
+        TRACER.install()
+        self.display = Display()
+        self._open_source()
+        self.running = True
+        first_frame = True
+        try:
+            self.switch(self.initial)
+            while self.running:
+                # Espera por toque até a hora do próximo frame
+                self._poll_touch(max(0.0, self._next_step - time.monotonic()))
+                if self._press is not None:
+                    sample, self._press = self._press, None
+                    self._handle_press(sample)
+                    continue
+                if time.monotonic() < self._next_step:
+                    continue
+                try:
+                    delay = self.current.step()
+                except Exception as e:
+                    print(f"❌ Erro no painel '{self.current_key}': {e}")
+                    delay = ERROR_INTERVAL
+                self._next_step = time.monotonic() + (DEFAULT_INTERVAL if delay is None else delay)
+                if first_frame:
+                    first_frame = False
+                    report_launch()
+        except KeyboardInterrupt:
+            print("\n🛑 Host encerrado")
+        finally:
+            self.close()
+
+    def close(self):
+        self.running = False
+        if self.current is not None:
+            try:
+                self.current.stop()
+            except Exception:
+                pass
+            self.current = None
+        SUPERVISOR.stop_all()
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+        if self.display is not None:
+            self.display.clear()
+            self.display.close()
+            self.display = None
+
+
+def run_standalone(key, panel=None):
+    """
+    Ponto de entrada dos scripts dos painéis.
+
+    Rodando direto, o painel abre dentro de um host (o toque leva ao menu
+    no mesmo processo). Lançado por run_isolated(), roda sozinho e sai.
+    """
+    panels = {key: panel} if panel is not None else None
+    isolated = bool(os.environ.pop(ISOLATED_ENV, ""))
+    PanelHost(initial=key, panels=panels, exit_on_return=isolated).run()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Supervisor de processos: encerra exatamente o que foi iniciado.
+
+Substitui as varreduras `sudo pkill -f python3.*painel`, que abrem um
+sudo, percorrem a tabela de processos inteira, podem acertar processos
+alheios e deixam para trás filhos (nmap) de quem foi morto. Cada filho
+roda num grupo de processos próprio (setsid); o supervisor guarda o
+PID, encerra o grupo inteiro com SIGTERM e, vencido o prazo, SIGKILL,
+recolhe o processo (sem zumbis) e informa tempo de CPU e pico de RSS.
+
+Serviços de longa duração (broker de toque, zygote, menu) são
+registrados em arquivos de PID; o início do processo (/proc/PID/stat)
+é conferido antes de qualquer sinal, então um PID reaproveitado não é
+atingido.
+
+Uso (scripts/start_menu.sh):
+    python3 src/core/supervisor.py stop                  # todos os registrados
+    python3 src/core/supervisor.py start touch_broker -- python3 src/core/touch_broker.py
+    python3 src/core/supervisor.py register menu $$
+    python3 src/core/supervisor.py status
+"""
+
+import os
+import time
+import signal
+import subprocess
+
+RUN_DIR = os.environ.get("PAINEL_RUN_DIR", "/tmp/painel-run")
+STOP_TIMEOUT = 2.0    # Segundos entre SIGTERM e SIGKILL
+POLL_INTERVAL = 0.02  # Verificação do grupo durante o encerramento
+
+
+def proc_start_time(pid):
+    """Instante de início do processo (ticks desde o boot), ou None se não existe."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # O nome (campo 2) pode ter espaços: os campos seguintes vêm após ')'
+    return int(stat.rsplit(")", 1)[1].split()[19])
+
+
+def group_alive(pgid):
+    """True se ainda há algum processo no grupo."""
+    try:
+        os.killpg(pgid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def signal_target(pid, pgid, sig):
+    """Sinaliza o grupo quando o processo é líder dele; senão, só o processo."""
+    try:
+        if pgid == pid and pgid != os.getpgrp():
+            os.killpg(pgid, sig)
+        else:
+            os.kill(pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def terminate_group(pid, pgid, timeout=STOP_TIMEOUT, reap=None):
+    """
+    SIGTERM, espera até o prazo, depois SIGKILL.
+
+    Args:
+        reap: Função chamada a cada volta para recolher o líder (filho
+            direto); sem ela, só a existência do grupo é verificada
+
+    Returns:
+        True se foi preciso SIGKILL
+    """
+    def alive():
+        if reap is not None:
+            reap()
+        if pgid == pid:
+            return group_alive(pgid)
+        return proc_start_time(pid) is not None
+
+    signal_target(pid, pgid, signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not alive():
+            return False
+        time.sleep(POLL_INTERVAL)
+    signal_target(pid, pgid, signal.SIGKILL)
+    deadline = time.monotonic() + 1.0
+    while alive() and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+    return True
+
+
+class Child:
+    """Processo acompanhado pelo supervisor."""
+
+    def __init__(self, proc, name):
+        self.proc = proc
+        self.name = name
+        self.pid = proc.pid
+        try:
+            self.pgid = os.getpgid(proc.pid)
+        except ProcessLookupError:
+            self.pgid = None
+        self.started = time.monotonic()
+        self.returncode = None
+        self.cpu = None       # Segundos (usuário + sistema)
+        self.max_rss = None   # KB
+
+    def report(self):
+        runtime = time.monotonic() - self.started
+        usage = ""
+        if self.cpu is not None:
+            usage = f", CPU {self.cpu:.2f} s, pico RSS {self.max_rss / 1024:.1f} MB"
+        print(f"📊 {self.name} (pid {self.pid}): saída {self.returncode}{usage}, {runtime:.1f} s")
+
+
+class Supervisor:
+    """Acompanha os grupos de processos iniciados por este processo."""
+
+    def __init__(self):
+        self.children = {}  # pid -> Child
+
+    def start(self, cmd, name=None, **kwargs):
+        """Inicia cmd em sessão própria e passa a acompanhá-lo."""
+        kwargs.setdefault("start_new_session", True)
+        return self.adopt(subprocess.Popen(cmd, **kwargs), name or os.path.basename(cmd[0]))
+
+    def adopt(self, proc, name=None):
+        """
+        Acompanha um processo já iniciado em sessão própria: Popen (filho
+        direto) ou ZygoteProcess (filho do zygote, que informa o rusage).
+        """
+        self.children[proc.pid] = Child(proc, name or str(proc.pid))
+        return proc
+
+    def _collect(self, child, block=False):
+        """Recolhe o processo se terminou; retorna o código de saída ou None."""
+        if child.returncode is not None:
+            return child.returncode
+        proc = child.proc
+        if isinstance(proc, subprocess.Popen):
+            if proc.returncode is None:
+                try:
+                    pid, status, usage = os.wait4(proc.pid, 0 if block else os.WNOHANG)
+                except ChildProcessError:
+                    # Recolhido por outra via (Popen.wait/communicate): sem rusage
+                    pid, status, usage = proc.pid, 0, None
+                if pid == 0:
+                    return None
+                proc.returncode = os.waitstatus_to_exitcode(status)
+                if usage is not None:
+                    child.cpu = usage.ru_utime + usage.ru_stime
+                    child.max_rss = usage.ru_maxrss
+        else:
+            if (proc.wait() if block else proc.poll()) is None:
+                return None
+            usage = getattr(proc, "rusage", None)
+            if usage:
+                child.cpu = usage["cpu"]
+                child.max_rss = usage["max_rss"]
+        child.returncode = proc.returncode
+        self.children.pop(child.pid, None)
+        child.report()
+        return child.returncode
+
+    def _child(self, proc):
+        child = self.children.get(proc.pid)
+        if child is None:
+            child = Child(proc, str(proc.pid))
+            self.children[proc.pid] = child
+        return child
+
+    def poll(self, proc):
+        """Como Popen.poll(), registrando CPU e RSS ao recolher."""
+        if proc.returncode is not None and proc.pid not in self.children:
+            return proc.returncode
+        return self._collect(self._child(proc))
+
+    def wait(self, proc):
+        """Espera o processo terminar (bloqueante)."""
+        if proc.returncode is not None and proc.pid not in self.children:
+            return proc.returncode
+        return self._collect(self._child(proc), block=True)
+
+    def stop(self, proc, timeout=STOP_TIMEOUT):
+        """Encerra o grupo do processo (SIGTERM → SIGKILL) e o recolhe."""
+        if proc.returncode is not None and proc.pid not in self.children:
+            return proc.returncode
+        child = self._child(proc)
+        try:
+            # Filho do zygote: o setsid() pode ter ocorrido depois do adopt()
+            child.pgid = os.getpgid(child.pid)
+        except ProcessLookupError:
+            pass
+        if self._collect(child) is not None and (child.pgid is None or not group_alive(child.pgid)):
+            return child.returncode
+        if child.pgid is not None:
+            killed = terminate_group(child.pid, child.pgid, timeout,
+                                     reap=lambda: self._collect(child))
+            if killed:
+                print(f"💀 {child.name} (pid {child.pid}) não saiu em {timeout:.1f} s: SIGKILL")
+        if child.pid in self.children:
+            self._collect(child, block=True)
+        return child.returncode
+
+    def reap(self):
+        """Recolhe todos os acompanhados que já terminaram."""
+        for child in list(self.children.values()):
+            self._collect(child)
+
+    def stop_all(self, timeout=STOP_TIMEOUT):
+        for child in list(self.children.values()):
+            self.stop(child.proc, timeout)
+
+
+SUPERVISOR = Supervisor()
+
+
+def _pidfile(name):
+    return os.path.join(RUN_DIR, f"{name}.pid")
+
+
+def register(name, pid):
+    """Registra um serviço de longa duração (PID e instante de início)."""
+    os.makedirs(RUN_DIR, exist_ok=True)
+    with open(_pidfile(name), "w") as f:
+        f.write(f"{pid} {proc_start_time(pid)}\n")
+
+
+def registered():
+    """Serviços registrados: {nome: (pid, início)}."""
+    services = {}
+    try:
+        names = sorted(os.listdir(RUN_DIR))
+    except FileNotFoundError:
+        return services
+    for entry in names:
+        if not entry.endswith(".pid"):
+            continue
+        try:
+            with open(os.path.join(RUN_DIR, entry)) as f:
+                pid, start = f.read().split()
+            services[entry[:-4]] = (int(pid), int(start) if start != "None" else None)
+        except (OSError, ValueError):
+            continue
+    return services
+
+
+def stop_registered(name, pid, start, timeout=STOP_TIMEOUT):
+    """Encerra um serviço registrado se o PID ainda é o mesmo processo."""
+    try:
+        os.unlink(_pidfile(name))
+    except FileNotFoundError:
+        pass
+    if start is None or proc_start_time(pid) != start:
+        return False
+    try:
+        pgid = os.getpgid(pid)
+    except ProcessLookupError:
+        return False
+    print(f"🛑 Encerrando {name} (pid {pid})")
+    terminate_group(pid, pgid, timeout)
+    return True
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Serviços do painel acompanhados por PID")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    start = sub.add_parser("start", help="Inicia um serviço em sessão própria e o registra")
+    start.add_argument("name")
+    start.add_argument("cmd", nargs=argparse.REMAINDER, help="-- comando")
+
+    reg = sub.add_parser("register", help="Registra um processo já em execução")
+    reg.add_argument("name")
+    reg.add_argument("pid", type=int)
+
+    stop = sub.add_parser("stop", help="Encerra serviços registrados (todos, sem nomes)")
+    stop.add_argument("names", nargs="*")
+    stop.add_argument("--timeout", type=float, default=STOP_TIMEOUT)
+
+    sub.add_parser("status", help="Lista os serviços registrados")
+
+    args = parser.parse_args()
+    if args.command == "start":
+        cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+        if not cmd:
+            parser.error("informe o comando após --")
+        proc = subprocess.Popen(cmd, start_new_session=True)
+        register(args.name, proc.pid)
+        print(f"🚀 {args.name} (pid {proc.pid})")
+    elif args.command == "register":
+        register(args.name, args.pid)
+    elif args.command == "stop":
+        services = registered()
+        for name in args.names or list(services):
+            if name in services:
+                stop_registered(name, *services[name], timeout=args.timeout)
+    else:
+        for name, (pid, start) in registered().items():
+            alive = start is not None and proc_start_time(pid) == start
+            print(f"{'🟢' if alive else '⚪'} {name}: pid {pid}{'' if alive else ' (encerrado)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Broker de toque: um único dono do touchscreen para o menu e os painéis.
+
+O broker abre o dispositivo uma vez (opcionalmente com EVIOCGRAB, para
+que nenhum outro leitor concorra pelos eventos) e repassa cada amostra
+por um socket Unix SOCK_SEQPACKET apenas ao cliente em primeiro plano.
+O primeiro plano é uma pilha: o cliente conectado mais recentemente
+recebe os toques e, quando ele sai, o anterior volta a recebê-los. Assim
+o menu e o painel que ele lançou nunca veem o mesmo toque.
+
+Uso:
+    sudo python3 src/core/touch_broker.py [--device /dev/input/eventN] [--grab]
+    sudo python3 src/core/touch_broker.py --stats
+
+O socket só aceita o mesmo usuário do broker (permissão 600 e
+SO_PEERCRED): quem conecta pode assumir o primeiro plano e receber
+todos os toques.
+
+Protocolo (uma mensagem por datagrama):
+    cliente -> broker: b"FG" (assume o primeiro plano), b"BG", b"STATS"
+    broker -> cliente: b"T" + SAMPLE (amostra) ou b"J" + JSON (estatísticas)
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import select
+import socket
+import struct
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.evdev import EvdevReader, TouchSample, find_touch_device
+
+BROKER_SOCKET = os.environ.get("PAINEL_TOUCH_SOCKET", "/tmp/painel-touch.sock")
+
+# x, y, pressão, tocando, timestamp do kernel, horário de envio do broker
+SAMPLE = struct.Struct("<iii?dd")
+MSG_SAMPLE = b"T"
+MSG_STATS = b"J"
+
+REOPEN_DELAY = 1.0  # Espera antes de reabrir o dispositivo após erro
+
+
+class LatencyStats:
+    """Contadores simples de latência (média e máximo, em ms)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        ms = seconds * 1000
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max, 2),
+        }
+
+
+class _Client:
+    """Conexão de um painel/menu no broker."""
+
+    def __init__(self, conn, pid):
+        self.conn = conn
+        self.pid = pid
+        self.delivered = 0
+        self.dropped = 0
+
+
+def _peer_creds(conn):
+    """(pid, uid) do processo do outro lado do socket (SO_PEERCRED)."""
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    pid, uid, _ = struct.unpack("3i", creds)
+    return pid, uid
+
+
+class TouchBroker:
+    """Lê o touchscreen e entrega as amostras ao cliente em primeiro plano."""
+
+    def __init__(self, device=None, socket_path=BROKER_SOCKET, grab=False):
+        self.device = device or find_touch_device()
+        self.socket_path = socket_path
+        self.grab = grab
+        self.reader = None
+        self.server = None
+        self.epoll = None
+        self.clients = {}      # fd -> _Client
+        self.foreground = []   # pilha de fds; o último recebe os toques
+        self.running = False
+
+        # Estatísticas
+        self.started = time.time()
+        self.kernel_to_broker = LatencyStats()
+        self.forwarded = 0
+        self.discarded = 0  # Amostras sem cliente em primeiro plano
+        self.dropped = 0    # Envios que falharam (socket cheio)
+
+    def _open_device(self):
+        self.reader = EvdevReader(self.device)
+        self.reader.open()
+        if self.grab:
+            try:
+                self.reader.grab()
+                print("🔒 Acesso exclusivo ao touchscreen (EVIOCGRAB)")
+            except OSError as e:
+                print(f"⚠️  EVIOCGRAB indisponível: {e}")
+        self.reader.subscribe(self._dispatch)
+        self.epoll.register(self.reader.fd, select.EPOLLIN)
+
+    def _close_device(self):
+        if self.reader is not None:
+            try:
+                self.epoll.unregister(self.reader.fd)
+            except (OSError, ValueError):
+                pass
+            self.reader.close()
+            self.reader = None
+
+    def _listen(self):
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.server.bind(self.socket_path)
+        # Quem conecta recebe os toques: só o mesmo usuário do broker
+        os.chmod(self.socket_path, 0o600)
+        self.server.listen(8)
+        self.server.setblocking(False)
+        self.epoll.register(self.server.fileno(), select.EPOLLIN)
+
+    def _accept(self):
+        conn, _ = self.server.accept()
+        try:
+            pid, uid = _peer_creds(conn)
+        except OSError:
+            conn.close()
+            return
+        if uid != os.getuid():
+            print(f"🚫 Conexão recusada (pid {pid}, uid {uid})")
+            conn.close()
+            return
+        conn.setblocking(False)
+        client = _Client(conn, pid)
+        self.clients[conn.fileno()] = client
+        self.epoll.register(conn.fileno(), select.EPOLLIN)
+
+    def _disconnect(self, fd):
+        client = self.clients.pop(fd, None)
+        if client is None:
+            return
+        if fd in self.foreground:
+            self.foreground.remove(fd)
+        try:
+            self.epoll.unregister(fd)
+        except (OSError, ValueError):
+            pass
+        client.conn.close()
+        print(f"👋 Cliente saiu (pid {client.pid}): {client.delivered} toques, "
+              f"{client.dropped} descartados")
+
+    def _handle_request(self, fd):
+        client = self.clients[fd]
+        try:
+            data = client.conn.recv(64)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._disconnect(fd)
+            return
+        command = data.strip().upper()
+        if command == b"FG":
+            if fd in self.foreground:
+                self.foreground.remove(fd)
+            self.foreground.append(fd)
+            print(f"👆 Primeiro plano: pid {client.pid}")
+        elif command == b"BG":
+            if fd in self.foreground:
+                self.foreground.remove(fd)
+        elif command == b"STATS":
+            self._send(client, MSG_STATS + json.dumps(self.stats()).encode())
+
+    def _send(self, client, message):
+        """Envio não bloqueante; se o cliente não está lendo, descarta."""
+        try:
+            client.conn.send(message)
+            return True
+        except (BlockingIOError, ConnectionError):
+            client.dropped += 1
+            self.dropped += 1
+            return False
+
+    def _dispatch(self, sample):
+        """Callback do leitor: repassa a amostra ao cliente em primeiro plano."""
+        now = time.monotonic()
+        self.kernel_to_broker.add(now - sample.timestamp)
+        if not self.foreground:
+            self.discarded += 1
+            return
+        client = self.clients[self.foreground[-1]]
+        if self._send(client, MSG_SAMPLE + SAMPLE.pack(*sample, now)):
+            client.delivered += 1
+            self.forwarded += 1
+
+    def stats(self):
+        """Estatísticas de latência e perdas do broker."""
+        reader = self.reader
+        return {
+            "device": self.device,
+            "grab": self.grab,
+            "uptime_s": round(time.time() - self.started, 1),
+            "samples": reader.samples if reader else 0,
+            "kernel_dropped": reader.dropped if reader else 0,
+            "forwarded": self.forwarded,
+            "discarded": self.discarded,
+            "dropped": self.dropped,
+            "kernel_to_broker": self.kernel_to_broker.as_dict(),
+            "clients": [
+                {"pid": c.pid, "foreground": fd == (self.foreground[-1] if self.foreground else None),
+                 "delivered": c.delivered, "dropped": c.dropped}
+                for fd, c in self.clients.items()
+            ],
+        }
+
+    def serve_forever(self):
+        """Loop principal (epoll sobre dispositivo, socket e clientes)."""
+        self.epoll = select.epoll()
+        self._listen()
+        print(f"📡 Broker de toque em {self.socket_path} ({self.device})")
+        self.running = True
+        try:
+            while self.running:
+                if self.reader is None:
+                    try:
+                        self._open_device()
+                    except OSError as e:
+                        print(f"❌ Erro abrindo {self.device}: {e}")
+                        self.reader = None
+                        time.sleep(REOPEN_DELAY)
+                        continue
+
+                for fd, _ in self.epoll.poll(1.0):
+                    if self.reader is not None and fd == self.reader.fd:
+                        try:
+                            self.reader.process()
+                        except OSError as e:
+                            # Dispositivo sumiu (ex.: ENODEV): reabre
+                            print(f"❌ Erro lendo toque: {e}")
+                            self._close_device()
+                    elif fd == self.server.fileno():
+                        self._accept()
+                    elif fd in self.clients:
+                        self._handle_request(fd)
+        finally:
+            self.close()
+
+    def close(self):
+        self.running = False
+        for fd in list(self.clients):
+            self._disconnect(fd)
+        self._close_device()
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+        if self.epoll is not None:
+            self.epoll.close()
+            self.epoll = None
+
+
+class TouchClient:
+    """
+    Cliente do broker com a mesma interface do EvdevReader.
+
+    Os painéis usam subscribe()/poll()/close() sem saber se os toques
+    vêm do broker ou direto do dispositivo.
+    """
+
+    def __init__(self, socket_path=BROKER_SOCKET, foreground=True):
+        self.socket_path = socket_path
+        self.foreground = foreground
+        self.sock = None
+        self.epoll = None
+        self.subscribers = []
+        self.running = False
+        self._stats_reply = None
+
+        # Estatísticas locais
+        self.samples = 0
+        self.kernel_to_client = LatencyStats()
+
+    def open(self):
+        """Conecta ao broker (OSError se ele não estiver rodando)."""
+        if self.sock is not None:
+            return
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            sock.connect(self.socket_path)
+            if self.foreground:
+                sock.send(b"FG")
+        except OSError:
+            sock.close()
+            raise
+        sock.setblocking(False)
+        self.sock = sock
+        self.epoll = select.epoll()
+        self.epoll.register(sock.fileno(), select.EPOLLIN)
+
+    def close(self):
+        if self.epoll is not None:
+            self.epoll.close()
+            self.epoll = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def subscribe(self, callback):
+        """Registra callback(sample) chamado a cada amostra recebida."""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def _receive(self):
+        """Lê todas as mensagens pendentes e entrega as amostras."""
+        samples = []
+        while True:
+            try:
+                data = self.sock.recv(4096)
+            except BlockingIOError:
+                break
+            if not data:
+                raise ConnectionError(errno.EPIPE, "broker de toque encerrou")
+            kind, payload = data[:1], data[1:]
+            if kind == MSG_SAMPLE:
+                x, y, pressure, touching, timestamp, _ = SAMPLE.unpack(payload)
+                self.kernel_to_client.add(time.monotonic() - timestamp)
+                samples.append(TouchSample(x, y, pressure, touching, timestamp))
+            elif kind == MSG_STATS:
+                self._stats_reply = json.loads(payload)
+        self.samples += len(samples)
+        for sample in samples:
+            for callback in list(self.subscribers):
+                callback(sample)
+        return samples
+
+    def poll(self, timeout=None):
+        """
+        Aguarda amostras do broker (até timeout segundos) e as entrega.
+
+        Returns:
+            Lista de TouchSample lidas nesta chamada
+        """
+        self.open()
+        if not self.epoll.poll(-1 if timeout is None else timeout):
+            return []
+        return self._receive()
+
+    def broker_stats(self, timeout=2.0):
+        """Pede as estatísticas ao broker (dicionário ou None)."""
+        self.open()
+        self._stats_reply = None
+        self.sock.send(b"STATS")
+        deadline = time.monotonic() + timeout
+        while self._stats_reply is None and time.monotonic() < deadline:
+            self.poll(max(0.0, deadline - time.monotonic()))
+        return self._stats_reply
+
+
+def open_touch_source(device=None, socket_path=BROKER_SOCKET):
+    """
+    Fonte de toque para menu/painéis: o broker, se estiver rodando, ou o
+    dispositivo direto (a detecção do touchscreen só roda neste caso).
+
+    Returns:
+        TouchClient ou EvdevReader já aberto
+    """
+    client = TouchClient(socket_path)
+    try:
+        client.open()
+        print(f"📡 Toque via broker ({socket_path})")
+        return client
+    except OSError:
+        pass
+    reader = EvdevReader(device or find_touch_device())
+    reader.open()
+    return reader
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Broker de eventos do touchscreen")
+    parser.add_argument("--device", help="Dispositivo evdev (padrão: detecção automática)")
+    parser.add_argument("--socket", default=BROKER_SOCKET, help="Caminho do socket Unix")
+    parser.add_argument("--grab", action="store_true", help="Acesso exclusivo (EVIOCGRAB)")
+    parser.add_argument("--stats", action="store_true", help="Mostra as estatísticas do broker em execução")
+    args = parser.parse_args()
+
+    if args.stats:
+        client = TouchClient(args.socket, foreground=False)
+        try:
+            stats = client.broker_stats()
+        except OSError as e:
+            print(f"❌ Broker não encontrado em {args.socket}: {e}")
+            sys.exit(1)
+        finally:
+            client.close()
+        print(json.dumps(stats, indent=2, ensure_ascii=False))
+        return
+
+    broker = TouchBroker(args.device, args.socket, args.grab)
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Broker encerrado")
+
+
+if __name__ == "__main__":
+    main()
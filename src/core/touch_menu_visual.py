@@ -3,47 +3,25 @@
 TOUCHSCREEN MENU COM GIF E BOTÕES VISUAIS
 - Lado esquerdo: GIF animado (toda a altura)
 - Lado direito: 3 botões verticais com imagens e texto
-- Touch interativo para executar scripts
+- Touch interativo para abrir os painéis (no mesmo processo, via core.panel_host)
 """
 
 import os
 import sys
 import time
-import signal
-import struct
-import subprocess
 import threading
-from threading import Lock
 from PIL import Image, ImageDraw, ImageFont
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.animation import IndexedFrame
+from core.assets import load_frames
+
+# Referência para medir o tempo até o primeiro frame do menu
+_MODULE_T0 = time.monotonic()
+
 # Configurações
 SCREEN_WIDTH = 480
 SCREEN_HEIGHT = 320
-FRAMEBUFFER = "/dev/fb0"
-# Configuração do touchscreen - detecta automaticamente
-def find_touch_device():
-    """Encontra automaticamente o dispositivo de touchscreen"""
-    import glob
-    for event_path in glob.glob('/dev/input/event*'):
-        try:
-            event_name = event_path.split('/')[-1]  # ex: event2
-            name_path = f'/sys/class/input/{event_name}/device/name'
-            with open(name_path, 'r') as f:
-                device_name = f.read().strip()
-            
-            # Procura por dispositivos de touchscreen conhecidos
-            if any(touch_name in device_name.lower() for touch_name in 
-                   ['ads7846', 'touchscreen', 'touch', 'ft6236', 'goodix']):
-                print(f"✅ Touchscreen encontrado: {event_path} ({device_name})")
-                return event_path
-        except:
-            continue
-    
-    # Fallback para event0 se não encontrar
-    print("⚠️  Usando fallback: /dev/input/event0")
-    return '/dev/input/event0'
-
-TOUCH_DEVICE = find_touch_device()
 
 # Layout
 LEFT_PANEL_WIDTH = 320   # Lado esquerdo para GIF (reduzido de 400 para dar mais espaço ao GIF)
@@ -51,16 +29,45 @@ RIGHT_PANEL_WIDTH = 160  # Lado direito para botões (aumentado para acomodar bo
 BUTTON_HEIGHT = 60       # Altura de cada botão (reduzido de 100 para 60)
 BUTTON_MARGIN = 8        # Margem entre botões (aumentado para melhor espaçamento)
 
-# Processo atual
-current_process = None
-process_lock = threading.Lock()
+# GIF do menu
+GIF_PATH = "/home/dw/painel/assets/narutowalking.gif"
+GIF_SIZE = (LEFT_PANEL_WIDTH - 20, 280)
+GIF_DECODE_CHUNK = 4     # Frames decodificados por tarefa do pool
+
+def _resize_gif_frame(gif):
+    """Copia o frame atual do GIF no tamanho do menu, paletizado (índices + LUT)."""
+    frame = gif.copy()
+    frame = frame.resize(GIF_SIZE, Image.Resampling.LANCZOS)
+    if frame.mode != 'RGB':
+        frame = frame.convert('RGB')
+    return IndexedFrame.from_image(frame)
+
+def _decode_gif_chunk(path, start, end):
+    """Decodifica e redimensiona os frames [start, end) (roda no pool)."""
+    frames = []
+    with Image.open(path) as gif:
+        for index in range(start, end):
+            gif.seek(index)
+            frames.append(_resize_gif_frame(gif))
+    return start, frames
+
+def _process_age():
+    """Segundos desde o início do processo (via /proc), ou None."""
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
 
 class TouchMenu:
     """Menu touchscreen com GIF e botões visuais."""
     
     def __init__(self):
-        self.running = False
-        self.paused = False
+        self.display = None
+        self.first_frame = True
         self.gif_frames = []
         self.gif_frame_index = 0
         self.gif_last_update = 0
@@ -69,35 +76,85 @@ class TouchMenu:
         self._create_buttons()
         
     def _load_gif(self):
-        """Carrega frames do GIF."""
+        """
+        Carrega o GIF de forma preguiçosa.
+
+        Só o primeiro frame é decodificado aqui, para o menu aparecer logo.
+        Os demais são decodificados e redimensionados num pool de processos
+        e entram na animação conforme ficam prontos.
+        """
         try:
-            gif_path = "/home/dw/painel/assets/narutowalking.gif"
-            if os.path.exists(gif_path):
-                gif = Image.open(gif_path)
-                self.gif_frames = []
-                
-                try:
-                    while True:
-                        # Redimensiona frame para caber no lado esquerdo
-                        frame = gif.copy()
-                        frame = frame.resize((LEFT_PANEL_WIDTH - 20, 280), Image.Resampling.LANCZOS)
-                        
-                        # Converte para RGB se necessário
-                        if frame.mode != 'RGB':
-                            frame = frame.convert('RGB')
-                            
-                        self.gif_frames.append(frame)
-                        gif.seek(gif.tell() + 1)
-                        
-                except EOFError:
-                    pass
-                    
-                print(f"📽️  GIF carregado: {len(self.gif_frames)} frames")
-            else:
-                print(f"⚠️  GIF não encontrado: {gif_path}")
-                
+            if not os.path.exists(GIF_PATH):
+                print(f"⚠️  GIF não encontrado: {GIF_PATH}")
+                return
+
+            # Frames pré-compilados (mmap): todos prontos, sem decodificar nada
+            compiled = load_frames(GIF_PATH, GIF_SIZE, fit="resize")
+            if compiled:
+                self.gif_frames = compiled[0]
+                print(f"📽️  GIF pré-compilado: {len(self.gif_frames)} frames")
+                return
+
+            with Image.open(GIF_PATH) as gif:
+                total = getattr(gif, "n_frames", 1)
+                first = _resize_gif_frame(gif)
+
+            self.gif_frames = [first] + [None] * (total - 1)
+            print(f"📽️  GIF: primeiro frame pronto, {total - 1} em decodificação")
+            if total > 1:
+                self._decode_remaining_frames(total)
+
         except Exception as e:
             print(f"❌ Erro carregando GIF: {e}")
+
+    def _decode_remaining_frames(self, total):
+        """Distribui os frames restantes do GIF num pool de processos."""
+        started = time.monotonic()
+        chunks = [(start, min(start + GIF_DECODE_CHUNK, total))
+                  for start in range(1, total, GIF_DECODE_CHUNK)]
+
+        def on_done(future):
+            try:
+                start, frames = future.result()
+            except Exception as e:
+                print(f"❌ Erro decodificando frames do GIF: {e}")
+                return
+            for offset, frame in enumerate(frames):
+                self.gif_frames[start + offset] = frame
+            if all(f is not None for f in self.gif_frames):
+                elapsed = (time.monotonic() - started) * 1000
+                print(f"📽️  GIF carregado: {total} frames ({elapsed:.0f} ms em segundo plano)")
+
+        try:
+            # Só no cache frio: concurrent.futures/multiprocessing pesam na partida
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # forkserver: fork() deste processo, com a thread do leitor de toque
+            # ativa, pode travar um worker num lock herdado
+            pool = ProcessPoolExecutor(max_workers=min(len(chunks), os.cpu_count() or 1),
+                                       mp_context=multiprocessing.get_context("forkserver"))
+            for start, end in chunks:
+                pool.submit(_decode_gif_chunk, GIF_PATH, start, end).add_done_callback(on_done)
+            # Não bloqueia: as tarefas pendentes continuam até terminar
+            pool.shutdown(wait=False)
+        except (OSError, NotImplementedError, ValueError) as e:
+            # Sem suporte a multiprocessing (ou a forkserver): decodifica numa thread
+            print(f"⚠️  Pool indisponível ({e}), decodificando em thread")
+            def decode_all():
+                for start, end in chunks:
+                    _, frames = _decode_gif_chunk(GIF_PATH, start, end)
+                    for offset, frame in enumerate(frames):
+                        self.gif_frames[start + offset] = frame
+            threading.Thread(target=decode_all, daemon=True).start()
+
+    def _next_gif_frame_index(self):
+        """Próximo frame já decodificado (pula os que ainda estão no pool)."""
+        total = len(self.gif_frames)
+        for step in range(1, total + 1):
+            index = (self.gif_frame_index + step) % total
+            if self.gif_frames[index] is not None:
+                return index
+        return self.gif_frame_index
     
     def _create_buttons(self):
         """Cria os 3 botões do lado direito."""
@@ -106,6 +163,7 @@ class TouchMenu:
             {
                 "name": "Who am i?",
                 "script": "src/modules/painelv3.py",  # Caminho correto
+                "panel": "sysinfo",  # Plugin do core.panel_host
                 "icon": "📊",
                 "color": (240, 120, 0),
                 "description": "SYSTEM INFO"
@@ -113,6 +171,7 @@ class TouchMenu:
             {
                 "name": "Take a time", 
                 "script": "src/modules/painel_gif.py",  # Caminho correto
+                "panel": "gif",
                 "icon": "🎬",
                 "color": (44, 90, 160),
                 "description": "GIFs"
@@ -120,6 +179,7 @@ class TouchMenu:
             {
                 "name": "Scan Ninja",
                 "script": "src/network/painelip/painel_ips.py",  # Caminho correto
+                "panel": "network",
                 "icon": "🌐",
                 "color": (28, 28, 28),
                 "description": "SYSTEM NETWORK"
@@ -127,6 +187,7 @@ class TouchMenu:
             {
                 "name": "BLOCKED",
                 "script": "src/modules/painel_gif.py",  # Caminho correto
+                "panel": "gif",
                 "icon": "🌐",
                 "color": (88, 120, 80),
                 "description": "Verify CAM"
@@ -144,6 +205,7 @@ class TouchMenu:
                 "height": BUTTON_HEIGHT,
                 "name": config["name"],
                 "script": config["script"],
+                "panel": config.get("panel"),
                 "icon": config["icon"],
                 "color": config["color"],
                 "description": config["description"],
@@ -225,14 +287,14 @@ class TouchMenu:
             # Atualiza frame do GIF a cada 100ms
             current_time = time.time() * 1000
             if current_time - self.gif_last_update > 100:
-                self.gif_frame_index = (self.gif_frame_index + 1) % len(self.gif_frames)
+                self.gif_frame_index = self._next_gif_frame_index()
                 self.gif_last_update = current_time
             
             # Cola frame atual do GIF
             gif_frame = self.gif_frames[self.gif_frame_index]
             gif_x = 10
             gif_y = (SCREEN_HEIGHT - gif_frame.height) // 2
-            img.paste(gif_frame, (gif_x, gif_y))
+            img.paste(gif_frame.to_image(), (gif_x, gif_y))
             
         else:
             # Placeholder se GIF não carregou
@@ -265,90 +327,13 @@ class TouchMenu:
         
         return img
     
-    def _write_to_framebuffer(self, image):
-        """Escreve imagem no framebuffer."""
-        try:
-            rgb565_data = bytearray()
-            pixels = image.load()
-            
-            for y in range(SCREEN_HEIGHT):
-                for x in range(SCREEN_WIDTH):
-                    r, g, b = pixels[x, y]
-                    r565 = (r >> 3) & 0x1F
-                    g565 = (g >> 2) & 0x3F  
-                    b565 = (b >> 3) & 0x1F
-                    rgb565 = (r565 << 11) | (g565 << 5) | b565
-                    rgb565_data.append(rgb565 & 0xFF)
-                    rgb565_data.append((rgb565 >> 8) & 0xFF)
-            
-            with open(FRAMEBUFFER, 'wb') as fb:
-                fb.write(rgb565_data)
-                fb.flush()
-                
-        except Exception as e:
-            print(f"❌ Erro no framebuffer: {e}")
-    
-    def _read_touch(self):
-        """Monitora eventos de toque."""
-        try:
-            last_touch_time = 0
-            
-            with open(TOUCH_DEVICE, 'rb') as f:
-                current_x = 0
-                current_y = 0
-                
-                while self.running:
-                    data = f.read(24)
-                    if len(data) < 24:
-                        continue
-                        
-                    sec, usec, type_, code, value = struct.unpack('llHHi', data)
-                    
-                    
-                    if self.paused:
-                        continue
-
-                    if type_ == 3:  # EV_ABS
-                        if code == 0:  # ABS_X
-                            current_x = value
-                        elif code == 1:  # ABS_Y
-                            current_y = value
-                        elif code == 24 and value > 100:  # Pressão
-                            current_time = time.time()
-                            
-                            # Debounce: ignora toques muito rápidos
-                            if current_time - last_touch_time < 0.8:
-                                continue
-                                
-                            last_touch_time = current_time
-                            
-                            if current_x > 0:
-                                screen_x, screen_y = self._coordinate_mapper(current_x, current_y)
-                                self._handle_touch(current_x, current_y, screen_x, screen_y)
-                                
-        except Exception as e:
-            print(f"❌ Erro lendo toque: {e}")
-    
-    def _handle_touch(self, raw_x, raw_y, screen_x, screen_y):
-        """Processa eventos de toque."""
-        global current_process
-        
-        # Se menu está pausado (script rodando), IGNORA completamente os toques
-        if self.paused:
-            print("⏸️  Menu pausado - toque ignorado")
-            return
-        
+    def button_at(self, raw_x, raw_y):
+        """Botão sob o toque (coordenadas raw do touch), ou None."""
+        if raw_x <= 0:
+            return None
+        screen_x, screen_y = self._coordinate_mapper(raw_x, raw_y)
         print(f"📍 TOQUE: RAW({raw_x},{raw_y}) -> TELA({screen_x},{screen_y})")
         
-        # Se há processo rodando, para ele
-        with process_lock:
-            if current_process and current_process.poll() is None:
-                print("🛑 Parando processo atual...")
-                current_process.terminate()
-                current_process = None
-                print("🔄 Voltando ao menu...")
-                return
-        
         # Verifica qual botão foi tocado
         for button in self.buttons:
             x1, y1 = button["x"], button["y"]
@@ -356,152 +341,45 @@ class TouchMenu:
             
             if x1 <= screen_x <= x2 and y1 <= screen_y <= y2:
                 print(f"✅ BOTÃO {button['number']} TOCADO: {button['name']}")
-                self._execute_script(button["script"], button["name"])
-                return
+                return button
         
         print(f"❌ Toque fora dos botões")
-    
-    def _execute_script(self, script, name):
-        """Executa script selecionado."""
-        print(f"🚀 EXECUTANDO: {name}")
-        
-        # Primeiro pausa apenas a renderização para executar
-        self.paused = True
-
-        try:
-            # Executa script e aguarda toque para voltar
-            self._run_script_and_wait(script, name)
-            
-        except Exception as e:
-            print(f"❌ Erro: {e}")
-        
-        finally:
-            # SEMPRE volta ao menu após execução
-            print("🔄 Script finalizado - retornando ao menu...")
-            self._restart_menu()
+        return None
 
-    def _run_script_and_wait(self, script, name):
-        """Executa script e termina o menu (script controlará seu próprio retorno)."""
-        print(f"⚡ Executando: {script}")
-        print(f"🛑 Menu encerrando - {name} assumirá controle")
-        
-        # Sempre muda para o diretório base do projeto
-        os.chdir("/home/dw/painel")
-        
-        # Executa script com caminho completo
-        cmd = ["python3", script]
-        
-        # Limpa a tela antes de executar
-        with open(FRAMEBUFFER, 'wb') as fb:
-            fb.write(b'\x00\x00' * (SCREEN_WIDTH * SCREEN_HEIGHT))
-        
-        # Executa script e encerra este menu
-        os.execvp("python3", cmd)
+    def start(self, display):
+        """Assume a tela (chamado pelo host ao voltar ao menu)."""
+        self.display = display
+        if self.first_frame:
+            print("🎯 TOUCHSCREEN MENU COM GIF")
+            print("=" * 40)
+            for button in self.buttons:
+                x1, y1 = button["x"], button["y"]
+                x2, y2 = x1 + button["width"], y1 + button["height"]
+                print(f"   {button['name']}: {button['description']}")
+                print(f"      Posição: ({x1},{y1}) até ({x2},{y2})")
+            print()
 
-    def _restart_menu(self):
-        """Reinicia o menu principal."""
-        print("🔄 REINICIANDO MENU...")
-        
-        # Mata TODOS os processos relacionados (exceto o próprio menu)
-        try:
-            subprocess.run(["sudo", "pkill", "-f", "python3.*painel_"], 
-                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            subprocess.run(["sudo", "pkill", "-f", "python3.*painelv"], 
-                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except:
-            pass
-        
-        # Limpa tela completamente
-        try:
-            with open(FRAMEBUFFER, 'wb') as fb:
-                fb.write(b'\x00\x00' * (SCREEN_WIDTH * SCREEN_HEIGHT))
-        except:
-            pass
-        
-        # Aguarda 3 segundos para evitar detecção do mesmo toque
-        print("⏳ Aguardando para evitar toque duplo...")
-        time.sleep(3)
-        
-        # Limpa buffer de toque - lê e descarta eventos pendentes
-        try:
-            with open(TOUCH_DEVICE, 'rb') as f:
-                f.read(1024)  # Lê e descarta qualquer evento pendente
-        except:
-            pass
-        
-        # Reinicia o menu
-        self.running = True
-        self.paused = False
-        print("✅ MENU REINICIADO!")
+    def step(self):
+        """Desenha e envia um frame do menu."""
+        self.display.show_image(self._draw_menu())
+        if self.first_frame:
+            self.first_frame = False
+            self._report_first_frame()
+        return 0.1  # 10 FPS
 
-    def _force_return_to_menu(self):
-        """Força retorno ao menu."""
-        print("🔄 VOLTANDO AO MENU...")
-        
-        # Mata qualquer processo restante
-        try:
-            subprocess.run(["sudo", "pkill", "-f", "python3.*painel"], 
-                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except:
-            pass
-        
-        # Limpa tela
-        try:
-            with open(FRAMEBUFFER, 'wb') as fb:
-                fb.write(b'\x00\x00' * (SCREEN_WIDTH * SCREEN_HEIGHT))
-        except:
-            pass
-        
-        time.sleep(1)
-        
-        # Volta ao menu
-        self.paused = False
-        print("✅ MENU RESTAURADO!")
-    
-    def start(self):
-        """Inicia o menu touchscreen."""
-        print("🎯 TOUCHSCREEN MENU COM GIF")
-        print("=" * 40)
-        print("📽️  Lado esquerdo: GIF animado")
-        print("🔘 Lado direito: 3 botões interativos")
-        print("👆 Toque nos botões para executar")
-        print()
-        
-        self.running = True
-        
-        # Thread para monitorar toques
-        touch_thread = threading.Thread(target=self._read_touch)
-        touch_thread.daemon = True
-        touch_thread.start()
-        
-        print("📱 Menu iniciado!")
-        for button in self.buttons:
-            x1, y1 = button["x"], button["y"]
-            x2, y2 = x1 + button["width"], y1 + button["height"]
-            print(f"   {button['name']}: {button['description']}")  # Removido o ícone
-            print(f"      Posição: ({x1},{y1}) até ({x2},{y2})")
-        print()
-        
-        # Loop principal - renderiza menu
-        try:
-            while self.running:
-                if not self.paused:
-                    menu_image = self._draw_menu()
-                    self._write_to_framebuffer(menu_image)
-                time.sleep(0.1)  # 10 FPS
-                
-        except KeyboardInterrupt:
-            print("\n🛑 Menu interrompido")
-        
-        self.stop()
-    
     def stop(self):
-        """Para o menu."""
-        self.running = False
-        
-        # Limpa tela
-        with open(FRAMEBUFFER, 'wb') as fb:
-            fb.write(b'\x00\x00' * (SCREEN_WIDTH * SCREEN_HEIGHT))
+        """Nada a liberar: GIF e botões ficam prontos para a volta."""
+        self.display = None
+    
+    def _report_first_frame(self):
+        """Mostra o tempo até o primeiro frame do menu chegar à tela."""
+        since_import = (time.monotonic() - _MODULE_T0) * 1000
+        since_start = _process_age()
+        if since_start is not None:
+            print(f"⏱️  Primeiro frame do menu: {since_start * 1000:.0f} ms desde o início "
+                  f"do processo ({since_import:.0f} ms após os imports)")
+        else:
+            print(f"⏱️  Primeiro frame do menu: {since_import:.0f} ms após os imports")
 
 def main():
     """Função principal."""
@@ -509,22 +387,9 @@ def main():
         print("⚠️  Execute como root: sudo python3 touch_menu_visual.py")
         return
     
-    if not os.path.exists(TOUCH_DEVICE):
-        print(f"❌ Touch não encontrado: {TOUCH_DEVICE}")
-        return
-    
-    # Signal handler para saída limpa
-    def signal_handler(signum, frame):
-        print("\n🛑 Saindo...")
-        with open(FRAMEBUFFER, 'wb') as fb:
-            fb.write(b'\x00\x00' * (SCREEN_WIDTH * SCREEN_HEIGHT))
-        sys.exit(0)
-    
-    signal.signal(signal.SIGINT, signal_handler)
-    
-    # Inicia menu
-    menu = TouchMenu()
-    menu.start()
+    from core.panel_host import PanelHost, MENU
+    # Menu e painéis no mesmo processo; o toque troca de painel sem exec
+    PanelHost(initial=MENU, panels={MENU: TouchMenu()}).run()
 
 if __name__ == "__main__":
     main()
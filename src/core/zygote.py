@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Zygote: processo pré-aquecido que faz fork() de cada painel isolado.
+
+Um `python3 painel.py` frio paga a partida do interpretador e os imports
+de NumPy, PIL, fontes e módulos do painelip antes do primeiro frame. O
+zygote faz tudo isso uma vez e fica esperando num socket Unix; a cada
+pedido ele faz fork() e o filho executa o script (runpy) já com tudo
+importado.
+
+O cliente envia o pedido em JSON junto com seus stdin/stdout/stderr
+(SCM_RIGHTS), então a saída do painel aparece no terminal de quem pediu.
+A conexão fica aberta até o filho terminar e recebe o código de saída.
+
+Uso:
+    sudo python3 src/core/zygote.py                # servidor
+    sudo python3 src/core/zygote.py --bench src/modules/painelv3.py -n 5
+"""
+
+import os
+
+# Antes de importar NumPy: sem threads do OpenBLAS no processo que faz fork()
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+import sys
+import json
+import time
+import errno
+import runpy
+import atexit
+import select
+import signal
+import socket
+import struct
+import subprocess
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+sys.path.append(SRC_DIR)
+from core.supervisor import terminate_group
+
+ZYGOTE_SOCKET = os.environ.get("PAINEL_ZYGOTE_SOCKET", "/tmp/painel-zygote.sock")
+
+# Horário (CLOCK_MONOTONIC) do pedido de lançamento, repassado ao painel
+LAUNCH_T0_ENV = "PAINEL_LAUNCH_T0"
+# Arquivo onde o painel anota os ms até o primeiro frame (usado no --bench)
+LAUNCH_REPORT_ENV = "PAINEL_LAUNCH_REPORT"
+
+# Módulos e diretórios pré-carregados
+PRELOAD_PATHS = ["modules", "network/painelip"]
+PRELOAD_MODULES = [
+    "numpy", "PIL.Image", "PIL.ImageDraw", "PIL.ImageFont", "PIL.ImageSequence",
+    "core.animation", "core.assets", "core.display", "core.evdev", "core.fbwriter",
+    "core.latency", "core.netif", "core.panel_host", "core.touch_broker",
+    "config", "models", "network", "snapshot", "sweep", "ui", "panel",
+    "gif_playlist", "painel_gif", "painelv3",
+]
+PRELOAD_FONTS = [
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", (16, 18, 24, 28)),
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", (10, 12, 18)),
+]
+
+MAX_REQUEST = 64 * 1024
+REAP_INTERVAL = 0.5  # Sem pidfd: intervalo da verificação de filhos
+
+
+def preload():
+    """Importa tudo o que os painéis usam (roda uma vez no zygote)."""
+    import importlib
+    t0 = time.monotonic()
+    for path in PRELOAD_PATHS:
+        full = os.path.join(SRC_DIR, path)
+        if full not in sys.path:
+            sys.path.append(full)
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"⚠️  Pré-carga de {name} falhou: {e}")
+    try:
+        from PIL import ImageFont
+        for path, sizes in PRELOAD_FONTS:
+            for size in sizes:
+                ImageFont.truetype(path, size)
+    except OSError as e:
+        print(f"⚠️  Fontes não pré-carregadas: {e}")
+    print(f"🧬 Zygote pronto: pré-carga em {(time.monotonic() - t0) * 1000:.0f} ms")
+
+
+def _send(conn, message):
+    try:
+        conn.sendall(json.dumps(message).encode() + b"\n")
+    except OSError:
+        pass
+
+
+class Zygote:
+    """Servidor de fork: atende pedidos de lançamento de painéis."""
+
+    def __init__(self, socket_path=ZYGOTE_SOCKET):
+        self.socket_path = socket_path
+        self.server = None
+        self.epoll = None
+        self.children = {}  # pid -> (conexão, pidfd ou None)
+        self.pidfds = {}    # pidfd -> pid
+        self.running = False
+
+    def _listen(self):
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        # Quem fala com o zygote executa código como o zygote: só o mesmo usuário
+        os.chmod(self.socket_path, 0o600)
+        self.server.listen(8)
+        self.epoll.register(self.server.fileno(), select.EPOLLIN)
+
+    def _peer_uid(self, conn):
+        creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        return struct.unpack("3i", creds)[1]
+
+    def _accept(self):
+        conn, _ = self.server.accept()
+        try:
+            if self._peer_uid(conn) != os.getuid():
+                conn.close()
+                return
+            conn.settimeout(2.0)
+            data, fds, _, _ = socket.recv_fds(conn, MAX_REQUEST, 3)
+            request = json.loads(data)
+            conn.settimeout(None)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Pedido inválido: {e}")
+            conn.close()
+            return
+
+        pid = os.fork()
+        if pid == 0:
+            self._run_child(conn, fds, request)  # não retorna
+        for fd in fds:
+            os.close(fd)
+
+        pidfd = None
+        try:
+            pidfd = os.pidfd_open(pid)
+            self.pidfds[pidfd] = pid
+            self.epoll.register(pidfd, select.EPOLLIN)
+        except (AttributeError, OSError):
+            pidfd = None
+        self.children[pid] = (conn, pidfd)
+        _send(conn, {"pid": pid})
+        print(f"🧬 fork: {os.path.basename(request.get('script', '?'))} (pid {pid})")
+
+    def _run_child(self, conn, fds, request):
+        """Filho: restaura o ambiente de um processo novo e roda o script."""
+        code = 0
+        try:
+            os.setsid()
+            # Handlers herdados do zygote não são do script; os dele rodam na saída
+            atexit._clear()
+            for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGCHLD, signal.SIGUSR1):
+                signal.signal(sig, signal.SIG_DFL)
+            self.server.close()
+            self.epoll.close()
+            for other, _ in self.children.values():
+                other.close()
+            for pidfd in self.pidfds:
+                os.close(pidfd)
+            conn.close()
+            for target, fd in enumerate(fds[:3]):
+                os.dup2(fd, target)
+                os.close(fd)
+
+            script = os.path.join(ROOT_DIR, request["script"])
+            os.environ.clear()
+            os.environ.update(request.get("env", {}))
+            os.chdir(request.get("cwd") or ROOT_DIR)
+            sys.argv = [script] + list(request.get("args", []))
+            latency = sys.modules.get("core.latency")
+            if latency is not None:
+                # Pré-carregado no zygote: nome e toque repassado são do script
+                latency.TRACER.reset()
+            sys.path.insert(0, os.path.dirname(script))
+            runpy.run_path(script, run_name="__main__")
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            code = 1
+        finally:
+            try:
+                # os._exit pula o atexit: roda os do script (ex.: histograma do
+                # core.latency) sem executar a limpeza do processo zygote
+                atexit._run_exitfuncs()
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(code)
+
+    def _reap(self, pid):
+        """Recolhe o filho e informa o código de saída ao cliente."""
+        if pid not in self.children:
+            return
+        usage = None
+        try:
+            done, status, usage = os.wait4(pid, os.WNOHANG)
+        except ChildProcessError:
+            done, status = pid, 0
+        if done == 0:
+            return
+        conn, pidfd = self.children.pop(pid)
+        if pidfd is not None:
+            self.pidfds.pop(pidfd, None)
+            try:
+                self.epoll.unregister(pidfd)
+            except (OSError, ValueError):
+                pass
+            os.close(pidfd)
+        message = {"exit": os.waitstatus_to_exitcode(status)}
+        if usage is not None:
+            # Tempo de CPU e pico de RSS (KB) para o supervisor de quem pediu
+            message["cpu"] = usage.ru_utime + usage.ru_stime
+            message["max_rss"] = usage.ru_maxrss
+        _send(conn, message)
+        conn.close()
+
+    def serve_forever(self):
+        self.epoll = select.epoll()
+        self._listen()
+        print(f"🧬 Zygote em {self.socket_path}")
+        self.running = True
+        try:
+            while self.running:
+                for fd, _ in self.epoll.poll(REAP_INTERVAL):
+                    if fd == self.server.fileno():
+                        self._accept()
+                    elif fd in self.pidfds:
+                        self._reap(self.pidfds[fd])
+                # Sem pidfd (kernel antigo): verificação periódica
+                for pid, (_, pidfd) in list(self.children.items()):
+                    if pidfd is None:
+                        self._reap(pid)
+        finally:
+            self.close()
+
+    def close(self):
+        self.running = False
+        # Painéis em execução não sobrevivem ao zygote
+        for pid in list(self.children):
+            terminate_group(pid, pid, reap=lambda pid=pid: self._reap(pid))
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+        if self.epoll is not None:
+            self.epoll.close()
+            self.epoll = None
+
+
+class ZygoteProcess:
+    """Filho do zygote com a interface de subprocess.Popen usada aqui."""
+
+    def __init__(self, conn, pid):
+        self.conn = conn
+        self.pid = pid
+        self.returncode = None
+        self.rusage = None
+        self._buffer = b""
+
+    def _read_exit(self, timeout):
+        self.conn.settimeout(timeout)
+        try:
+            while b"\n" not in self._buffer:
+                data = self.conn.recv(4096)
+                if not data:
+                    # Zygote caiu: sem código de saída
+                    self.returncode = -1
+                    return
+                self._buffer += data
+        except (socket.timeout, BlockingIOError):
+            return
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        message = json.loads(line)
+        self.returncode = message.get("exit", -1)
+        if "cpu" in message:
+            self.rusage = {"cpu": message["cpu"], "max_rss": message["max_rss"]}
+        self.conn.close()
+
+    def poll(self):
+        if self.returncode is None:
+            self._read_exit(0)
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if self.returncode is None:
+            self._read_exit(timeout)
+            if self.returncode is None:
+                raise subprocess.TimeoutExpired(str(self.pid), timeout)
+        return self.returncode
+
+    def send_signal(self, sig):
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+def spawn(script, args=(), env=None, cwd=None, socket_path=ZYGOTE_SOCKET):
+    """
+    Lança um script de painel: fork do zygote se ele estiver rodando,
+    senão um `python3` frio. O filho sempre ganha sessão própria (setsid).
+
+    Args:
+        script: Caminho relativo à raiz do projeto (ex.: src/modules/painelv3.py)
+
+    Returns:
+        ZygoteProcess ou subprocess.Popen
+    """
+    t0 = time.monotonic()
+    env = dict(os.environ if env is None else env)
+    env[LAUNCH_T0_ENV] = f"{t0:.6f}"
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_path)
+        request = {"script": script, "args": list(args), "env": env, "cwd": cwd}
+        socket.send_fds(conn, [json.dumps(request).encode()], [0, 1, 2])
+        reply = b""
+        while b"\n" not in reply:
+            data = conn.recv(4096)
+            if not data:
+                raise ConnectionError(errno.EPIPE, "zygote encerrou a conexão")
+            reply += data
+        line, rest = reply.split(b"\n", 1)
+        proc = ZygoteProcess(conn, json.loads(line)["pid"])
+        proc._buffer = rest
+        print(f"🧬 {script}: fork em {(time.monotonic() - t0) * 1000:.1f} ms (pid {proc.pid})")
+        return proc
+    except (OSError, ValueError, KeyError):
+        conn.close()
+
+    path = os.path.join(ROOT_DIR, script)
+    print(f"⚡ Zygote indisponível, iniciando {script} a frio")
+    return subprocess.Popen([sys.executable, path] + list(args), env=env,
+                            cwd=cwd or ROOT_DIR, start_new_session=True)
+
+
+def report_launch():
+    """
+    Chamado pelo painel após o primeiro frame: mostra (e anota, se
+    pedido) o tempo desde o pedido de lançamento.
+    """
+    t0 = os.environ.pop(LAUNCH_T0_ENV, None)
+    if not t0:
+        return
+    try:
+        elapsed = (time.monotonic() - float(t0)) * 1000
+    except ValueError:
+        return
+    print(f"⏱️  Painel pronto {elapsed:.0f} ms após o pedido de lançamento")
+    report = os.environ.get(LAUNCH_REPORT_ENV)
+    if report:
+        with open(report, "a") as f:
+            f.write(f"{elapsed:.1f}\n")
+
+
+def bench(script, runs, socket_path):
+    """Compara lançamento a frio com fork do zygote até o primeiro frame."""
+    import tempfile
+    from core.touch_broker import BROKER_SOCKET
+
+    workdir = tempfile.mkdtemp(prefix="painel-bench-")
+    fb = os.path.join(workdir, "fb.raw")
+    fifo = os.path.join(workdir, "touch.fifo")
+    with open(fb, "wb") as f:
+        f.write(b"\x00\x00" * (480 * 320))
+    os.mkfifo(fifo)
+    report = os.path.join(workdir, "launch.txt")
+    env = dict(os.environ, PAINEL_FB=fb, PAINEL_TOUCH_DEVICE=fifo,
+               PAINEL_TOUCH_SOCKET=BROKER_SOCKET + ".bench", PAINEL_ISOLATED="1")
+    env[LAUNCH_REPORT_ENV] = report
+
+    def measure(launch):
+        times = []
+        for _ in range(runs):
+            open(report, "w").close()
+            proc = launch()
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline and proc.poll() is None:
+                with open(report) as f:
+                    values = f.read().split()
+                if values:
+                    times.append(float(values[0]))
+                    break
+                time.sleep(0.005)
+            proc.terminate()
+            try:
+                proc.wait(5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        return times
+
+    def cold():
+        e = dict(env, **{LAUNCH_T0_ENV: f"{time.monotonic():.6f}"})
+        return subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, script)], env=e,
+                                cwd=ROOT_DIR, start_new_session=True,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def forked():
+        return spawn(script, env=env, socket_path=socket_path)
+
+    for label, launch in (("a frio", cold), ("zygote", forked)):
+        times = measure(launch)
+        if times:
+            print(f"📊 {label:>7}: média {sum(times) / len(times):.0f} ms, "
+                  f"mín {min(times):.0f} ms, máx {max(times):.0f} ms ({len(times)} execuções)")
+        else:
+            print(f"📊 {label:>7}: nenhuma execução chegou ao primeiro frame")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Zygote de lançamento dos painéis")
+    parser.add_argument("--socket", default=ZYGOTE_SOCKET, help="Caminho do socket Unix")
+    parser.add_argument("--bench", metavar="SCRIPT",
+                        help="Mede o lançamento (a frio vs. zygote em execução) até o primeiro frame")
+    parser.add_argument("-n", type=int, default=5, help="Execuções por modo no --bench")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench, args.n, args.socket)
+        return
+
+    preload()
+    zygote = Zygote(args.socket)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        zygote.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        print("\n🛑 Zygote encerrado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Playlist de GIFs com recarga incremental.
+
+Observa GIF_DIR (inotify, ou polling como fallback) e mantém um cache
+de animações já compiladas. GIFs novos entram na próxima volta da
+playlist, GIFs alterados têm apenas sua entrada invalidada e GIFs
+removidos saem do cache - a animação em reprodução continua até o fim,
+pois o player guarda sua própria referência.
+
+GIFs que não compilam (truncados, não-GIF) ficam registrados por
+(mtime, tamanho) e não são decodificados de novo a cada volta; o
+registro cai quando o arquivo muda ou é removido.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.animation import compile_delta_animation
+from core.assets import load_animation
+from core.dirwatch import DirectoryWatcher, REMOVED
+
+
+class GifPlaylist:
+    """Lista de GIFs do diretório com cache de animações compiladas."""
+
+    def __init__(self, gif_dir, width, height, rotate_deg=0):
+        self.gif_dir = gif_dir
+        self.width = width
+        self.height = height
+        self.rotate_deg = rotate_deg
+        self.watcher = DirectoryWatcher(gif_dir, suffix=".gif")
+        self.cache = {}
+        self.failed = {}  # caminho -> (mtime_ns, tamanho) do GIF que falhou
+        print(f"👀 Observando {gif_dir} ({self.watcher.backend})")
+
+    def paths(self):
+        """Caminhos atuais da playlist, em ordem."""
+        return [os.path.join(self.gif_dir, name) for name in self.watcher.files()]
+
+    def poll(self):
+        """Aplica mudanças do diretório ao cache (não bloqueia)."""
+        for name, kind in self.watcher.changes().items():
+            path = os.path.join(self.gif_dir, name)
+            if self.cache.pop(path, None) is not None:
+                print(f"♻️  Cache invalidado: {name}")
+            self.failed.pop(path, None)
+            if kind == REMOVED:
+                print(f"➖ GIF removido: {name}")
+            else:
+                print(f"➕ GIF novo/alterado: {name}")
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def known_bad(self, path):
+        """True se o GIF já falhou e não mudou desde então (ou sumiu)."""
+        if path not in self.failed:
+            return False
+        signature = self._signature(path)
+        if signature is None or signature == self.failed[path]:
+            return True
+        del self.failed[path]
+        return False
+
+    def mark_bad(self, path, error):
+        """Registra um GIF que não pôde ser lido (avisa uma vez só)."""
+        print(f"⚠️  GIF ignorado ({os.path.basename(path)}): {error}")
+        self.failed[path] = self._signature(path)
+
+    def get(self, path):
+        """
+        Retorna a animação compilada do GIF, compilando se necessário.
+
+        Returns:
+            DeltaAnimation ou None se o arquivo sumiu ou é inválido
+        """
+        anim = self.cache.get(path)
+        if anim is not None:
+            return anim
+        if self.known_bad(path):
+            return None
+        # Artefato pré-compilado (mmap); se ausente ou desatualizado, compila
+        anim = load_animation(path, self.width, self.height, self.rotate_deg)
+        if anim is None:
+            try:
+                anim = compile_delta_animation(path, self.width, self.height, self.rotate_deg)
+            except (OSError, ValueError) as e:
+                self.mark_bad(path, e)
+                return None
+        print(f"📦 {anim.report()}")
+        self.cache[path] = anim
+        return anim
+
+    def close(self):
+        self.watcher.close()
+        self.cache.clear()
+        self.failed.clear()
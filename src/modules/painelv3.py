@@ -1,20 +1,13 @@
 #!/usr/bin/env python3
-import os, re, time, glob, subprocess
-import numpy as np
+import os, re, sys, time, subprocess
 from PIL import Image, ImageDraw, ImageFont
-import subprocess
-
-# Importa módulo de detecção de toque
-try:
-    import sys
-    import os
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from core.touch_exit import setup_touch_exit
-    print("✅ Módulo touch_exit importado com sucesso")
-except Exception as e:
-    print(f"❌ Erro importando touch_exit: {e}")
-    import sys
-    sys.exit(1)
+
+# Importa módulos do core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.animation import rgb_to_rgb565
+from core.assets import Sprite, load_sprite, rotated_position
+from core.netif import INTERFACES
+from core.panel_host import run_standalone
 
 # ===== CONFIGS =====
 ROTATE_DEG = 0  # 0, 90, 180, 270
@@ -22,24 +15,12 @@ IMG_PATH   = "/home/dw/painel/assets/kakashicute.png"
 LOCATION_CACHE_FILE = "/home/dw/.painel_location_cache"  # Arquivo oculto seguro
 LOCATION_CACHE_DURATION = 3600  # 1 hora em segundos
 ENABLE_GEOLOCATION = False  # DESABILITADO por padrão por segurança
+INFO_REFRESH = 30  # SSID e local: relidos a cada 30 s ou quando os endereços mudam
 # ========RETURN IP=========
 def list_ipv4():
-    """Retorna dict iface->IP v4 (sem 127.0.0.1)."""
-    ips = {}
-    try:
-        out = subprocess.check_output(["ip", "-4", "-o", "addr", "show"], text=True)
-        # linhas tipo: "2: wlan0    inet 192.168.1.23/24 brd ..."
-        for line in out.splitlines():
-            parts = line.split()
-            if len(parts) >= 4 and parts[2] == "inet":
-                ip_cidr = parts[3]
-                ip = ip_cidr.split("/")[0]
-                iface = parts[1]
-                if ip != "127.0.0.1":
-                    ips[iface] = ip
-    except Exception:
-        pass
-    return ips
+    """Retorna dict iface->IP v4 (sem 127.0.0.1), do cache do core.netif."""
+    return {iface: cidr.split("/")[0] for iface, cidr in INTERFACES.ipv4().items()
+            if not cidr.startswith("127.0.0.1/")}
 
 def pick_ip():
     """Escolhe um IP “preferido”: wlan0 > eth0 > primeiro disponível."""
@@ -257,182 +238,134 @@ def read(path, as_int=False, default=None):
     except Exception:
         return default
 
-# -- achar /dev/fbN pelo nome do driver (não importa se vira fb0, fb2...)
-def find_fb_by_name(target="fb_ili9486"):
-    for p in glob.glob("/sys/class/graphics/fb*/name"):
+# ===== PAINEL =====
+FONT_BOLD_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+
+class SysInfoPanel:
+    """Painel de informações do sistema (plugin do core.panel_host)."""
+
+    def __init__(self):
+        self.display = None
+        self.font_big = None
+        self.font_small = None
+        self.logo_img = None
+        self.logo = None
+        self.frame_count = 0
+        # SSID e local custam um fork (iwgetid/nmcli/timedatectl): ficam em cache
+        self.wifi_name = None
+        self.location = None
+        self.info_at = 0.0
+        self.info_version = -1
+
+    def refresh_info(self):
+        """Relê SSID e local só após INFO_REFRESH ou mudança de endereços (core.netif)."""
+        now = time.monotonic()
+        if (self.wifi_name is not None and INTERFACES.version == self.info_version
+                and now - self.info_at < INFO_REFRESH):
+            return
+        self.wifi_name = get_wifi_network_name()
+        self.location = get_location()
+        self.info_at = now
+        self.info_version = INTERFACES.version
+
+    def start(self, display):
+        """Assume a tela; fontes e logo são carregados só na primeira vez."""
+        self.display = display
+        if self.font_big is not None:
+            return
+        self.font_big = ImageFont.truetype(FONT_BOLD_PATH, 28)
+        self.font_small = ImageFont.truetype(FONT_PATH, 18)
+
+        # logo: artefato pré-compilado (RGB565 pré-multiplicado, mmap) ou PNG original,
+        # carregado uma única vez em vez de a cada frame; o PNG só é decodificado
+        # sem artefato ou fora do modo 16bpp (colado com PIL)
+        self.logo = load_sprite(IMG_PATH, ROTATE_DEG)
+        if self.logo is not None:
+            print("🖼️  Logo pré-compilado carregado")
+        if (self.logo is None or display.bpp != 16) and os.path.exists(IMG_PATH):
+            self.logo_img = Image.open(IMG_PATH).convert("RGBA")
+            if self.logo is None:
+                self.logo = Sprite.from_image(self.logo_img, ROTATE_DEG)
+
+    def step(self):
+        """Desenha e envia um frame."""
+        self.frame_count += 1
+        width, height = self.display.size
         try:
-            if open(p).read().strip() == target:
-                fb = os.path.basename(os.path.dirname(p))  # "fb2"
-                return f"/dev/{fb}", int(fb[2:])
-        except Exception:
-            pass
-    raise RuntimeError(f"{target} não encontrado (confira dtoverlay=tft35a e SPI).")
-
-# -- obter largura/altura/bpp/stride de forma robusta
-def fb_geometry(fbdev):
-    idx = int(os.path.basename(fbdev)[2:])
-    # 1) tentar via fbset
-    w = h = None
-    try:
-        out = subprocess.check_output(["fbset", "-s", "-fb", fbdev], text=True)
-        m = re.search(r"geometry\s+(\d+)\s+(\d+)", out)
-        if m:
-            w, h = int(m.group(1)), int(m.group(2))
-    except Exception:
-        pass
-    # 2) fallback: alguns kernels têm virtual_size
-    if not (w and h):
-        vs = read(f"/sys/class/graphics/fb{idx}/virtual_size")
-        if vs and "," in vs:
-            a, b = vs.replace(" ", "").split(",")
-            w, h = int(a), int(b)
-    # 3) último recurso: padrão da MPI3501
-    if not (w and h):
-        w, h = 320, 480
-
-    bpp = read(f"/sys/class/graphics/fb{idx}/bits_per_pixel", as_int=True, default=16)
-    stride = (read(f"/sys/class/graphics/fb{idx}/stride", as_int=True) or
-              read(f"/sys/class/graphics/fb{idx}/fb_fix/line_length", as_int=True) or
-              w * (bpp // 8))
-    return w, h, bpp, stride
-
-# -- conversão RGB888 -> RGB565 (LE)
-def rgb_to_rgb565_le(pil_img):
-    arr = np.asarray(pil_img, dtype=np.uint8)  # [H,W,3]
-    r = (arr[..., 0] >> 3).astype(np.uint16)
-    g = (arr[..., 1] >> 2).astype(np.uint16)
-    b = (arr[..., 2] >> 3).astype(np.uint16)
-    rgb565 = (r << 11) | (g << 5) | b
-    lo = (rgb565 & 0xFF).astype(np.uint8)
-    hi = (rgb565 >> 8).astype(np.uint8)
-    out = np.stack([lo, hi], axis=-1)         # [H,W,2]
-    return out
-
-# ===== INICIALIZAÇÃO =====
-FB, fb_index = find_fb_by_name("fb_ili9486")
-width, height, bpp, stride = fb_geometry(FB)
-bytespp = bpp // 8
-
-# fontes
-FONT_BIG   = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 28)
-FONT_SMALL = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",      18)
-
-print(f"[fb] {FB}: {width}x{height} @{bpp}bpp stride={stride}")
-
-# Configura detecção de toque para sair
-try:
-    print("🔧 Configurando detecção de toque...")
-    touch_monitor = setup_touch_exit()
-    print("✅ Touch monitor configurado com sucesso")
-    print("⏰ Script rodará indefinidamente até toque")
-except Exception as e:
-    print(f"❌ Erro configurando touch monitor: {e}")
-    import sys
-    sys.exit(1)
-
-# ===== LOOP =====
-print("🔄 Iniciando loop principal...")
-frame_count = 0
-while True:
-    frame_count += 1
-    
-    # Verifica toque a cada frame para resposta rápida
-    if touch_monitor.should_exit():
-        print("🔴 TOQUE DETECTADO - VOLTANDO AO MENU!")
-        print("🚀 Executando menu principal...")
-        
-        # Para este script e executa o menu
-        touch_monitor.stop()
-        
-        # Executa o menu principal
-        import subprocess
-        subprocess.run(["sudo", "python3", "/home/dw/painel/src/core/touch_menu_visual.py"])
-        break
+            # canvas do tamanho exato do fb
+            img = Image.new("RGB", (width, height), "black")
+            draw = ImageDraw.Draw(img)
+            iface, ip = pick_ip()  # Atualiza INTERFACES.version se algo mudou
             
-        print(f"📊 Frame {frame_count} - Sistema rodando...")
-    
-    try:
-        # canvas do tamanho exato do fb
-        img = Image.new("RGB", (width, height), "black")
-        draw = ImageDraw.Draw(img)
-        iface, ip = pick_ip()
-        
-        # Obtém as novas informações
-        wifi_name = get_wifi_network_name()
-        temperature = get_temperature()
-        location = get_location()
-        
-        # textos
-        draw.text((10, 10),  "Dw",                            fill="yellow", font=FONT_BIG)
-        draw.text((10, 40), f"IP ({iface or '-'}) : {ip}", fill="lime", font=FONT_SMALL)
-        draw.text((10, 60), f"WiFi: {wifi_name}", fill="orange", font=FONT_SMALL)
-        draw.text((10, 80), f"Temp: {temperature}", fill="red", font=FONT_SMALL)
-        draw.text((10, 100), f"Local: {location}", fill="magenta", font=FONT_SMALL)
-        draw.text((10, 260),  time.strftime("Hora: %H:%M:%S"), fill="cyan", font=FONT_SMALL)
-        draw.text((10, 280),  time.strftime("Data: %d/%m/%Y"), fill="cyan",   font=FONT_SMALL)
-
-        # imagem (com transparência preservada)
-        if os.path.exists(IMG_PATH):
-            logo = Image.open(IMG_PATH).convert("RGBA")
-
-            # thumbnail precisa de tupla de INTEIROS. Ex.: metade da largura e 1/2 da altura:
-            max_w = int(width * 0.1)   # ajuste conforme preferir (0.6, 0.7…)
-            max_h = int(height * 0.5)
-            #logo.thumbnail((max_w, max_h))  # mantém proporção
-
-            # ===== POSICIONAMENTO =====
-            # 1) centralizado embaixo:
-            # pos_x = (width - logo.width) // 2
-            # pos_y = height - logo.height - 10
-
-            # 2) canto inferior direito (ativo):
-            pos_x = width - logo.width - 10
-            pos_y = height - logo.height - 10
-
-            # 3) canto inferior esquerdo:
-            # pos_x = 10
-            # pos_y = height - logo.height - 10
-
-            # 4) logo abaixo da data (~130 px do topo):
-            # pos_x = (width - logo.width) // 2
-            # pos_y = 130
-            # ===========================
-
-            img.paste(logo, (pos_x, pos_y), logo)
-
-        # rotação (90/270 usa expand=False pra manter o buffer)
-        if ROTATE_DEG:
-            img = img.rotate(ROTATE_DEG, expand=False)
-
-        # enviar ao framebuffer respeitando stride por linha
-        if bpp == 16:
-            rgb565 = rgb_to_rgb565_le(img)              # [H,W,2]
-            row_bytes = width * 2
-            flat = rgb565.reshape(height, row_bytes)
-            buf = bytearray()
-            for y in range(height):
-                line = flat[y].tobytes()
-                buf += line
-                if stride > row_bytes:
-                    buf += b"\x00" * (stride - row_bytes)
-            payload = bytes(buf)
-        else:
-            raw = img.tobytes()
-            row_bytes = width * bytespp
-            buf = bytearray()
-            for y in range(height):
-                start = y * row_bytes
-                buf += raw[start:start+row_bytes]
-                if stride > row_bytes:
-                    buf += b"\x00" * (stride - row_bytes)
-            payload = bytes(buf)
-
-        with open(FB, "wb") as f:
-            f.write(payload)
-
-        time.sleep(0.1)  # Reduzido de 1s para 0.1s para melhor responsividade
-        
-    except Exception as e:
-        print(f"❌ Erro no frame {frame_count}: {e}")
-        time.sleep(0.1)  # Reduzido de 1s para 0.1s
+            # Obtém as novas informações (SSID e local do cache)
+            self.refresh_info()
+            wifi_name = self.wifi_name
+            temperature = get_temperature()
+            location = self.location
+            
+            # textos
+            draw.text((10, 10),  "Dw",                            fill="yellow", font=self.font_big)
+            draw.text((10, 40), f"IP ({iface or '-'}) : {ip}", fill="lime", font=self.font_small)
+            draw.text((10, 60), f"WiFi: {wifi_name}", fill="orange", font=self.font_small)
+            draw.text((10, 80), f"Temp: {temperature}", fill="red", font=self.font_small)
+            draw.text((10, 100), f"Local: {location}", fill="magenta", font=self.font_small)
+            draw.text((10, 260),  time.strftime("Hora: %H:%M:%S"), fill="cyan", font=self.font_small)
+            draw.text((10, 280),  time.strftime("Data: %d/%m/%Y"), fill="cyan",   font=self.font_small)
+
+            # imagem (com transparência preservada)
+            logo_size = self.logo.image_size if self.logo is not None else None
+            if logo_size is not None:
+                logo_w, logo_h = logo_size
+                # ===== POSICIONAMENTO =====
+                # 1) centralizado embaixo:
+                # pos_x = (width - logo_w) // 2
+                # pos_y = height - logo_h - 10
+
+                # 2) canto inferior direito (ativo):
+                pos_x = width - logo_w - 10
+                pos_y = height - logo_h - 10
+
+                # 3) canto inferior esquerdo:
+                # pos_x = 10
+                # pos_y = height - logo_h - 10
+
+                # 4) logo abaixo da data (~130 px do topo):
+                # pos_x = (width - logo_w) // 2
+                # pos_y = 130
+                # ===========================
+
+                # 16bpp: o sprite é mesclado direto no frame RGB565 (abaixo)
+                if self.display.bpp != 16 and self.logo_img is not None:
+                    img.paste(self.logo_img, (pos_x, pos_y), self.logo_img)
+
+            # rotação (90/270 usa expand=False pra manter o buffer)
+            if ROTATE_DEG:
+                img = img.rotate(ROTATE_DEG, expand=False)
+
+            if self.display.bpp == 16:
+                frame565 = rgb_to_rgb565(img)               # [H,W] uint16
+                if logo_size is not None:
+                    lx, ly = rotated_position(pos_x, pos_y, logo_w, logo_h,
+                                              width, height, ROTATE_DEG)
+                    self.logo.blend_into(frame565, lx, ly)
+                self.display.show_rgb565(frame565)
+            else:
+                self.display.show_image(img)
+        except Exception as e:
+            print(f"❌ Erro no frame {self.frame_count}: {e}")
+
+        return 0.1  # Reduzido de 1s para 0.1s para melhor responsividade
+
+    def stop(self):
+        self.display = None
+
+
+def main():
+    # Toque volta ao menu no mesmo processo (sem relançar o menu)
+    run_standalone("sysinfo", SysInfoPanel())
+
 
+if __name__ == "__main__":
+    main()
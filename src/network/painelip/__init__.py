@@ -1,15 +1,28 @@
 #!/usr/bin/env python3
 """Arquivo __init__.py para o pacote painelip."""
 
-from .models import DeviceInfo, NetworkScanResult
-from .network import NetworkDiscovery
-from .ui import PanelUI
-from .panel import NetworkPanel
-from .framebuffer import (
-    find_framebuffer_by_name,
-    get_framebuffer_geometry,
-    write_image_to_framebuffer
-)
+import importlib
+
+# Importação sob demanda (PEP 562): `import painelip` não carrega NumPy/PIL
+_EXPORTS = {
+    "DeviceInfo": ".models",
+    "NetworkScanResult": ".models",
+    "NetworkDiscovery": ".network",
+    "PanelUI": ".ui",
+    "NetworkPanel": ".panel",
+    "find_framebuffer_by_name": ".framebuffer",
+    "get_framebuffer_geometry": ".framebuffer",
+    "write_image_to_framebuffer": ".framebuffer",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
 
 __version__ = "2.0.0"
 __author__ = "Painel IP Team"
@@ -7,11 +7,34 @@ ROTATE_DEG = 0               # 0, 90, 180, 270
 FB_TARGET = "fb_ili9486"     # Nome do framebuffer alvo
 
 # ===== CONFIGURAÇÕES DE REDE =====
-SCAN_INTERVAL = 60           # Segundos entre varreduras nmap (aumentado para dar mais tempo ao scan)
+SCAN_INTERVAL = 60           # Segundos mínimos entre varreduras profundas (nmap -sV) de um lote de hosts
+LIVENESS_INTERVAL = 20       # Segundos entre varreduras de vivacidade (sweep asyncio, barata)
+DEEP_BATCH = 16              # Hosts por varredura profunda: novos, alterados e vencidos primeiro
+DEEP_MAX_AGE = 30 * 60       # Host sem mudança volta à varredura profunda depois disso (segundos)
 PREF_IFACES = ["wlan0", "eth0"]  # Interfaces preferidas
 CAMERA_PORTS = [80, 443, 554, 8080, 8888, 81, 8554, 9000, 5000]  # Portas comuns de câmeras IP e dispositivos de rede
 COMMON_PORTS = [22, 80, 135, 139, 443, 445, 3389, 5900]  # Portas comuns para detectar mais dispositivos (reduzido para ser mais rápido)
 ENABLE_FULL_SCAN = True      # Habilita scan completo (ping + portas comuns) em vez de apenas câmeras
+USE_NMAP = True              # False: só a varredura de vivacidade (sem -sV/-O)
+NMAP_WORKERS = 0             # Processos nmap simultâneos (0 = núcleos - 1, no mínimo 1)
+NMAP_SHARD_PREFIX = 24       # Fatia máxima da rede por processo nmap (/24)
+NMAP_SHARD_MIN_TARGETS = 4   # Hosts mínimos por processo ao dividir um lote do agendador
+NMAP_LAG_LIMIT = 0.15        # Atraso médio dos frames (s) acima do qual só um nmap roda por vez
+SWEEP_PORTS = [80, 443, 22, 445, 554, 8080]  # Portas TCP testadas em cada endereço na varredura rápida
+SWEEP_CONCURRENCY = 256      # Conexões simultâneas na varredura rápida
+SWEEP_TIMEOUT = 0.8          # Prazo (segundos) de cada conexão e das respostas ao ping
+SWEEP_MAX_HOSTS = 1024       # Endereços por varredura (redes maiores são varridas em janelas alternadas)
+PROBE_CONCURRENCY = 512      # Conexões simultâneas do verificador de portas (prober.py)
+PROBE_PER_HOST = 16          # Conexões simultâneas por host
+PROBE_RATE = 200             # Tentativas por segundo por host (0 = sem limite)
+PROBE_TIMEOUT = 1.0          # Prazo inicial e máximo de cada tentativa (segundos); cai com o RTT observado
+PROBE_MIN_TIMEOUT = 0.25     # Prazo mínimo, mesmo com RTT muito baixo (câmeras Wi-Fi respondem devagar)
+# Base OUI compilada (fabricante pelo MAC): python3 src/network/painelip/oui.py --compile
+OUI_DB_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+                           "assets", "compiled", "oui.bin")
+SCAN_CACHE_FILE = "/home/dw/.painel_scan_cache.json"  # Última varredura (início a quente), permissão 600
+SCAN_CACHE_MAX_AGE = 24 * 3600  # Snapshot mais antigo que isso (segundos) é ignorado
+INVENTORY_DB_FILE = "/home/dw/.painel_inventory.db"  # Histórico dos dispositivos (SQLite), permissão 600
 
 # ===== CONFIGURAÇÕES DE UI =====
 PAGE_TIME = 8                # Segundos por página na lista (aumentado para melhor leitura)
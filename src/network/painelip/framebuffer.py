@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
 """Utilidades para manipulação do framebuffer."""
 
+from __future__ import annotations
+
 import os
 import re
+import sys
 import glob
 import subprocess
-from typing import Tuple, Optional
-import numpy as np
-from PIL import Image
+from typing import TYPE_CHECKING, Tuple, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+    from PIL import Image
+
+# Adiciona src/ ao path para importar core.latency
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from core.latency import TRACER
 
 
 def read_sys_file(path: str, as_int: bool = False, default=None):
@@ -100,6 +109,7 @@ def convert_rgb_to_rgb565_le(pil_img: Image.Image) -> np.ndarray:
     Returns:
         Array numpy com dados RGB565 em formato [H,W,2]
     """
+    import numpy as np
     arr = np.asarray(pil_img, dtype=np.uint8)  # [H,W,3]
     r = (arr[..., 0] >> 3).astype(np.uint16)
     g = (arr[..., 1] >> 2).astype(np.uint16)
@@ -153,3 +163,4 @@ def write_image_to_framebuffer(fbdev: str, img: Image.Image, bpp: int, stride: i
     
     with open(fbdev, "wb") as f:
         f.write(payload)
+    TRACER.frame_written()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Inventário persistente dos dispositivos (SQLite, modo WAL).
+
+Cada varredura concluída é gravada numa única transação: o dispositivo
+é identificado pelo MAC (ou pelo IP, enquanto o MAC for desconhecido),
+com primeira e última vez visto, as portas com o seu próprio histórico
+e a varredura de origem (interface, rede, fonte). Painéis e ferramentas
+consultam por índice em vez de varrer a rede de novo, por exemplo
+câmeras vistas nas últimas 24 h.
+
+Uso:
+    python3 src/network/painelip/inventory.py cameras --hours 24
+    python3 src/network/painelip/inventory.py devices --hours 1
+    python3 src/network/painelip/inventory.py history 192.168.8.20
+"""
+
+import os
+import time
+import sqlite3
+import ipaddress
+from collections import namedtuple
+from typing import Dict, List, Optional
+from models import DeviceInfo, NetworkScanResult
+from config import INVENTORY_DB_FILE
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    scan_time REAL NOT NULL,
+    interface TEXT,
+    network TEXT,
+    source TEXT,
+    devices INTEGER
+);
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    mac TEXT,
+    ip TEXT NOT NULL,
+    hostname TEXT,
+    vendor TEXT,
+    os TEXT,
+    device_type TEXT,
+    is_camera INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    last_scan INTEGER REFERENCES scans(id)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS devices_mac ON devices(mac) WHERE mac IS NOT NULL;
+CREATE INDEX IF NOT EXISTS devices_ip ON devices(ip);
+CREATE INDEX IF NOT EXISTS devices_last_seen ON devices(last_seen);
+CREATE INDEX IF NOT EXISTS devices_camera ON devices(last_seen) WHERE is_camera;
+CREATE TABLE IF NOT EXISTS ports (
+    device_id INTEGER NOT NULL REFERENCES devices(id),
+    port INTEGER NOT NULL,
+    service TEXT,
+    version TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (device_id, port)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sightings (
+    scan_id INTEGER NOT NULL REFERENCES scans(id),
+    device_id INTEGER NOT NULL REFERENCES devices(id),
+    ip TEXT NOT NULL,
+    PRIMARY KEY (device_id, scan_id)
+) WITHOUT ROWID;
+"""
+
+# Dispositivo e quando foi visto (consultas)
+Entry = namedtuple("Entry", "device first_seen last_seen")
+
+def _ip_key(ip: str) -> tuple:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return (7, 0)
+    return (address.version, int(address))
+
+
+_COLUMNS = "id, mac, ip, hostname, vendor, os, device_type, is_camera, first_seen, last_seen"
+
+
+class Inventory:
+    """Acesso ao banco do inventário (conexão aberta no primeiro uso)."""
+
+    def __init__(self, path: str = INVENTORY_DB_FILE):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if not os.path.exists(self.path):
+                # Permissão 600 como o snapshot: o inventário descreve a rede
+                os.close(os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o600))
+            db = sqlite3.connect(self.path, timeout=5.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")  # Com WAL: sem fsync por transação
+            db.execute("PRAGMA foreign_keys=ON")
+            if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                with db:
+                    db.executescript(SCHEMA)
+                    db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._db = db
+        return self._db
+
+    def _find(self, device: DeviceInfo) -> Optional[tuple]:
+        """Linha do dispositivo: pelo MAC; sem MAC (ou MAC novo), pelo IP sem MAC."""
+        db = self.db
+        if device.mac:
+            row = db.execute("SELECT id, mac FROM devices WHERE mac = ?", (device.mac,)).fetchone()
+            if row:
+                return row
+        return db.execute("SELECT id, mac FROM devices WHERE ip = ? AND mac IS NULL "
+                          "ORDER BY last_seen DESC LIMIT 1", (device.ip,)).fetchone()
+
+    def record_scan(self, result: NetworkScanResult, source: str = "nmap") -> Optional[int]:
+        """
+        Grava uma varredura inteira numa transação.
+
+        Args:
+            result: Resultado concluído
+            source: Origem ("nmap", "sweep", "nmap+sweep")
+
+        Returns:
+            Id da varredura, ou None se o banco não pôde ser gravado
+        """
+        now = result.scan_time
+        try:
+            with self.db as db:
+                scan_id = db.execute(
+                    "INSERT INTO scans (scan_time, interface, network, source, devices) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (now, result.interface, result.network, source, len(result.devices))).lastrowid
+                for device in result.devices:
+                    if device.ip:
+                        self._upsert(db, device, scan_id, now)
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️  Inventário não gravado: {e}")
+            return None
+        return scan_id
+
+    def _upsert(self, db: sqlite3.Connection, device: DeviceInfo, scan_id: int, now: float) -> None:
+        mac = device.mac or None
+        row = self._find(device)
+        if row is None:
+            device_id = db.execute(
+                "INSERT INTO devices (mac, ip, hostname, vendor, os, device_type, is_camera, "
+                "first_seen, last_seen, last_scan) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (mac, device.ip, device.hostname, device.vendor, device.os, device.device_type,
+                 int(device.is_camera), now, now, scan_id)).lastrowid
+        else:
+            device_id = row[0]
+            # Campos vazios nesta varredura (ex.: só ARP) não apagam os conhecidos
+            db.execute(
+                "UPDATE devices SET mac = COALESCE(?, mac), ip = ?, "
+                "hostname = COALESCE(NULLIF(?, ''), hostname), "
+                "vendor = COALESCE(NULLIF(?, ''), vendor), os = COALESCE(NULLIF(?, ''), os), "
+                "device_type = COALESCE(NULLIF(?, ''), device_type), "
+                "is_camera = MAX(is_camera, ?), last_seen = ?, last_scan = ? WHERE id = ?",
+                (mac, device.ip, device.hostname, device.vendor, device.os, device.device_type,
+                 int(device.is_camera), now, scan_id, device_id))
+        db.executemany(
+            "INSERT INTO ports (device_id, port, service, version, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (device_id, port) DO UPDATE SET "
+            "service = excluded.service, version = COALESCE(NULLIF(excluded.version, ''), version), "
+            "last_seen = excluded.last_seen",
+            [(device_id, port, service, device.versions.get(port, ""), now, now)
+             for port, service in device.open_ports.items()])
+        db.execute("INSERT OR IGNORE INTO sightings (scan_id, device_id, ip) VALUES (?, ?, ?)",
+                   (scan_id, device_id, device.ip))
+
+    def _entries(self, where: str, params: tuple) -> List[Entry]:
+        rows = self.db.execute(f"SELECT {_COLUMNS} FROM devices WHERE {where}", params).fetchall()
+        entries = [self._entry(row) for row in rows]
+        return sorted(entries, key=lambda entry: _ip_key(entry.device.ip))
+
+    def _entry(self, row: tuple) -> Entry:
+        device_id, mac, ip, hostname, vendor, os_name, device_type, is_camera, first, last = row
+        device = DeviceInfo(ip=ip, mac=mac or "", hostname=hostname or "", vendor=vendor or "",
+                            os=os_name or "", device_type=device_type or "",
+                            is_camera=bool(is_camera))
+        # Portas vistas na última vez em que o dispositivo apareceu
+        for port, service, version in self.db.execute(
+                "SELECT port, service, version FROM ports WHERE device_id = ? AND last_seen = ?",
+                (device_id, last)):
+            device.open_ports[port] = service
+            if version:
+                device.versions[port] = version
+        return Entry(device, first, last)
+
+    def devices_seen(self, since: float) -> List[Entry]:
+        """Dispositivos vistos a partir de `since` (epoch)."""
+        return self._entries("last_seen >= ?", (since,))
+
+    def cameras_seen(self, since: float) -> List[Entry]:
+        """Câmeras vistas a partir de `since` (índice parcial de câmeras)."""
+        return self._entries("is_camera AND last_seen >= ?", (since,))
+
+    def lookup(self, key: str) -> Optional[Entry]:
+        """Dispositivo por MAC ou IP (o visto mais recentemente)."""
+        entries = self._entries("mac = ? OR ip = ?", (key.upper(), key))
+        return max(entries, key=lambda entry: entry.last_seen) if entries else None
+
+    def history(self, key: str) -> Dict[str, list]:
+        """
+        Histórico de um dispositivo (MAC ou IP).
+
+        Returns:
+            {"sightings": [(scan_time, ip, rede, fonte)], "ports": [(porta, serviço,
+            primeira vez, última vez)]}; vazio se desconhecido
+        """
+        row = self.db.execute("SELECT id FROM devices WHERE mac = ? OR ip = ? "
+                              "ORDER BY last_seen DESC LIMIT 1", (key.upper(), key)).fetchone()
+        if row is None:
+            return {}
+        sightings = self.db.execute(
+            "SELECT scans.scan_time, sightings.ip, scans.network, scans.source FROM sightings "
+            "JOIN scans ON scans.id = sightings.scan_id WHERE sightings.device_id = ? "
+            "ORDER BY scans.scan_time", (row[0],)).fetchall()
+        ports = self.db.execute(
+            "SELECT port, service, first_seen, last_seen FROM ports WHERE device_id = ? "
+            "ORDER BY port", (row[0],)).fetchall()
+        return {"sightings": sightings, "ports": ports}
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def main():
+    import argparse
+    from ui import format_age
+    parser = argparse.ArgumentParser(description="Consulta o inventário de dispositivos")
+    parser.add_argument("--db", default=INVENTORY_DB_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, text in (("cameras", "Câmeras vistas recentemente"),
+                       ("devices", "Dispositivos vistos recentemente")):
+        cmd = sub.add_parser(name, help=text)
+        cmd.add_argument("--hours", type=float, default=24.0)
+    history = sub.add_parser("history", help="Histórico de um dispositivo (IP ou MAC)")
+    history.add_argument("key")
+    args = parser.parse_args()
+
+    inventory = Inventory(args.db)
+    now = time.time()
+    if args.command == "history":
+        data = inventory.history(args.key)
+        if not data:
+            print(f"❓ {args.key} não está no inventário")
+            return
+        for scan_time, ip, network, source in data["sightings"]:
+            print(f"   👁️  {time.strftime('%d/%m %H:%M', time.localtime(scan_time))}  {ip:<16} {network} ({source})")
+        for port, service, first, last in data["ports"]:
+            print(f"   🔌 {port:>5} {service or '':<14} primeira vez {format_age(now - first)}, "
+                  f"última {format_age(now - last)}")
+        return
+    since = now - args.hours * 3600
+    query = inventory.cameras_seen if args.command == "cameras" else inventory.devices_seen
+    for device, first, last in query(since):
+        ports = ",".join(map(str, sorted(device.open_ports))) or "-"
+        print(f"   {device.ip:<16} {device.mac or '-':<18} {device.vendor[:24]:<24} {ports:<16} "
+              f"visto {format_age(now - last)}, primeira vez {format_age(now - first)}")
+
+
+if __name__ == "__main__":
+    main()
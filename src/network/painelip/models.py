@@ -4,6 +4,9 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+# Campos porta -> texto de DeviceInfo (chaves int viram string no JSON)
+_PORT_MAPS = ("open_ports", "versions")
+
 
 @dataclass
 class DeviceInfo:
@@ -16,6 +19,8 @@ class DeviceInfo:
     open_ports: dict[int, str] = field(default_factory=dict)
     is_camera: bool = False
     device_type: str = ""  # Tipo do dispositivo (PC, Server, etc.)
+    versions: dict[int, str] = field(default_factory=dict)  # Porta -> produto/versão (-sV)
+    deep_scan_time: float = 0.0  # Última varredura profunda (nmap -sV), epoch; 0 = nunca
 
     def __str__(self) -> str:
         """Representação em string do dispositivo."""
@@ -37,6 +42,26 @@ class DeviceInfo:
         """Nome para exibição (hostname ou IP)."""
         return self.hostname or self.ip or "Desconhecido"
 
+    def to_dict(self) -> dict:
+        """Dicionário compacto (só campos preenchidos) para o snapshot."""
+        data = {key: value for key, value in vars(self).items()
+                if value and key not in _PORT_MAPS}
+        for key in _PORT_MAPS:
+            ports = getattr(self, key)
+            if ports:
+                # JSON só aceita chaves string
+                data[key] = {str(port): value for port, value in ports.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DeviceInfo":
+        """Recria o dispositivo a partir de to_dict()."""
+        fields = {key: value for key, value in data.items()
+                  if key in cls.__dataclass_fields__ and key not in _PORT_MAPS}
+        for key in _PORT_MAPS:
+            fields[key] = {int(port): value for port, value in data.get(key, {}).items()}
+        return cls(**fields)
+
 
 @dataclass
 class NetworkScanResult:
@@ -47,3 +72,22 @@ class NetworkScanResult:
     network: str
     success: bool = True
     error_message: str = ""
+
+    def to_dict(self) -> dict:
+        """Dicionário serializável em JSON."""
+        return {
+            "devices": [device.to_dict() for device in self.devices],
+            "scan_time": self.scan_time,
+            "interface": self.interface,
+            "network": self.network,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NetworkScanResult":
+        """Recria o resultado a partir de to_dict()."""
+        return cls(
+            devices=[DeviceInfo.from_dict(d) for d in data.get("devices", [])],
+            scan_time=float(data["scan_time"]),
+            interface=data.get("interface", ""),
+            network=data.get("network", ""),
+        )
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Tabela de vizinhos (ARP) e resolução de nomes com cache."""
+
+import time
+import socket
+import ipaddress
+import threading
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional
+
+ARP_TABLE = "/proc/net/arp"
+ATF_COM = 0x2  # Entrada completa (MAC conhecido)
+
+Neighbor = namedtuple("Neighbor", "ip mac flags iface")
+
+
+def read_arp_table(path: str = ARP_TABLE) -> Dict[str, Neighbor]:
+    """
+    Lê a tabela ARP do kernel numa única leitura.
+
+    Returns:
+        Índice IP -> Neighbor (só entradas completas)
+    """
+    table: Dict[str, Neighbor] = {}
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()[1:]  # Pula o cabeçalho
+    except OSError:
+        return table
+    for line in lines:
+        # IP address  HW type  Flags  HW address  Mask  Device
+        parts = line.split()
+        if len(parts) < 6:
+            continue
+        try:
+            flags = int(parts[2], 16)
+        except ValueError:
+            continue
+        if not flags & ATF_COM or parts[3] == "00:00:00:00:00:00":
+            continue
+        table[parts[0]] = Neighbor(parts[0], parts[3].upper(), flags, parts[5])
+    return table
+
+
+def neighbors_in(table: Dict[str, Neighbor], network: str) -> List[str]:
+    """IPs da tabela que pertencem à rede CIDR, ordenados."""
+    try:
+        net = ipaddress.ip_network(network, strict=False)
+    except ValueError:
+        return []
+    found = [ipaddress.ip_address(ip) for ip in table]
+    return [str(ip) for ip in sorted(ip for ip in found if ip in net)]
+
+
+class HostnameResolver:
+    """
+    Resolução reversa (IP -> nome) com cache, inclusive de falhas.
+
+    As consultas rodam em paralelo; resolve_many() espera no máximo
+    `timeout` segundos e as que não terminaram continuam por trás,
+    preenchendo o cache para a próxima varredura.
+    """
+
+    def __init__(self, ttl: float = 600.0, negative_ttl: float = 120.0, workers: int = 8):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache: Dict[str, tuple] = {}  # ip -> (nome ou "", expira em)
+        self._pending: Dict[str, object] = {}  # ip -> Future
+        self._lock = threading.Lock()
+        self._workers = workers
+        self._pool = None  # ThreadPoolExecutor criado na primeira consulta
+
+    def _lookup(self, ip: str) -> str:
+        try:
+            name = socket.gethostbyaddr(ip)[0]
+        except (OSError, UnicodeError):
+            name = ""
+        if name == ip:
+            name = ""
+        ttl = self.ttl if name else self.negative_ttl
+        with self._lock:
+            self._cache[ip] = (name, time.monotonic() + ttl)
+            self._pending.pop(ip, None)
+        return name
+
+    def cached(self, ip: str) -> Optional[str]:
+        """Nome em cache ("" se não resolve), ou None se desconhecido/expirado."""
+        entry = self._cache.get(ip)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def resolve_many(self, ips: Iterable[str], timeout: float = 1.0) -> Dict[str, str]:
+        """
+        Resolve vários IPs de uma vez.
+
+        Returns:
+            IP -> nome, só para os que resolveram (do cache ou dentro do prazo)
+        """
+        # concurrent.futures só quando há o que resolver (fora do import)
+        from concurrent.futures import ThreadPoolExecutor, wait
+        names: Dict[str, str] = {}
+        futures = []
+        with self._lock:
+            for ip in ips:
+                name = self.cached(ip)
+                if name is not None:
+                    if name:
+                        names[ip] = name
+                    continue
+                future = self._pending.get(ip)
+                if future is None:
+                    if self._pool is None:
+                        self._pool = ThreadPoolExecutor(self._workers, thread_name_prefix="resolver")
+                    future = self._pool.submit(self._lookup, ip)
+                    self._pending[ip] = future
+                futures.append((ip, future))
+        if futures:
+            wait([future for _, future in futures], timeout=timeout)
+        for ip, future in futures:
+            if future.done() and future.result():
+                names[ip] = future.result()
+        return names
+
+
+RESOLVER = HostnameResolver()
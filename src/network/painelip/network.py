@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
 """Módulo para descoberta e análise de dispositivos de rede."""
 
+import os
 import re
+import sys
 import subprocess
 import ipaddress
 from typing import Dict, List, Optional, Tuple
+
+# Adiciona src/ ao path para o estado das interfaces (core.netif)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from core.netif import INTERFACES
 from models import DeviceInfo, NetworkScanResult
+from neighbors import Neighbor, RESOLVER, neighbors_in, read_arp_table
+from oui import OUI
 from config import CAMERA_PORTS, COMMON_PORTS, ENABLE_FULL_SCAN
 
 # Principais fabricantes de câmeras IP para identificação pelo vendor
@@ -23,6 +31,182 @@ CAMERA_VENDORS = [
     "avigilon",
 ]
 
+
+def mark_camera(device: DeviceInfo) -> None:
+    """Define a flag is_camera se portas ou vendor indicarem câmera."""
+    if any(port in device.open_ports for port in CAMERA_PORTS):
+        device.is_camera = True
+        return
+    vendor_lower = device.vendor.lower()
+    if any(v in vendor_lower for v in CAMERA_VENDORS):
+        device.is_camera = True
+
+
+def fill_vendor(device: DeviceInfo) -> None:
+    """Fabricante pela base OUI quando o nmap não informou; reavalia câmera."""
+    if device.mac and not device.vendor:
+        device.vendor = OUI.lookup(device.mac)
+        mark_camera(device)
+
+
+def mark_device_type(device: DeviceInfo) -> None:
+    """Identifica o tipo de dispositivo baseado nas portas abertas."""
+    # Se já foi identificado como câmera, mantém
+    if device.is_camera:
+        return
+    
+    # Verifica portas comuns para identificar tipo de dispositivo
+    if 22 in device.open_ports:  # SSH
+        device.device_type = "Server/Linux"
+    elif 3389 in device.open_ports:  # RDP
+        device.device_type = "Windows PC"
+    elif 5900 in device.open_ports:  # VNC
+        device.device_type = "Remote Desktop"
+    elif any(port in device.open_ports for port in [135, 139, 445]):  # SMB/Windows
+        device.device_type = "Windows PC"
+    elif 80 in device.open_ports or 443 in device.open_ports:
+        device.device_type = "Web Server"
+    else:
+        device.device_type = "Network Device"
+
+
+def _ip_sort_key(device: DeviceInfo) -> Tuple[int, int]:
+    """Chave de ordenação por IP que aceita IPv4 e IPv6."""
+    try:
+        address = ipaddress.ip_address(device.ip)
+    except ValueError:
+        return (7, 0)
+    return (address.version, int(address))
+
+
+class NmapTextParser:
+    """
+    Parser incremental da saída normal do nmap.
+    
+    Recebe a saída em pedaços (feed) e devolve cada host assim que o seu
+    bloco "Nmap scan report" termina: na linha em branco que fecha o
+    bloco, no próximo relatório ou no fim da saída.
+    """
+    
+    def __init__(self):
+        self.current: Optional[DeviceInfo] = None
+        self.last: Optional[DeviceInfo] = None  # Recebe linhas tardias após o bloco
+        self.parsing_ports = False
+        self._partial = ""
+    
+    def feed(self, data: str) -> List[DeviceInfo]:
+        """
+        Processa mais saída do nmap.
+        
+        Returns:
+            Hosts cujo bloco terminou neste pedaço
+        """
+        lines = (self._partial + data).split("\n")
+        self._partial = lines.pop()
+        completed = []
+        for line in lines:
+            device = self._line(line.strip())
+            if device:
+                completed.append(device)
+        return completed
+    
+    def close(self) -> List[DeviceInfo]:
+        """Fim da saída: devolve o host que ainda estava aberto."""
+        completed = self.feed("\n") if self._partial else []
+        device = self._finish_current()
+        if device:
+            completed.append(device)
+        return completed
+    
+    def _finish_current(self) -> Optional[DeviceInfo]:
+        device, self.current = self.current, None
+        self.parsing_ports = False
+        if device:
+            mark_camera(device)
+            mark_device_type(device)
+            self.last = device
+        return device
+    
+    def _line(self, line: str) -> Optional[DeviceInfo]:
+        """Processa uma linha; retorna o host que ela concluiu, se houver."""
+        # Início de novo dispositivo
+        scan_match = re.search(r"Nmap scan report for (.*)", line)
+        if scan_match:
+            completed = self._finish_current()
+            self.last = None
+            
+            token = scan_match.group(1).strip()
+            self.current = DeviceInfo()
+            
+            # Verifica se tem hostname e IP no formato: hostname (ip)
+            ip_match = re.search(r"\(([0-9.]+)\)$", token)
+            if ip_match:
+                self.current.ip = ip_match.group(1)
+                host = token[:ip_match.start()].strip()
+                if host and not re.match(r"^[0-9.]+$", host):
+                    self.current.hostname = host
+            else:
+                # Token é apenas IP ou apenas hostname
+                if re.match(r"^[0-9.]+$", token):
+                    self.current.ip = token
+                else:
+                    self.current.hostname = token
+            return completed
+        
+        if not line:
+            # Linha em branco fecha o bloco do host
+            return self._finish_current()
+        
+        if line.startswith("Nmap done"):
+            self.last = None
+            return self._finish_current()
+        
+        device = self.current
+        if device is None:
+            # Linhas tardias (MAC/OS) depois da linha em branco
+            device = self.last
+            if device is None:
+                return None
+        
+        if line.startswith("PORT"):
+            self.parsing_ports = True
+            return None
+        
+        if self.parsing_ports:
+            # Tenta capturar informações de porta e serviço (incluindo versões)
+            port_match = re.match(r"(\d+)/\w+\s+(\w+)\s+(.+)", line)
+            if port_match:
+                port = int(port_match.group(1))
+                state = port_match.group(2)
+                service_info = port_match.group(3).strip()
+                if state == "open":
+                    # Pega apenas o nome do serviço (antes do espaço, se houver)
+                    service = service_info.split()[0] if service_info else "unknown"
+                    device.open_ports[port] = service
+                return None
+            self.parsing_ports = False
+        
+        # Informações MAC
+        if line.startswith("MAC Address:"):
+            parts = line.split()
+            if len(parts) >= 3:
+                device.mac = parts[2]
+            if len(parts) > 3:
+                device.vendor = " ".join(parts[3:]).strip("()")
+        # Informações do sistema operacional
+        elif line.startswith("OS details:"):
+            device.os = line.split("OS details:", 1)[1].strip()
+        elif line.startswith("Running:") and not device.os:
+            device.os = line.split("Running:", 1)[1].strip()
+        else:
+            return None
+        
+        if device is self.last:
+            # Host já entregue: reavalia câmera/tipo com a informação nova
+            mark_camera(device)
+            mark_device_type(device)
+        return None
+
 class NetworkDiscovery:
     """Gerenciador de descoberta de dispositivos na rede."""
     
@@ -42,27 +226,18 @@ class NetworkDiscovery:
         Returns:
             Dicionário {interface: cidr}
         """
-        result = {}
-        try:
-            output = subprocess.check_output(["ip", "-4", "-o", "addr", "show"], text=True)
-            for line in output.splitlines():
-                parts = line.split()
-                if len(parts) >= 4 and parts[2] == "inet":
-                    interface = parts[1]
-                    cidr = parts[3]  # "192.168.1.15/24"
-                    result[interface] = cidr
-        except Exception:
-            pass
-        return result
+        return dict(INTERFACES.ipv4())
     
     def get_best_interface(self) -> Tuple[Optional[str], Optional[str]]:
         """
         Seleciona a melhor interface disponível.
         
+        Chamado a cada frame: consulta o cache do core.netif (sem fork).
+        
         Returns:
             Tupla (interface, cidr) ou (None, None) se não encontrar
         """
-        interfaces = self.list_ipv4_interfaces()
+        interfaces = INTERFACES.ipv4()
         
         # Tenta interfaces preferidas primeiro
         for iface in self.preferred_interfaces:
@@ -92,43 +267,56 @@ class NetworkDiscovery:
         except Exception:
             return None
     
-    def get_arp_hosts(self, network: str) -> List[str]:
+    def get_arp_hosts(self, network: str, table: Optional[Dict[str, Neighbor]] = None) -> List[str]:
         """
         Obtém lista de hosts da tabela ARP na rede especificada.
         
         Args:
             network: Rede CIDR (ex: 192.168.8.0/24)
+            table: Tabela já lida (read_arp_table); lê /proc/net/arp se None
             
         Returns:
             Lista de IPs encontrados na tabela ARP
         """
-        try:
-            # Extrai a base da rede (ex: 192.168.8 de 192.168.8.0/24)
-            network_base = ".".join(network.split(".")[:-1])
-            
-            # Executa arp -a e filtra IPs da rede
-            output = subprocess.check_output(["arp", "-a"], text=True)
-            arp_ips = []
-            
-            for line in output.splitlines():
-                # Procura por padrão (IP) na linha
-                import re
-                ip_match = re.search(r'\(([0-9.]+)\)', line)
-                if ip_match:
-                    ip = ip_match.group(1)
-                    if ip.startswith(network_base + "."):
-                        arp_ips.append(ip)
-            
-            return sorted(set(arp_ips))  # Remove duplicatas e ordena
-        except Exception:
-            return []
+        return neighbors_in(read_arp_table() if table is None else table, network)
 
-    def start_nmap_scan(self, network: str) -> Optional[subprocess.Popen]:
+    def quick_sweep(self, network: str, **kwargs) -> List[DeviceInfo]:
+        """
+        Descoberta sem nmap (asyncio: conexões TCP e ping ICMP sem root).
+        Termina em poucos segundos numa /24; veja sweep.sweep() para os
+        limites de concorrência e prazo.
+        
+        Args:
+            network: Rede CIDR para varrer
+            
+        Returns:
+            Lista de dispositivos encontrados
+        """
+        from sweep import run_sweep
+        return run_sweep(network, **kwargs)
+    
+    def check_ports(self, devices: List[DeviceInfo], ports: Optional[List[int]] = None,
+                    **kwargs) -> None:
+        """
+        Verificação rápida de câmeras e serviços sem nmap -sV: preenche
+        open_ports e is_camera dos dispositivos (prober.PortProber).
+        
+        Args:
+            devices: Dispositivos a verificar (atualizados no lugar)
+            ports: Portas TCP (padrão: CAMERA_PORTS + COMMON_PORTS)
+        """
+        from prober import PROBE_PORTS, probe_devices
+        prober = probe_devices(devices, ports or PROBE_PORTS, **kwargs)
+        print(f"🔌 {prober.summary()}")
+    
+    def start_nmap_scan(self, network: str,
+                        targets: Optional[List[str]] = None) -> Optional[subprocess.Popen]:
         """
         Inicia uma varredura nmap assíncrona.
         
         Args:
             network: Rede CIDR para escanear
+            targets: Só estes hosts (lote do agendador) em vez da rede inteira
             
         Returns:
             Processo subprocess ou None em caso de erro
@@ -136,7 +324,13 @@ class NetworkDiscovery:
         if not network:
             return None
         
-        if ENABLE_FULL_SCAN:
+        if targets:
+            ports = COMMON_PORTS if ENABLE_FULL_SCAN else CAMERA_PORTS
+            ports_arg = ",".join(str(p) for p in ports)
+            os_arg = [] if ENABLE_FULL_SCAN else ["-O"]
+            cmd = (["nmap", "-oX", "-", "-sS"] + os_arg +
+                   ["-sV", "--version-intensity", "0", "-T4", "-p", ports_arg] + list(targets))
+        elif ENABLE_FULL_SCAN:
             # Obtém hosts da tabela ARP para incluir no scan
             arp_hosts = self.get_arp_hosts(network)
             
@@ -147,167 +341,85 @@ class NetworkDiscovery:
             if arp_hosts:
                 # Faz scan na rede inteira e nos hosts ARP específicos
                 targets = [network] + arp_hosts
-                cmd = ["nmap", "-sS", "-sV", "--version-intensity", "0", "-T5", "-p", ports_arg] + targets
+                cmd = ["nmap", "-oX", "-", "-sS", "-sV", "--version-intensity", "0", "-T5", "-p", ports_arg] + targets
             else:
                 # Scan normal na rede
-                cmd = ["nmap", "-sS", "-sV", "--version-intensity", "0", "-T5", "-p", ports_arg, network]
+                cmd = ["nmap", "-oX", "-", "-sS", "-sV", "--version-intensity", "0", "-T5", "-p", ports_arg, network]
         else:
             # Scan focado apenas em câmeras (comportamento original)
             ports_arg = ",".join(str(p) for p in CAMERA_PORTS)
-            cmd = ["nmap", "-sS", "-O", "-sV", "--version-intensity", "1", "-T4", "-p", ports_arg, network]
+            cmd = ["nmap", "-oX", "-", "-sS", "-O", "-sV", "--version-intensity", "1", "-T4", "-p", ports_arg, network]
         
         try:
+            # stdout só com o XML (-oX -); avisos do nmap não podem misturar-se a ele
             proc = subprocess.Popen(
                 cmd, 
                 stdout=subprocess.PIPE, 
-                stderr=subprocess.STDOUT, 
-                text=True
+                stderr=subprocess.DEVNULL, 
+                text=True,
+                start_new_session=True  # Grupo próprio: encerrado inteiro pelo supervisor
             )
             return proc
         except Exception:
             return None
     
-    def parse_nmap_output(self, text: str) -> List[DeviceInfo]:
+    def parse_nmap_output(self, text: str, network: Optional[str] = None) -> List[DeviceInfo]:
         """
-        Converte a saída do nmap em lista de DeviceInfo.
+        Converte a saída normal (texto) do nmap em lista de DeviceInfo.
+        A varredura do painel usa o XML (nmap_xml.NmapXmlParser).
         
         Args:
             text: Saída do comando nmap
+            network: Rede varrida (CIDR), usada para filtrar a tabela ARP
             
         Returns:
             Lista de dispositivos encontrados
         """
-        devices: List[DeviceInfo] = []
-        current_device: Optional[DeviceInfo] = None
-        parsing_ports = False
-
-        def mark_camera(device: DeviceInfo) -> None:
-            """Define a flag is_camera se portas ou vendor indicarem câmera."""
-            if any(port in device.open_ports for port in CAMERA_PORTS):
-                device.is_camera = True
-                return
-            vendor_lower = device.vendor.lower()
-            if any(v in vendor_lower for v in CAMERA_VENDORS):
-                device.is_camera = True
-
-        def mark_device_type(device: DeviceInfo) -> None:
-            """Identifica o tipo de dispositivo baseado nas portas abertas."""
-            # Se já foi identificado como câmera, mantém
-            if device.is_camera:
-                return
-            
-            # Verifica portas comuns para identificar tipo de dispositivo
-            if 22 in device.open_ports:  # SSH
-                device.device_type = "Server/Linux"
-            elif 3389 in device.open_ports:  # RDP
-                device.device_type = "Windows PC"
-            elif 5900 in device.open_ports:  # VNC
-                device.device_type = "Remote Desktop"
-            elif any(port in device.open_ports for port in [135, 139, 445]):  # SMB/Windows
-                device.device_type = "Windows PC"
-            elif 80 in device.open_ports or 443 in device.open_ports:
-                device.device_type = "Web Server"
-            else:
-                device.device_type = "Network Device"
-
-        for line in text.splitlines():
-            line = line.strip()
-            
-            # Início de novo dispositivo
-            scan_match = re.search(r"Nmap scan report for (.*)", line)
-            if scan_match:
-                if current_device:
-                    mark_camera(current_device)
-                    mark_device_type(current_device)
-                    devices.append(current_device)
-                
-                token = scan_match.group(1).strip()
-                current_device = DeviceInfo()
-                parsing_ports = False
-                
-                # Verifica se tem hostname e IP no formato: hostname (ip)
-                ip_match = re.search(r"\(([0-9.]+)\)$", token)
-                if ip_match:
-                    current_device.ip = ip_match.group(1)
-                    host = token[:ip_match.start()].strip()
-                    if host and not re.match(r"^[0-9.]+$", host):
-                        current_device.hostname = host
-                else:
-                    # Token é apenas IP ou apenas hostname
-                    if re.match(r"^[0-9.]+$", token):
-                        current_device.ip = token
-                    else:
-                        current_device.hostname = token
-                continue
-            
-            if not current_device:
-                continue
-            
-            if line.startswith("PORT"):
-                parsing_ports = True
-                continue
-
-            if parsing_ports:
-                # Tenta capturar informações de porta e serviço (incluindo versões)
-                port_match = re.match(r"(\d+)/\w+\s+(\w+)\s+(.+)", line)
-                if port_match:
-                    port = int(port_match.group(1))
-                    state = port_match.group(2)
-                    service_info = port_match.group(3).strip()
-                    if state == "open":
-                        # Pega apenas o nome do serviço (antes do espaço, se houver)
-                        service = service_info.split()[0] if service_info else "unknown"
-                        current_device.open_ports[port] = service
-                    continue
-                else:
-                    parsing_ports = False
-            # Informações MAC
-            if line.startswith("MAC Address:"):
-                parts = line.split()
-                if len(parts) >= 3:
-                    current_device.mac = parts[2]
-                if len(parts) > 3:
-                    current_device.vendor = " ".join(parts[3:]).strip("()")
-            
-            # Informações do sistema operacional
-            elif line.startswith("OS details:"):
-                current_device.os = line.split("OS details:", 1)[1].strip()
-            elif line.startswith("Running:") and not current_device.os:
-                current_device.os = line.split("Running:", 1)[1].strip()
+        parser = NmapTextParser()
+        devices = parser.feed(text) + parser.close()
+        return self.finalize_devices(devices, network)
+    
+    def finalize_devices(self, devices: List[DeviceInfo], network: Optional[str] = None) -> List[DeviceInfo]:
+        """
+        Completa o resultado do nmap com os hosts da tabela ARP e remove
+        duplicados. A tabela é lida uma única vez, qualquer que seja o
+        número de hosts; os nomes vêm do RESOLVER (com cache).
         
-                                             # Adiciona dispositivos ARP que não foram detectados pelo nmap
+        Args:
+            devices: Dispositivos vindos do parser
+            network: Rede varrida (CIDR); sem ela, usa as /24 dos IPs detectados
+            
+        Returns:
+            Lista de dispositivos únicos ordenada por IP
+        """
+        devices = list(devices)
+        table = read_arp_table()
         detected_ips = {device.ip for device in devices if device.ip}
-        arp_hosts = self.get_arp_hosts(self.cidr_to_network(f"{detected_ips or ['192.168.8.22']}/24") or "192.168.8.0/24")
+        if network:
+            networks = [network]
+        else:
+            networks = sorted({self.cidr_to_network(f"{ip}/24") for ip in detected_ips
+                               if ":" not in ip} - {None})
         
-        for arp_ip in arp_hosts:
-            if arp_ip not in detected_ips:
-                # Cria dispositivo para host ARP não detectado
-                arp_device = DeviceInfo()
-                arp_device.ip = arp_ip
-                arp_device.device_type = "ARP Host"
-                
-                # Tenta obter hostname do ARP
-                try:
-                    arp_output = subprocess.check_output(["arp", "-a"], text=True)
-                    for line in arp_output.splitlines():
-                        if arp_ip in line:
-                            # Extrai hostname da linha ARP se houver
-                            hostname_match = re.search(r"(\S+)\s+\(" + re.escape(arp_ip) + r"\)", line)
-                            if hostname_match:
-                                hostname = hostname_match.group(1)
-                                if hostname != arp_ip and not re.match(r"^[0-9.]+$", hostname):
-                                    arp_device.hostname = hostname
-                            break
-                except:
-                    pass
-                
-                devices.append(arp_device)
+        # MAC da tabela para hosts em que o nmap não informou (ex.: sem root)
+        for device in devices:
+            if not device.mac and device.ip in table:
+                device.mac = table[device.ip].mac
+            fill_vendor(device)
         
-        # Adiciona o último dispositivo
-        if current_device:
-            mark_camera(current_device)
-            mark_device_type(current_device)
-            devices.append(current_device)
+        # Adiciona dispositivos ARP que não foram detectados pelo nmap
+        missing = [ip for net in networks for ip in self.get_arp_hosts(net, table)
+                   if ip not in detected_ips]
+        names = RESOLVER.resolve_many(missing) if missing else {}
+        for arp_ip in missing:
+            arp_device = DeviceInfo()
+            arp_device.ip = arp_ip
+            arp_device.mac = table[arp_ip].mac
+            arp_device.hostname = names.get(arp_ip, "")
+            arp_device.device_type = "ARP Host"
+            # Fabricante pela base OUI: câmeras por vendor também entre os hosts só do ARP
+            fill_vendor(arp_device)
+            devices.append(arp_device)
         
         return self._deduplicate_devices(devices)
     
@@ -327,10 +439,7 @@ class NetworkDiscovery:
             if device.ip:
                 unique_devices[device.ip] = device
         
-        # Ordena por IP
-        sorted_devices = sorted(
-            unique_devices.values(), 
-            key=lambda d: tuple(int(x) for x in d.ip.split("."))
-        )
+        # Ordena por IP (IPv4 antes de IPv6)
+        sorted_devices = sorted(unique_devices.values(), key=_ip_sort_key)
         
         return sorted_devices
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Varredura nmap em fatias paralelas.
+
+Um único nmap numa /22 ou maior leva minutos e usa um núcleo só. Aqui a
+rede (ou a lista de alvos) é dividida em fatias contíguas, e até
+NMAP_WORKERS processos nmap rodam ao mesmo tempo, cada um com o seu
+NmapStream e o seu NmapXmlParser. Uma fila de fatias pendentes alimenta
+os processos conforme terminam.
+
+Não há thread de controle: pump(), chamado a cada frame pelo painel,
+recolhe os processos encerrados e inicia as próximas fatias. Se o loop
+da tela atrasa, o painel passa um limite menor e nenhuma fatia nova
+começa até ele se recuperar (as que já rodam terminam normalmente).
+
+O resultado não depende da ordem em que as fatias terminam: os hosts
+são combinados na ordem das fatias (por endereço), o primeiro relato de
+um IP é a base e os seguintes só completam campos vazios e portas que
+faltam; a lista final sai ordenada por IP.
+
+Uso:
+    python3 src/network/painelip/nmap_shards.py 10.0.0.0/22 --workers 4
+    python3 src/network/painelip/nmap_shards.py 192.168.1.0/24 --targets 192.168.1.10 192.168.1.20
+"""
+
+import os
+import sys
+import copy
+import math
+import time
+import ipaddress
+from typing import Callable, List, Optional, Sequence
+
+# Adiciona src/ ao path para o supervisor de processos (core.supervisor)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from core.supervisor import SUPERVISOR
+from models import DeviceInfo
+from network import _ip_sort_key
+from nmap_stream import NmapStream
+from nmap_xml import NmapXmlParser
+from config import NMAP_SHARD_MIN_TARGETS, NMAP_SHARD_PREFIX, NMAP_WORKERS
+
+MIN_SHARD_PREFIX = {4: 28, 6: 124}  # Fatias menores que isso não compensam um processo
+
+
+def default_workers(configured: int = NMAP_WORKERS) -> int:
+    """Processos nmap simultâneos: o configurado, ou um núcleo livre para a tela."""
+    if configured > 0:
+        return configured
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def shard_network(network: str, workers: int, prefix: int = NMAP_SHARD_PREFIX) -> List[str]:
+    """
+    Divide a rede em sub-redes contíguas, em ordem de endereço.
+
+    As fatias têm no máximo /prefix de tamanho e, quando a rede permite,
+    são pelo menos `workers` (sem passar de /28).
+    """
+    net = ipaddress.ip_network(network, strict=False)
+    wanted = net.prefixlen + math.ceil(math.log2(workers)) if workers > 1 else net.prefixlen
+    new_prefix = max(wanted, prefix if net.version == 4 else net.prefixlen)
+    new_prefix = min(new_prefix, max(net.prefixlen, MIN_SHARD_PREFIX[net.version]))
+    return [str(subnet) for subnet in net.subnets(new_prefix=new_prefix)]
+
+
+def shard_targets(targets: Sequence[str], workers: int,
+                  min_targets: int = NMAP_SHARD_MIN_TARGETS) -> List[List[str]]:
+    """
+    Divide uma lista de IPs em até `workers` grupos contíguos (por IP),
+    com pelo menos min_targets por grupo: cada nmap tem custo fixo de
+    partida e de -O, que não vale para um ou dois hosts.
+    """
+    ordered = sorted(set(targets), key=lambda ip: _ip_sort_key(DeviceInfo(ip=ip)))
+    if not ordered:
+        return []
+    count = max(1, min(workers, len(ordered) // max(1, min_targets)))
+    size = math.ceil(len(ordered) / count)
+    return [ordered[i:i + size] for i in range(0, len(ordered), size)]
+
+
+def merge_devices(reports: Sequence[Sequence[DeviceInfo]]) -> List[DeviceInfo]:
+    """
+    Combina os hosts das fatias (na ordem das fatias, não de término).
+    O primeiro relato de um IP é a base; os seguintes completam campos
+    vazios e acrescentam portas e versões que faltam.
+    """
+    merged = {}
+    for devices in reports:
+        for device in devices:
+            if not device.ip:
+                continue
+            base = merged.get(device.ip)
+            if base is None:
+                merged[device.ip] = copy.deepcopy(device)
+                continue
+            for port, service in device.open_ports.items():
+                base.open_ports.setdefault(port, service)
+            for port, version in device.versions.items():
+                base.versions.setdefault(port, version)
+            base.mac = base.mac or device.mac
+            base.hostname = base.hostname or device.hostname
+            base.vendor = base.vendor or device.vendor
+            base.os = base.os or device.os
+            base.device_type = base.device_type or device.device_type
+            base.is_camera = base.is_camera or device.is_camera
+    return sorted(merged.values(), key=_ip_sort_key)
+
+
+class _Worker:
+    """Um processo nmap e a leitura da sua saída."""
+
+    __slots__ = ("index", "proc", "stream")
+
+    def __init__(self, index: int, proc, stream: NmapStream):
+        self.index = index
+        self.proc = proc
+        self.stream = stream
+
+    @property
+    def finished(self) -> bool:
+        # Processo encerrado e saída lida até o fim (parser fechado)
+        return SUPERVISOR.poll(self.proc) is not None and self.stream.done
+
+
+class ShardedNmapScan:
+    """
+    Varredura em fatias com a mesma interface do NmapStream (devices,
+    take_new, done, wait, summary), mais pump() e stop(). Nenhum
+    processo começa antes do primeiro pump().
+    """
+
+    def __init__(self, network: str, targets: Optional[Sequence[str]] = None,
+                 start: Optional[Callable] = None, workers: Optional[int] = None):
+        """
+        Args:
+            network: Rede CIDR da varredura
+            targets: Só estes hosts (lote do agendador); None = a rede inteira
+            start: start(rede, alvos) -> Popen, como NetworkDiscovery.start_nmap_scan
+            workers: Processos simultâneos (None: default_workers())
+        """
+        if start is None:
+            from network import NetworkDiscovery
+            start = NetworkDiscovery().start_nmap_scan
+        self.network = network
+        self.workers = workers or default_workers()
+        self.started = time.monotonic()
+        self._start = start
+        if targets:
+            self.shards = [(network, group) for group in shard_targets(targets, self.workers)]
+        else:
+            self.shards = [(subnet, None) for subnet in shard_network(network, self.workers)]
+        self.launched = 0
+        self.failed = 0
+        self.peak = 0  # Maior número de processos simultâneos
+        self._next = 0
+        self._running: List[_Worker] = []
+        self._streams: List[Optional[NmapStream]] = [None] * len(self.shards)
+        self._merged: Optional[List[DeviceInfo]] = []
+
+    def pump(self, limit: Optional[int] = None) -> None:
+        """
+        Recolhe os processos encerrados e inicia fatias até o limite.
+
+        Args:
+            limit: Processos simultâneos agora (None: self.workers); com a
+                tela atrasada, o painel passa 1
+        """
+        for worker in [worker for worker in self._running if worker.finished]:
+            self._running.remove(worker)
+            self._merged = None
+        allowed = self.workers if limit is None else max(1, min(limit, self.workers))
+        while self._next < len(self.shards) and len(self._running) < allowed:
+            index = self._next
+            self._next += 1
+            target, group = self.shards[index]
+            proc = self._start(target, group)
+            if proc is None:
+                # nmap ausente ou sem permissão: as demais fatias falhariam igual
+                self.failed += len(self.shards) - index
+                self._next = len(self.shards)
+                print(f"⚠️  nmap não iniciou ({target}); {self.failed} fatias abandonadas")
+                break
+            SUPERVISOR.adopt(proc, "nmap")
+            stream = NmapStream(proc, NmapXmlParser())
+            self._streams[index] = stream
+            self._running.append(_Worker(index, proc, stream))
+            self.launched += 1
+            self.peak = max(self.peak, len(self._running))
+
+    @property
+    def done(self) -> bool:
+        """True quando todas as fatias foram iniciadas e concluídas."""
+        return self._next >= len(self.shards) and not self._running
+
+    @property
+    def devices(self) -> List[DeviceInfo]:
+        """Hosts de todas as fatias (as em andamento incluídas), combinados."""
+        if self._running or self._merged is None:
+            merged = merge_devices([list(stream.devices) for stream in self._streams if stream])
+            if self._running:
+                return merged
+            self._merged = merged
+        return self._merged
+
+    def take_new(self) -> List[DeviceInfo]:
+        """Hosts concluídos desde a última chamada (em todas as fatias)."""
+        return [device for stream in self._streams if stream is not None
+                for device in stream.take_new()]
+
+    @property
+    def first_device_after(self) -> Optional[float]:
+        """Segundos até o primeiro host de qualquer fatia."""
+        times = [stream.started + stream.first_device_after - self.started
+                 for stream in self._streams
+                 if stream is not None and stream.first_device_after is not None]
+        return min(times) if times else None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Roda a fila até o fim (uso fora do painel); True se terminou."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self.pump()
+            time.sleep(0.1)
+        return True
+
+    def stop(self) -> None:
+        """Encerra os processos em andamento e descarta as fatias pendentes."""
+        self._next = len(self.shards)
+        for worker in self._running:
+            # Grupo inteiro do nmap: SIGTERM, SIGKILL no prazo, sem zumbis
+            SUPERVISOR.stop(worker.proc)
+        self._running = []
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        first_after = self.first_device_after
+        first = f"{first_after:.1f} s" if first_after is not None else "-"
+        return (f"{len(self.devices)} hosts do nmap em {self.launched}/{len(self.shards)} fatias "
+                f"(até {self.peak} processos), primeiro em {first}, total {elapsed:.1f} s")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Varredura nmap em fatias paralelas")
+    parser.add_argument("network", help="Rede CIDR, ex.: 10.0.0.0/22")
+    parser.add_argument("--targets", nargs="*", help="Só estes hosts da rede")
+    parser.add_argument("--workers", type=int, default=0, help="Processos simultâneos (0 = automático)")
+    parser.add_argument("--dry-run", action="store_true", help="Só mostra as fatias")
+    args = parser.parse_args()
+
+    workers = default_workers(args.workers)
+    if args.dry_run:
+        shards = (shard_targets(args.targets, workers) if args.targets
+                  else shard_network(args.network, workers))
+        print(f"🧩 {len(shards)} fatias, {workers} processos simultâneos")
+        for shard in shards:
+            print(f"   {' '.join(shard) if isinstance(shard, list) else shard}")
+        return
+    scan = ShardedNmapScan(args.network, args.targets, workers=workers)
+    try:
+        scan.wait()
+    except KeyboardInterrupt:
+        scan.stop()
+    for device in scan.devices:
+        ports = ",".join(map(str, sorted(device.open_ports))) or "-"
+        print(f"   {device.ip:<16} {device.mac or '-':<18} {device.vendor[:20]:<20} {ports:<16} {device.os}")
+    print(scan.summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Leitura contínua da saída do nmap enquanto a varredura roda."""
+
+import time
+import threading
+from typing import List, Optional
+from models import DeviceInfo
+
+
+class NmapStream:
+    """
+    Lê o stdout do nmap numa thread e passa cada pedaço ao parser
+    incremental; os hosts ficam disponíveis assim que o bloco termina.
+
+    Ler sem parar também impede que o pipe encha e trave o nmap em
+    varreduras grandes com -sV.
+    """
+
+    def __init__(self, proc, parser):
+        """
+        Args:
+            proc: subprocess.Popen do nmap (stdout=PIPE, text=True)
+            parser: Objeto com feed(texto) e close(), ambos retornando
+                a lista de DeviceInfo concluídos
+        """
+        self.proc = proc
+        self.parser = parser
+        self.devices: List[DeviceInfo] = []
+        self.started = time.monotonic()
+        self.first_device_after: Optional[float] = None  # Segundos até o primeiro host
+        self.error: Optional[Exception] = None
+        self._taken = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="nmap-stream", daemon=True)
+        self._thread.start()
+
+    def _add(self, devices: List[DeviceInfo]) -> None:
+        if not devices:
+            return
+        with self._lock:
+            if self.first_device_after is None:
+                self.first_device_after = time.monotonic() - self.started
+                print(f"⏱️  Primeiro dispositivo em {self.first_device_after:.1f} s")
+            self.devices.extend(devices)
+
+    def _run(self) -> None:
+        try:
+            for line in self.proc.stdout:
+                self._add(self.parser.feed(line))
+        except (OSError, ValueError) as e:
+            # Pipe fechado (nmap encerrado ao sair do painel)
+            self.error = e
+        finally:
+            try:
+                self._add(self.parser.close())
+            finally:
+                self._done.set()
+
+    @property
+    def done(self) -> bool:
+        """True quando a saída terminou e o parser foi fechado."""
+        return self._done.is_set()
+
+    def take_new(self) -> List[DeviceInfo]:
+        """Hosts concluídos desde a última chamada."""
+        with self._lock:
+            new = self.devices[self._taken:]
+            self._taken = len(self.devices)
+        return new
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera o fim da leitura; retorna True se terminou."""
+        return self._done.wait(timeout)
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        first = f"{self.first_device_after:.1f} s" if self.first_device_after is not None else "-"
+        return f"{len(self.devices)} hosts do nmap, primeiro em {first}, total {elapsed:.1f} s"
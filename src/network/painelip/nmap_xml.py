@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Parser incremental do XML do nmap (-oX -)."""
+
+import xml.etree.ElementTree as ET
+from typing import List, Optional
+from models import DeviceInfo
+from network import mark_camera, mark_device_type
+
+
+def host_to_device(host: ET.Element) -> Optional[DeviceInfo]:
+    """
+    Converte um elemento <host> em DeviceInfo.
+
+    Returns:
+        DeviceInfo, ou None se o host não está "up"
+    """
+    status = host.find("status")
+    if status is not None and status.get("state") != "up":
+        return None
+
+    device = DeviceInfo()
+    for address in host.iterfind("address"):
+        kind = address.get("addrtype")
+        if kind == "ipv4":
+            device.ip = address.get("addr", "")
+        elif kind == "ipv6" and not device.ip:
+            device.ip = address.get("addr", "")
+        elif kind == "mac":
+            device.mac = address.get("addr", "")
+            device.vendor = address.get("vendor", "")
+
+    hostname = host.find("hostnames/hostname")
+    if hostname is not None:
+        device.hostname = hostname.get("name", "")
+
+    for port in host.iterfind("ports/port"):
+        state = port.find("state")
+        if state is None or state.get("state") != "open":
+            continue
+        portid = int(port.get("portid"))
+        service = port.find("service")
+        if service is None:
+            device.open_ports[portid] = "unknown"
+            continue
+        device.open_ports[portid] = service.get("name", "unknown")
+        version = " ".join(filter(None, (service.get("product"), service.get("version"),
+                                         service.get("extrainfo"))))
+        if version:
+            device.versions[portid] = version
+
+    # Melhor palpite de sistema operacional (maior precisão)
+    matches = host.findall("os/osmatch")
+    if matches:
+        best = max(matches, key=lambda m: int(m.get("accuracy", 0)))
+        device.os = best.get("name", "")
+
+    mark_camera(device)
+    mark_device_type(device)
+    return device
+
+
+class NmapXmlParser:
+    """
+    Parser incremental do XML do nmap, com a mesma interface do
+    NmapTextParser (feed/close devolvem os hosts concluídos).
+
+    Cada <host> é convertido ao fechar, e todo filho de <nmaprun> que
+    fecha (hosts, avisos de progresso) é retirado da raiz: a árvore não
+    cresce com o número de hosts, e a memória fica constante mesmo em
+    varreduras grandes. Os eventos "start" só servem para achar a raiz e
+    a profundidade de cada elemento.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: Optional[ET.Element] = None
+        self._depth = 0
+        self._failed = False
+
+    def feed(self, data: str) -> List[DeviceInfo]:
+        """Processa mais XML; retorna os hosts cujo <host> fechou."""
+        if self._failed:
+            return []
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> List[DeviceInfo]:
+        """Fim da saída (XML truncado, se o nmap foi interrompido, é aceito)."""
+        if self._failed:
+            return []
+        try:
+            self._parser.close()
+        except ET.ParseError:
+            pass
+        return self._drain()
+
+    def _drain(self) -> List[DeviceInfo]:
+        completed = []
+        try:
+            for event, elem in self._parser.read_events():
+                if event == "start":
+                    if self._root is None:
+                        self._root = elem
+                    self._depth += 1
+                    continue
+                self._depth -= 1
+                if elem.tag == "host":
+                    device = host_to_device(elem)
+                    if device:
+                        completed.append(device)
+                if self._depth == 1:
+                    # Filho direto de <nmaprun> já lido: sai da árvore
+                    self._root.remove(elem)
+        except ET.ParseError as e:
+            print(f"⚠️  XML do nmap inválido: {e}")
+            self._failed = True
+        return completed
+
+
+def parse_nmap_xml(text: str) -> List[DeviceInfo]:
+    """Converte um XML completo do nmap em lista de DeviceInfo."""
+    parser = NmapXmlParser()
+    return parser.feed(text) + parser.close()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Fabricante pelo MAC (base OUI do IEEE, offline).
+
+As listas do IEEE (MA-L: 24 bits, MA-M: 28 bits, MA-S: 36 bits) são
+compiladas uma vez num arquivo binário com três arrays ordenados de
+prefixos e uma tabela de nomes sem repetição. Em uso, o arquivo é
+mapeado (mmap) e cada consulta é uma busca binária por tamanho de
+prefixo, do mais específico ao MA-L: microssegundos por MAC, e só as
+páginas tocadas ocupam memória.
+
+Fontes aceitas na compilação (detectadas pelo conteúdo):
+    - CSV do IEEE (oui.csv, mam.csv, oui36.csv; pacote ieee-data)
+    - nmap-mac-prefixes (vem com o nmap)
+    - manuf do Wireshark ("00:1B:C5:00:00:00/36  Nome  Nome completo")
+
+Uso:
+    python3 src/network/painelip/oui.py --compile          # fontes do sistema
+    python3 src/network/painelip/oui.py --compile oui.csv mam.csv oui36.csv
+    python3 src/network/painelip/oui.py 00:1B:C5:00:10:01 --bench
+"""
+
+import os
+import csv
+import mmap
+import struct
+import bisect
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import OUI_DB_FILE
+
+MAGIC = b"OUI1"
+HEADER = struct.Struct("=4sIIII4x")  # magic, n24, n28, n36, nomes (24 bytes)
+PREFIX_BITS = (36, 28, 24)  # Ordem de busca: mais específico primeiro
+
+DEFAULT_SOURCES = [
+    "/usr/share/nmap/nmap-mac-prefixes",
+    "/usr/share/wireshark/manuf",
+    "/usr/share/ieee-data/oui.csv",
+    "/usr/share/ieee-data/mam.csv",
+    "/usr/share/ieee-data/oui36.csv",
+]
+
+
+def mac_to_int(mac: str) -> Optional[int]:
+    """'AA:BB:CC:DD:EE:FF' (ou com '-', '.', sem separador) -> inteiro de 48 bits."""
+    digits = mac.replace(":", "").replace("-", "").replace(".", "")
+    if len(digits) != 12:
+        return None
+    try:
+        return int(digits, 16)
+    except ValueError:
+        return None
+
+
+def _prefix(hex_digits: str, bits: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """Prefixo hexadecimal (6, 7 ou 9 dígitos) -> (bits, valor)."""
+    bits = bits or len(hex_digits) * 4
+    if bits not in PREFIX_BITS:
+        return None
+    try:
+        value = int(hex_digits.ljust(12, "0"), 16) >> (48 - bits)
+    except ValueError:
+        return None
+    return bits, value
+
+
+def parse_source(path: str) -> Iterator[Tuple[int, int, str]]:
+    """Entradas (bits, prefixo, fabricante) de um arquivo fonte."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        first = f.readline()
+        f.seek(0)
+        if first.startswith("Registry,"):
+            # CSV do IEEE: Registry,Assignment,Organization Name,Organization Address
+            for row in csv.reader(f):
+                if len(row) >= 3 and row[0].startswith("MA-"):
+                    entry = _prefix(row[1].strip())
+                    if entry:
+                        yield entry[0], entry[1], row[2].strip()
+            return
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            fields = line.split(None, 1)
+            if len(fields) < 2:
+                continue
+            key, name = fields
+            if ":" in key or "-" in key:
+                # manuf: prefixo em bytes, /bits opcional; o nome completo vem por último
+                address, _, bits = key.partition("/")
+                digits = address.replace(":", "").replace("-", "")
+                entry = _prefix(digits[:int(bits) // 4] if bits else digits,
+                                int(bits) if bits else None)
+                name = name.split("\t")[-1].strip()
+            else:
+                entry = _prefix(key)
+            if entry and name:
+                yield entry[0], entry[1], name
+
+
+def compile_database(sources: List[str], path: str = OUI_DB_FILE) -> Dict[int, int]:
+    """
+    Compila as fontes num arquivo binário (as últimas fontes prevalecem).
+
+    Returns:
+        Número de prefixos por tamanho {24: n, 28: n, 36: n}
+    """
+    tables: Dict[int, Dict[int, str]] = {bits: {} for bits in PREFIX_BITS}
+    for source in sources:
+        for bits, prefix, name in parse_source(source):
+            tables[bits][prefix] = name
+
+    names: Dict[str, int] = {}
+    keys, refs = {}, {}
+    for bits in PREFIX_BITS:
+        ordered = sorted(tables[bits])
+        keys[bits] = ordered
+        refs[bits] = [names.setdefault(tables[bits][prefix], len(names)) for prefix in ordered]
+
+    blob = bytearray()
+    offsets = []
+    for name in names:  # Ordem de inserção = índice
+        offsets.append(len(blob))
+        blob += name.encode("utf-8")
+    offsets.append(len(blob))
+
+    # Arrays de 8 bytes primeiro: tudo fica alinhado para o memoryview.cast
+    parts = [HEADER.pack(MAGIC, len(keys[24]), len(keys[28]), len(keys[36]), len(names)),
+             struct.pack(f"={len(keys[36])}Q", *keys[36])]
+    for bits in (24, 28):
+        parts.append(struct.pack(f"={len(keys[bits])}I", *keys[bits]))
+    for bits in PREFIX_BITS:
+        parts.append(struct.pack(f"={len(refs[bits])}I", *refs[bits]))
+    parts.append(struct.pack(f"={len(offsets)}I", *offsets))
+    parts.append(bytes(blob))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(tmp, path)
+    return {bits: len(keys[bits]) for bits in PREFIX_BITS}
+
+
+class OuiDatabase:
+    """Consulta ao arquivo compilado (mapeado na primeira consulta)."""
+
+    def __init__(self, path: str = OUI_DB_FILE):
+        self.path = path
+        self._map = None
+        self._tables = None  # bits -> (chaves, índices de nome)
+        self._offsets = None
+        self._blob_start = 0
+        self._failed = False
+        self._cache: Dict[int, str] = {}  # MA-L -> nome, para MACs repetidos
+
+    def _open(self) -> bool:
+        if self._map is not None:
+            return True
+        if self._failed:
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, n24, n28, n36, n_names = HEADER.unpack_from(self._map)
+            if magic != MAGIC:
+                raise ValueError("formato desconhecido")
+        except (OSError, ValueError, struct.error) as e:
+            print(f"⚠️  Base OUI indisponível ({e}); gere com: python3 oui.py --compile")
+            self._map = None
+            self._failed = True
+            return False
+        view = memoryview(self._map)
+        offset = HEADER.size
+        key36 = view[offset:offset + n36 * 8].cast("Q")
+        offset += n36 * 8
+        key24 = view[offset:offset + n24 * 4].cast("I")
+        offset += n24 * 4
+        key28 = view[offset:offset + n28 * 4].cast("I")
+        offset += n28 * 4
+        refs = {}
+        for bits, count in ((36, n36), (28, n28), (24, n24)):
+            refs[bits] = view[offset:offset + count * 4].cast("I")
+            offset += count * 4
+        self._offsets = view[offset:offset + (n_names + 1) * 4].cast("I")
+        self._blob_start = offset + (n_names + 1) * 4
+        self._tables = {36: (key36, refs[36]), 28: (key28, refs[28]), 24: (key24, refs[24])}
+        return True
+
+    def _name(self, index: int) -> str:
+        start = self._blob_start + self._offsets[index]
+        end = self._blob_start + self._offsets[index + 1]
+        return self._map[start:end].decode("utf-8", errors="replace")
+
+    def lookup(self, mac: str) -> str:
+        """Fabricante do MAC ("" se desconhecido ou sem base compilada)."""
+        value = mac_to_int(mac)
+        if value is None or not self._open():
+            return ""
+        for bits in PREFIX_BITS:
+            keys, refs = self._tables[bits]
+            prefix = value >> (48 - bits)
+            if bits == 24 and prefix in self._cache:
+                return self._cache[prefix]
+            i = bisect.bisect_left(keys, prefix)
+            if i < len(keys) and keys[i] == prefix:
+                name = self._name(refs[i])
+                if bits == 24:
+                    self._cache[prefix] = name
+                return name
+        return ""
+
+    def close(self) -> None:
+        self._tables = self._offsets = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+OUI = OuiDatabase()
+
+
+def main():
+    import time
+    import argparse
+    parser = argparse.ArgumentParser(description="Base OUI offline (fabricante pelo MAC)")
+    parser.add_argument("macs", nargs="*", help="MACs a consultar")
+    parser.add_argument("--compile", nargs="*", metavar="FONTE",
+                        help="Compila as fontes (sem argumentos: as instaladas no sistema)")
+    parser.add_argument("--output", default=OUI_DB_FILE)
+    parser.add_argument("--bench", action="store_true", help="Mede o tempo por consulta")
+    args = parser.parse_args()
+
+    if args.compile is not None:
+        sources = args.compile or [path for path in DEFAULT_SOURCES if os.path.exists(path)]
+        if not sources:
+            parser.error("nenhuma fonte encontrada (instale nmap ou ieee-data, ou informe os arquivos)")
+        t0 = time.perf_counter()
+        counts = compile_database(sources, args.output)
+        print(f"✅ {args.output}: {counts[24]} MA-L, {counts[28]} MA-M, {counts[36]} MA-S "
+              f"({os.path.getsize(args.output) / 1024:.0f} KB, {time.perf_counter() - t0:.2f} s)")
+        for source in sources:
+            print(f"   📄 {source}")
+
+    database = OuiDatabase(args.output)
+    for mac in args.macs:
+        print(f"   {mac}  {database.lookup(mac) or '(desconhecido)'}")
+    if args.bench and args.macs:
+        runs = 100000
+        t0 = time.perf_counter()
+        for i in range(runs):
+            database._cache.clear()
+            database.lookup(args.macs[i % len(args.macs)])
+        print(f"⏱️  {(time.perf_counter() - t0) / runs * 1e6:.2f} µs por consulta (sem cache)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,75 +2,150 @@
 """Módulo principal do painel de dispositivos de rede."""
 
 import time
-import subprocess
 import sys
 import os
 from typing import List, Optional
 
-# Adiciona o diretório pai ao path para importar touch_exit
+# Adiciona src/ ao path para importar o host de painéis
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from core.touch_exit import setup_touch_exit
+from core.panel_host import run_standalone
 
 # Imports locais - compatível com execução direta e como módulo
 try:
     from .config import *
-    from .models import DeviceInfo
-    from .framebuffer import (
-        find_framebuffer_by_name, 
-        get_framebuffer_geometry, 
-        write_image_to_framebuffer
-    )
+    from .models import DeviceInfo, NetworkScanResult
     from .network import NetworkDiscovery
-    from .ui import PanelUI
+    from .nmap_shards import ShardedNmapScan
+    from .scheduler import ScanScheduler
+    from .inventory import Inventory
+    from .snapshot import load_snapshot, save_snapshot
+    from .ui import PanelUI, format_age
 except ImportError:
     # Fallback para execução direta
     from config import *
-    from models import DeviceInfo
-    from framebuffer import (
-        find_framebuffer_by_name, 
-        get_framebuffer_geometry, 
-        write_image_to_framebuffer
-    )
+    from models import DeviceInfo, NetworkScanResult
     from network import NetworkDiscovery
-    from ui import PanelUI
+    from nmap_shards import ShardedNmapScan
+    from scheduler import ScanScheduler
+    from inventory import Inventory
+    from snapshot import load_snapshot, save_snapshot
+    from ui import PanelUI, format_age
+
+
+FRAME_DELAY = 0.2  # Segundos entre frames pedidos ao host
 
 
 class NetworkPanel:
-    """Controlador principal do painel de dispositivos de rede."""
+    """Controlador do painel de dispositivos de rede (plugin do core.panel_host)."""
     
     def __init__(self):
-        """Inicializa o painel."""
+        """Inicializa o painel (a tela é recebida em start())."""
         self.discovery = NetworkDiscovery(PREF_IFACES)
         self.devices: List[DeviceInfo] = []
-        self.scan_process: Optional[subprocess.Popen] = None
+        # Último resultado exibido (da varredura ou do snapshot em disco)
+        self.result: Optional[NetworkScanResult] = None
+        self.scan_interface = ""
+        self.scan_network = ""
+        # Processos nmap em fatias e dispositivos exibidos antes da varredura
+        self.nmap: Optional[ShardedNmapScan] = None
+        # Varredura de vivacidade (asyncio) e lote da varredura profunda
+        self.sweep: Optional["SweepStream"] = None
+        self.deep_targets: List[str] = []
+        self.scheduler = ScanScheduler()
+        self.sweep_offset = 0  # Próxima janela em redes maiores que SWEEP_MAX_HOSTS
+        self.scan_base: List[DeviceInfo] = []
+        # Histórico persistente (SQLite), gravado a cada varredura concluída
+        self.inventory = Inventory()
         
         # Estado da UI
         self.page = 0
         self.page_started = time.time()
-        self.last_scan_end = 0.0
+        self.last_persist = 0.0
         self.loading_start = time.time()
+        # Atraso médio dos frames: com a tela atrasada, só um nmap por vez
+        self.frame_lag = 0.0
+        self.last_step = 0.0
+        self.throttled = False
         
-        # Configuração do framebuffer
-        self._setup_framebuffer()
-        self.ui = PanelUI(self.width, self.height)
+        # Tela e UI (criadas no primeiro start)
+        self.display = None
+        self.ui: Optional[PanelUI] = None
     
-    def _setup_framebuffer(self) -> None:
-        """Configura o framebuffer."""
-        try:
-            self.fb_device, self.fb_index = find_framebuffer_by_name(FB_TARGET)
-            self.width, self.height, self.bpp, self.stride = get_framebuffer_geometry(self.fb_device)
-            
-            print(f"[fb] {self.fb_device}: {self.width}x{self.height} @{self.bpp}bpp stride={self.stride}")
-        except Exception as e:
-            raise RuntimeError(f"Erro ao configurar framebuffer: {e}")
+    def start(self, display) -> None:
+        """Assume a tela; a UI (fontes, GIF de carregamento) é criada uma vez."""
+        self.display = display
+        self.width, self.height = display.size
+        if self.ui is None:
+            self.ui = PanelUI(self.width, self.height)
+        if self.result is None:
+            self._load_snapshot()
+        self.last_step = 0.0  # O tempo fora do painel não conta como atraso
+        print(f"Display: {self.width}x{self.height}, Vivacidade: {LIVENESS_INTERVAL}s, "
+              f"profunda: {SCAN_INTERVAL}s")
+    
+    def _load_snapshot(self) -> None:
+        """Mostra de imediato a última varredura desta rede; a nova roda por trás."""
+        _, cidr = self.discovery.get_best_interface()
+        network = self.discovery.cidr_to_network(cidr) if cidr else None
+        result = load_snapshot(network=network)
+        if result:
+            self.result = result
+            self.devices = result.devices
+            self.scan_network = result.network
+            # Hosts do snapshot contam como já varridos a fundo naquele instante
+            self.scheduler.seed(result.devices, result.scan_time)
+            age = format_age(time.time() - result.scan_time)
+            print(f"♻️  Snapshot de {result.network} ({age}): {len(result.devices)} dispositivos")
+    
+    def step(self) -> float:
+        """Um ciclo do painel: varredura, progresso e renderização."""
+        self._measure_frame_lag()
+        
+        # Vivacidade quando vence o intervalo; varredura profunda depois dela
+        self._schedule_scans()
+        
+        # Atualiza progresso da varredura
+        self._update_scan_progress()
+        
+        # Renderiza tela
+        self._render_current_screen()
+        
+        # Pausa para animação suave e economia de CPU
+        return FRAME_DELAY
     
-    def _should_start_new_scan(self) -> bool:
-        """Verifica se deve iniciar uma nova varredura."""
-        return (self.scan_process is None and 
-                time.time() - self.last_scan_end >= SCAN_INTERVAL)
+    def stop(self) -> None:
+        """Interrompe a varredura em andamento ao sair do painel."""
+        if self.nmap:
+            self.nmap.stop()
+        self.nmap = None
+        self.deep_targets = []
+        if self.sweep:
+            self.sweep.stop()  # Senão a volta ao painel abriria outra ao lado dela
+        self.sweep = None
+        self.scan_base = []
+        self.display = None
     
-    def _start_network_scan(self) -> None:
-        """Inicia uma nova varredura de rede."""
+    def _measure_frame_lag(self) -> None:
+        """Média móvel de quanto cada frame passou do intervalo pedido."""
+        now = time.monotonic()
+        if self.last_step:
+            overrun = max(0.0, now - self.last_step - FRAME_DELAY)
+            self.frame_lag = 0.8 * self.frame_lag + 0.2 * overrun
+        self.last_step = now
+    
+    def _schedule_scans(self) -> None:
+        """Decide, com o agendador, qual fase começa agora (se alguma)."""
+        if self.sweep is not None:
+            return
+        if self.scheduler.liveness_due():
+            self._start_liveness_sweep()
+        elif USE_NMAP and self.nmap is None:
+            targets = self.scheduler.deep_targets()
+            if targets:
+                self._start_deep_scan(targets)
+    
+    def _start_liveness_sweep(self) -> None:
+        """Fase 1: varredura asyncio da rede, ou da próxima janela dela (sem root)."""
         interface, cidr = self.discovery.get_best_interface()
         if not interface or not cidr:
             return
@@ -78,46 +153,129 @@ class NetworkPanel:
         network = self.discovery.cidr_to_network(cidr)
         if not network:
             return
+        if network != self.scan_network:
+            if self.scan_network:
+                # Outra rede: o que se sabia (lista, idade, agendador) não vale mais
+                print(f"🔀 Rede mudou para {network}: lista e agendador reiniciados")
+                self.scheduler = ScanScheduler()
+                self.devices = []
+                self.result = None
+                self.page = 0
+                if self.nmap:
+                    self.nmap.stop()  # Lote da rede anterior
+                self.nmap = None
+                self.deep_targets = []
+            self.sweep_offset = 0
         
-        self.scan_process = self.discovery.start_nmap_scan(network)
-        if self.scan_process:
-            print(f"Iniciando varredura da rede {network} via {interface}")
-            self.loading_start = time.time()
+        # asyncio (e concurrent.futures) só quando a varredura começa
+        try:
+            from .sweep import SweepStream, host_count
+        except ImportError:
+            from sweep import SweepStream, host_count
+        total = host_count(network)
+        if self.sweep_offset >= total:
+            self.sweep_offset = 0
+        if total > SWEEP_MAX_HOSTS:
+            windows = -(-total // SWEEP_MAX_HOSTS)
+            print(f"🪟 {network}: janela {self.sweep_offset // SWEEP_MAX_HOSTS + 1}/{windows}")
+        self.sweep = SweepStream(network, offset=self.sweep_offset)
+        self.sweep_offset += SWEEP_MAX_HOSTS
+        self.scan_interface, self.scan_network = interface, network
+        self.scan_base = list(self.devices)
+        self.loading_start = time.time()
+    
+    def _start_deep_scan(self, targets: List[str]) -> None:
+        """Fase 2: nmap -sV só no lote do agendador, em fatias paralelas."""
+        self.scheduler.start_deep()
+        self.nmap = ShardedNmapScan(self.scan_network, targets, start=self.discovery.start_nmap_scan)
+        self._pump_nmap()
+        if not self.nmap.launched:
+            self.nmap = None  # nmap indisponível: o agendador tenta de novo no próximo intervalo
+            return
+        self.deep_targets = targets
+        self.scan_base = list(self.devices)
+    
+    def _scanning(self) -> bool:
+        """True enquanto o nmap ou a varredura rápida estão em andamento."""
+        if self.nmap is not None and not self.nmap.done:
+            return True
+        return self.sweep is not None and not self.sweep.done
     
     def _update_scan_progress(self) -> None:
         """Atualiza o progresso da varredura em andamento."""
-        if self.scan_process and self.scan_process.poll() is None:
-            # Varredura ainda em andamento - NÃO tenta ler stdout durante execução
-            # Isso permite que a UI continue responsiva
-            pass
-        elif self.scan_process:
-            # Varredura terminou, mas verifica tempo mínimo de exibição
-            elapsed_time = time.time() - self.loading_start
-            if elapsed_time < MIN_LOADING_TIME:
-                # Ainda não passou o tempo mínimo, continua mostrando GIF
-                return
-            
-            # Tempo mínimo passou, processa resultados
-            try:
-                # Lê toda a saída do processo
-                stdout, stderr = self.scan_process.communicate()
-                if stdout:
-                    text = stdout
-                else:
-                    text = ""
-            except Exception:
-                text = ""
-            
-            # Processa resultados
-            self.devices = self.discovery.parse_nmap_output(text)
-            
-            # Reset estado
-            self.last_scan_end = time.time()
-            self.scan_process = None
+        if self.nmap is not None:
+            self._pump_nmap()
+        
+        # A thread de cada fase lê a saída e cada host aparece assim que termina
+        self._merge_new_devices()
+        
+        # Sem dispositivos ainda: o GIF de carregamento fica o tempo mínimo
+        if not self.devices and time.time() - self.loading_start < MIN_LOADING_TIME:
+            return
+        if self.sweep is not None and self.sweep.done:
+            self._finish_liveness_sweep()
+        if self.nmap is not None and self.nmap.done:
+            self._finish_deep_scan()
+    
+    def _pump_nmap(self) -> None:
+        """Inicia as próximas fatias do nmap; uma por vez se a tela atrasa."""
+        throttled = self.frame_lag > NMAP_LAG_LIMIT
+        if throttled != self.throttled:
+            self.throttled = throttled
+            print(f"🐢 Frames atrasados ({self.frame_lag * 1000:.0f} ms): um nmap por vez" if throttled
+                  else f"🐇 Frames em dia: até {self.nmap.workers} nmap simultâneos")
+        self.nmap.pump(1 if throttled else None)
+    
+    def _finish_liveness_sweep(self) -> None:
+        """Registra quem está na rede (com a tabela ARP) e atualiza a lista."""
+        self.sweep.wait(timeout=2.0)
+        print(self.sweep.summary())
+        live = self.discovery.finalize_devices(self.sweep.devices, self.scan_network)
+        # Só os endereços desta janela contam falta; os demais esperam a vez deles
+        covered = set(self.sweep.hosts)
+        self.sweep = None
+        self.scheduler.observe(live, covered=covered.__contains__)
+        self._publish(live, "sweep")
+    
+    def _finish_deep_scan(self) -> None:
+        """Registra o resultado do nmap no agendador e atualiza a lista."""
+        print(self.nmap.summary())
+        deep = self.nmap.devices
+        self.scheduler.record_deep(self.deep_targets, deep)
+        self.nmap = None
+        self.deep_targets = []
+        self._publish(deep, "nmap")
+    
+    def _publish(self, found: List[DeviceInfo], source: str) -> None:
+        """
+        Exibe a lista do agendador. Snapshot e inventário: sempre após o
+        nmap; após a vivacidade, no máximo a cada SCAN_INTERVAL (evita
+        gravar no cartão SD a cada poucos segundos).
+        """
+        now = time.time()
+        self.devices = self.discovery._deduplicate_devices(self.scheduler.devices())
+        self.scan_base = list(self.devices)
+        first = self.result is None  # Primeira lista: começa da primeira página
+        self.result = NetworkScanResult(self.devices, now, self.scan_interface, self.scan_network)
+        if source == "nmap" or now - self.last_persist >= SCAN_INTERVAL:
+            save_snapshot(self.result)
+            self.inventory.record_scan(NetworkScanResult(found, now, self.scan_interface,
+                                                         self.scan_network), source)
+            self.last_persist = now
+        if first:
             self.page = 0
-            self.page_started = time.time()
-            
-            print(f"Varredura concluída: {len(self.devices)} dispositivos encontrados")
+            self.page_started = now
+        print(f"Varredura ({source}) concluída: {len(self.devices)} dispositivos; "
+              f"{self.scheduler.summary()}")
+    
+    def _merge_new_devices(self) -> None:
+        """Mescla os hosts já concluídos com a lista exibida (o novo vence)."""
+        sources = [source for source in (self.sweep, self.nmap) if source]
+        new = [device for source in sources for device in source.take_new()]
+        if not new:
+            return
+        fresh = [d for source in sources for d in source.devices if d.ip]
+        self.devices = self.discovery._deduplicate_devices(self.scan_base + fresh)
     
     def _render_current_screen(self) -> None:
         """Renderiza a tela atual."""
@@ -126,11 +284,15 @@ class NetworkPanel:
         
         # Verifica se deve mostrar tela de carregamento
         show_loading = False
+        scanning = self._scanning()
         
-        if self.scan_process and self.scan_process.poll() is None:
+        if self.result is not None or self.devices:
+            # Já há o que mostrar: a lista fica na tela durante a atualização
+            pass
+        elif scanning:
             # Processo ainda rodando
             show_loading = True
-        elif self.scan_process:
+        elif self.nmap or self.sweep:
             # Processo terminou, mas verifica tempo mínimo
             elapsed_time = time.time() - self.loading_start
             if elapsed_time < MIN_LOADING_TIME:
@@ -146,7 +308,14 @@ class NetworkPanel:
                 subtitle + "  (escaneando...)"
             )
         else:
-            # Tela de lista de dispositivos
+            # Tela de lista de dispositivos, marcada com a idade dos dados
+            status = ""
+            if self.result is not None:
+                status = format_age(time.time() - self.result.scan_time)
+                if scanning:
+                    status += " · atualizando..."
+            elif scanning:
+                status = "escaneando..."
             img, result = self.ui.create_device_list_screen(
                 TITLE,
                 interface or "N/A",
@@ -154,7 +323,8 @@ class NetworkPanel:
                 self.devices,
                 self.page,
                 PAGE_TIME,
-                self.page_started
+                self.page_started,
+                status
             )
             
             if isinstance(result, tuple):
@@ -167,59 +337,12 @@ class NetworkPanel:
             img = img.rotate(ROTATE_DEG, expand=False)
         
         # Escreve no framebuffer
-        write_image_to_framebuffer(self.fb_device, img, self.bpp, self.stride)
+        self.display.show_image(img)
     
     def run(self) -> None:
-        """Loop principal do painel."""
+        """Executa o painel; o toque volta ao menu no mesmo processo."""
         print(f"Iniciando painel de dispositivos de rede...")
-        print(f"Display: {self.width}x{self.height}, Intervalo: {SCAN_INTERVAL}s")
-        
-        # Configura detecção de toque para sair
-        touch_monitor = setup_touch_exit()
-        
-        try:
-            while True:
-                # Verifica se deve sair
-                if touch_monitor.should_exit():
-                    print("🔴 TOQUE DETECTADO - VOLTANDO AO MENU!")
-                    print("🚀 Executando menu principal...")
-                    
-                    # Para este script e executa o menu
-                    touch_monitor.stop()
-                    
-                    # Executa o menu principal
-                    import subprocess
-                    subprocess.run(["sudo", "python3", "/home/dw/painel/src/core/touch_menu_visual.py"])
-                    break
-                    
-                # Verifica se deve iniciar nova varredura
-                if self._should_start_new_scan():
-                    self._start_network_scan()
-                
-                # Atualiza progresso da varredura
-                self._update_scan_progress()
-                
-                # Renderiza tela
-                self._render_current_screen()
-                
-                # Pausa para animação suave e economia de CPU
-                time.sleep(0.2)
-                
-                # Verifica toque após cada ciclo
-                if touch_monitor.should_exit():
-                    print("🔴 TOQUE DETECTADO - VOLTANDO AO MENU!")
-                    print("🚀 Executando menu principal...")
-                    
-                    # Executa o menu principal
-                    import subprocess
-                    subprocess.run(["sudo", "python3", "/home/dw/painel/src/core/touch_menu_visual.py"])
-                    break
-                
-        except KeyboardInterrupt:
-            print("\\nEncerrando painel...")
-        except Exception as e:
-            print(f"Erro no painel: {e}")
-            raise
+        run_standalone("network", self)
 
 
 if __name__ == "__main__":
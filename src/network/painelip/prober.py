@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Verificação de portas TCP concorrente (asyncio), sem nmap.
+
+Milhares de conexões simultâneas limitadas por um semáforo global; por
+host, um limite de conexões simultâneas e um balde de fichas (taxa
+máxima de tentativas por segundo), para não inundar um dispositivo
+pequeno (câmeras costumam ter pilhas TCP frágeis). O prazo de cada
+tentativa se adapta ao RTT observado, como o RTO do TCP (RFC 6298):
+SRTT + 4 * RTTVAR, limitado a [PROBE_MIN_TIMEOUT, PROBE_TIMEOUT]; sem
+amostras do host, vale a estimativa global (ou unknown_timeout). Num
+host que já respondeu, porta sem resposta no prazo adaptativo é tentada
+de novo uma vez com o prazo máximo: o SYN-ACK de uma câmera Wi-Fi pode
+demorar bem mais que o RTT das outras portas.
+"""
+
+import time
+import errno
+import socket
+import struct
+import asyncio
+from typing import Callable, Dict, Iterable, List, Optional
+from models import DeviceInfo
+from network import mark_camera, mark_device_type
+from config import (CAMERA_PORTS, COMMON_PORTS, PROBE_CONCURRENCY, PROBE_MIN_TIMEOUT,
+                    PROBE_PER_HOST, PROBE_RATE, PROBE_TIMEOUT)
+
+# Erros de connect() que só um host existente produz
+ALIVE_ERRNOS = (errno.ECONNREFUSED, errno.ECONNRESET)
+LINGER_RESET = struct.pack("ii", 1, 0)  # close() com RST: sem TIME_WAIT
+PROBE_PORTS = sorted(set(CAMERA_PORTS) | set(COMMON_PORTS))
+
+OPEN, CLOSED, FILTERED = True, False, None
+
+
+async def tcp_probe(ip: str, port: int, timeout: float) -> Optional[bool]:
+    """
+    Uma tentativa de conexão TCP.
+
+    Returns:
+        OPEN (True) se a porta aceitou, CLOSED (False) se foi recusada
+        (host vivo), FILTERED (None) sem resposta no prazo
+    """
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET6 if ":" in ip else socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setblocking(False)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RESET)
+        await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+        return OPEN
+    except asyncio.TimeoutError:
+        return FILTERED
+    except OSError as e:
+        return CLOSED if e.errno in ALIVE_ERRNOS else FILTERED
+    finally:
+        sock.close()
+
+
+def service_name(port: int) -> str:
+    """Nome do serviço TCP (/etc/services), como o nmap sem -sV."""
+    try:
+        return socket.getservbyport(port, "tcp")
+    except OSError:
+        return "unknown"
+
+
+class RttEstimator:
+    """SRTT/RTTVAR como no TCP (RFC 6298)."""
+
+    __slots__ = ("srtt", "rttvar")
+
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = None
+
+    def sample(self, rtt: float) -> None:
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    def timeout(self) -> Optional[float]:
+        if self.srtt is None:
+            return None
+        return self.srtt + 4 * self.rttvar
+
+
+class _Host:
+    """Limites e RTT de um host."""
+
+    __slots__ = ("rtt", "slots", "tokens", "stamp")
+
+    def __init__(self, per_host: int, burst: float):
+        self.rtt = RttEstimator()
+        self.slots = asyncio.Semaphore(per_host)
+        self.tokens = burst
+        self.stamp = time.monotonic()
+
+
+class PortProber:
+    """Verifica portas de vários hosts ao mesmo tempo (ver docstring do módulo)."""
+
+    def __init__(self, concurrency: int = PROBE_CONCURRENCY, per_host: int = PROBE_PER_HOST,
+                 rate: float = PROBE_RATE, timeout: float = PROBE_TIMEOUT,
+                 min_timeout: float = PROBE_MIN_TIMEOUT, unknown_timeout: Optional[float] = None):
+        """
+        Args:
+            concurrency: Conexões simultâneas no total
+            per_host: Conexões simultâneas por host
+            rate: Tentativas por segundo por host (0 = sem limite)
+            timeout: Prazo inicial e máximo de cada tentativa (segundos)
+            min_timeout: Prazo mínimo, mesmo com RTT muito baixo
+            unknown_timeout: Prazo fixo para hosts ainda sem resposta
+                (None: o dobro da estimativa global)
+        """
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.max_timeout = timeout
+        self.min_timeout = min_timeout
+        self.unknown_timeout = unknown_timeout
+        self.rtt = RttEstimator()  # Todos os hosts: prazo de quem ainda não respondeu
+        self.counts = {OPEN: 0, CLOSED: 0, FILTERED: 0}
+        self.retries = 0  # Portas sem resposta tentadas de novo com o prazo máximo
+        self._first = None  # Início da primeira tentativa e fim da última
+        self._last = None
+        self._hosts: Dict[str, _Host] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _host(self, ip: str) -> _Host:
+        host = self._hosts.get(ip)
+        if host is None:
+            host = self._hosts[ip] = _Host(self.per_host, max(1.0, self.rate / 10))
+        return host
+
+    def timeout_for(self, ip: str) -> float:
+        """Prazo da próxima tentativa ao host."""
+        host = self._hosts.get(ip)
+        estimate = host.rtt.timeout() if host else None
+        if estimate is None:
+            if self.unknown_timeout is not None:
+                return self.unknown_timeout
+            estimate = self.rtt.timeout()
+            if estimate is not None:
+                estimate *= 2  # Host ainda sem resposta: mais folga
+        if estimate is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, estimate))
+
+    async def _take_token(self, host: _Host) -> None:
+        """Balde de fichas: espera até poder tentar de novo neste host."""
+        if self.rate <= 0:
+            return
+        burst = max(1.0, self.rate / 10)
+        while True:
+            now = time.monotonic()
+            host.tokens = min(burst, host.tokens + (now - host.stamp) * self.rate)
+            host.stamp = now
+            if host.tokens >= 1:
+                host.tokens -= 1
+                return
+            await asyncio.sleep((1 - host.tokens) / self.rate)
+
+    async def probe(self, ip: str, port: int) -> Optional[bool]:
+        """Uma porta, respeitando os limites; atualiza o RTT com a resposta."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        host = self._host(ip)
+        # Limites do host antes do global: quem espera a vez do host não
+        # ocupa uma das conexões globais
+        async with host.slots:
+            await self._take_token(host)
+            async with self._semaphore:
+                t0 = time.monotonic()
+                if self._first is None:
+                    self._first = t0
+                timeout = self.timeout_for(ip)
+                result = await tcp_probe(ip, port, timeout)
+                if result is FILTERED and host.rtt.srtt is not None and timeout < self.max_timeout:
+                    # Host vivo: o prazo adaptativo pode ter sido curto demais
+                    self.retries += 1
+                    t0 = time.monotonic()
+                    result = await tcp_probe(ip, port, self.max_timeout)
+                self._last = time.monotonic()
+                if result is not FILTERED:
+                    host.rtt.sample(self._last - t0)
+                    self.rtt.sample(self._last - t0)
+        self.counts[result] += 1
+        return result
+
+    async def probe_host(self, ip: str, ports: Iterable[int]) -> Dict[int, Optional[bool]]:
+        """Todas as portas de um host: {porta: OPEN | CLOSED | FILTERED}."""
+        ports = list(ports)
+        results = await asyncio.gather(*(self.probe(ip, port) for port in ports))
+        return dict(zip(ports, results))
+
+    async def scan(self, hosts: Iterable[str], ports: Iterable[int],
+                   on_host: Optional[Callable[[str, Dict[int, Optional[bool]]], None]] = None
+                   ) -> Dict[str, Dict[int, Optional[bool]]]:
+        """
+        Verifica as portas em todos os hosts.
+
+        Args:
+            on_host: Chamado com (ip, resultados) quando o host termina
+        """
+        ports = list(ports)
+        results: Dict[str, Dict[int, Optional[bool]]] = {}
+
+        async def one(ip):
+            results[ip] = await self.probe_host(ip, ports)
+            if on_host:
+                on_host(ip, results[ip])
+
+        await asyncio.gather(*(one(ip) for ip in hosts))
+        return results
+
+    @property
+    def elapsed(self) -> float:
+        """Segundos entre a primeira tentativa e o fim da última."""
+        return self._last - self._first if self._first is not None else 0.0
+
+    @property
+    def probes(self) -> int:
+        return sum(self.counts.values())
+
+    def summary(self) -> str:
+        rate = self.probes / self.elapsed if self.elapsed else 0.0
+        return (f"{self.probes} portas em {self.elapsed:.2f} s ({rate:.0f} portas/s): "
+                f"{self.counts[OPEN]} abertas, {self.counts[CLOSED]} fechadas, "
+                f"{self.counts[FILTERED]} sem resposta ({self.retries} tentadas de novo)")
+
+
+def apply_results(device: DeviceInfo, results: Dict[int, Optional[bool]]) -> None:
+    """Preenche open_ports e reclassifica o dispositivo (câmera, tipo)."""
+    for port, result in results.items():
+        if result is OPEN:
+            device.open_ports.setdefault(port, service_name(port))
+    mark_camera(device)
+    mark_device_type(device)
+
+
+async def probe_devices_async(devices: List[DeviceInfo], ports: Iterable[int] = PROBE_PORTS,
+                              prober: Optional[PortProber] = None) -> PortProber:
+    """Verifica as portas dos dispositivos e atualiza cada um."""
+    prober = prober or PortProber()
+    by_ip = {device.ip: device for device in devices if device.ip}
+    await prober.scan(by_ip, ports, on_host=lambda ip, results: apply_results(by_ip[ip], results))
+    return prober
+
+
+def probe_devices(devices: List[DeviceInfo], ports: Iterable[int] = PROBE_PORTS,
+                  **kwargs) -> PortProber:
+    """
+    Verificação rápida de câmeras/serviços (sem nmap -sV): preenche
+    open_ports e is_camera dos dispositivos.
+
+    Returns:
+        O PortProber usado (contagens e summary())
+    """
+    return asyncio.run(probe_devices_async(devices, ports, PortProber(**kwargs)))
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Agendador de varreduras em duas fases.
+
+1. Vivacidade (barata, frequente): a varredura asyncio (sweep.py) a cada
+   LIVENESS_INTERVAL segundos diz quem está na rede, com MAC e portas.
+2. Profunda (cara, rara): nmap -sV só num lote de hosts (DEEP_BATCH),
+   no máximo a cada SCAN_INTERVAL segundos. Entram primeiro os hosts
+   novos, depois os cuja impressão (MAC + portas abertas) mudou desde a
+   última varredura profunda, e por fim os com dados mais velhos que
+   DEEP_MAX_AGE. Host sem mudança e com dados recentes não é varrido.
+
+Em regime, a rede só vê o sweep (algumas conexões por endereço) e o nmap
+roda para poucos hosts, ou nenhum, em vez da sub-rede inteira com -sV.
+"""
+
+import copy
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from models import DeviceInfo
+from config import (CAMERA_PORTS, COMMON_PORTS, DEEP_BATCH, DEEP_MAX_AGE, ENABLE_FULL_SCAN,
+                    LIVENESS_INTERVAL, SCAN_INTERVAL)
+
+# Portas que as duas fases testam: base da impressão do host
+FINGERPRINT_PORTS = frozenset(COMMON_PORTS if ENABLE_FULL_SCAN else CAMERA_PORTS)
+LIVENESS_GRACE = 3  # Varreduras que cobriram o host sem resposta até ele sair da lista
+
+Fingerprint = Tuple[str, FrozenSet[int]]
+
+
+def fingerprint(device: DeviceInfo) -> Fingerprint:
+    """Impressão comparável entre as fases: MAC e portas abertas em comum."""
+    return device.mac, frozenset(FINGERPRINT_PORTS.intersection(device.open_ports))
+
+
+class HostRecord:
+    """O que se sabe de um host nas duas fases."""
+
+    __slots__ = ("live", "deep", "last_seen", "misses", "deep_at", "deep_fingerprint")
+
+    def __init__(self):
+        self.live: Optional[DeviceInfo] = None  # Última varredura de vivacidade
+        self.deep: Optional[DeviceInfo] = None  # Última varredura profunda
+        self.last_seen = 0.0
+        self.misses = 0  # Varreduras seguidas que cobriram o host sem vê-lo
+        self.deep_at = 0.0
+        self.deep_fingerprint: Optional[Fingerprint] = None
+
+
+class ScanScheduler:
+    """Decide quando varrer e quais hosts merecem a varredura profunda."""
+
+    def __init__(self, liveness_interval: float = LIVENESS_INTERVAL,
+                 deep_interval: float = SCAN_INTERVAL, deep_batch: int = DEEP_BATCH,
+                 deep_max_age: float = DEEP_MAX_AGE):
+        self.liveness_interval = liveness_interval
+        self.deep_interval = deep_interval
+        self.deep_batch = deep_batch
+        self.deep_max_age = deep_max_age
+        self.hosts: Dict[str, HostRecord] = {}
+        self.last_liveness = 0.0
+        self.last_deep = 0.0
+        self._settled = -1.0  # Vivacidade já avaliada sem nada a aprofundar
+        self.skipped = 0  # Hosts poupados da varredura profunda (estatística)
+
+    def _record(self, ip: str) -> HostRecord:
+        record = self.hosts.get(ip)
+        if record is None:
+            record = self.hosts[ip] = HostRecord()
+        return record
+
+    def seed(self, devices: Iterable[DeviceInfo], scan_time: float) -> None:
+        """
+        Início a quente: hosts do snapshot com varredura profunda registrada
+        (deep_scan_time) contam como varridos naquela hora. Os que só a
+        vivacidade viu ficam de fora e voltam como novos na primeira varredura.
+        """
+        for device in devices:
+            if not device.deep_scan_time:
+                continue
+            record = self._record(device.ip)
+            record.deep = device
+            record.deep_at = device.deep_scan_time
+            record.deep_fingerprint = fingerprint(device)
+            record.last_seen = scan_time
+
+    def liveness_due(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return now - self.last_liveness >= self.liveness_interval
+
+    def observe(self, devices: Iterable[DeviceInfo], now: Optional[float] = None,
+                covered: Optional[Callable[[str], bool]] = None) -> None:
+        """
+        Registra o resultado de uma varredura de vivacidade.
+
+        Args:
+            covered: covered(ip) diz se o endereço estava na janela varrida
+                (None: a rede inteira); só esses contam falta se não aparecem
+        """
+        now = time.time() if now is None else now
+        self.last_liveness = now
+        seen = set()
+        for device in devices:
+            record = self._record(device.ip)
+            record.live = device
+            record.last_seen = now
+            record.misses = 0
+            seen.add(device.ip)
+        for ip, record in self.hosts.items():
+            if ip not in seen and (covered is None or covered(ip)):
+                record.misses += 1
+
+    def deep_targets(self, now: Optional[float] = None) -> List[str]:
+        """
+        Hosts para a próxima varredura profunda (vazio se não é hora).
+
+        Returns:
+            Até deep_batch IPs: novos, depois alterados, depois vencidos
+        """
+        now = time.time() if now is None else now
+        if now - self.last_deep < self.deep_interval or self.last_liveness <= self._settled:
+            return []
+        new, changed, stale = [], [], []
+        unchanged = 0
+        for ip, record in self.hosts.items():
+            if record.live is None or record.misses:
+                continue  # Ausente na última vivacidade que o cobriu: nada a aprofundar
+            if record.deep is None:
+                new.append(ip)
+            elif fingerprint(record.live) != record.deep_fingerprint:
+                changed.append(ip)
+            elif now - record.deep_at >= self.deep_max_age:
+                stale.append((record.deep_at, ip))
+            else:
+                unchanged += 1
+        stale = [ip for _, ip in sorted(stale)]  # Mais velhos primeiro
+        targets = (new + changed + stale)[:self.deep_batch]
+        self.skipped += unchanged
+        if not targets:
+            # Nada muda até a próxima vivacidade: não reavalia a cada frame
+            self._settled = self.last_liveness
+        else:
+            print(f"🔬 Varredura profunda: {len(targets)} hosts ({len(new)} novos, "
+                  f"{len(changed)} alterados, {len(stale)} vencidos; {unchanged} sem mudança)")
+        return targets
+
+    def start_deep(self, now: Optional[float] = None) -> None:
+        """Marca o início de uma varredura profunda (conta o intervalo)."""
+        self.last_deep = time.time() if now is None else now
+
+    def record_deep(self, targets: Iterable[str], devices: Iterable[DeviceInfo],
+                    now: Optional[float] = None) -> None:
+        """
+        Registra o resultado do nmap. Alvos que não responderam também
+        ficam registrados, para não voltarem ao topo da fila em seguida.
+        """
+        now = time.time() if now is None else now
+        found = {device.ip: device for device in devices if device.ip}
+        for ip in set(targets) | set(found):
+            record = self._record(ip)
+            device = found.get(ip)
+            if device is not None:
+                record.deep = device
+                record.last_seen = now
+                record.misses = 0
+            elif record.deep is None:
+                record.deep = DeviceInfo(ip=ip)
+            record.deep_at = record.deep.deep_scan_time = now
+            # Comparada com a vivacidade seguinte: a impressão de referência é a dela
+            record.deep_fingerprint = fingerprint(record.live or record.deep)
+
+    def devices(self) -> List[DeviceInfo]:
+        """
+        Lista para exibição: a vivacidade mais recente completada com o
+        que só a varredura profunda sabe (serviços, versões, OS, nome).
+        Hosts ausentes em LIVENESS_GRACE varreduras seguidas saem da lista.
+        """
+        merged = []
+        for ip, record in self.hosts.items():
+            if record.misses >= LIVENESS_GRACE:
+                continue
+            if record.live is None:
+                merged.append(record.deep)
+                continue
+            device = copy.deepcopy(record.live)
+            deep = record.deep
+            if deep is not None:
+                for port in device.open_ports:
+                    if port in deep.open_ports:
+                        device.open_ports[port] = deep.open_ports[port]
+                    if port in deep.versions:
+                        device.versions[port] = deep.versions[port]
+                device.os = device.os or deep.os
+                device.hostname = device.hostname or deep.hostname
+                device.vendor = device.vendor or deep.vendor
+                device.mac = device.mac or deep.mac
+                device.is_camera = device.is_camera or deep.is_camera
+                device.deep_scan_time = deep.deep_scan_time
+            merged.append(device)
+        return merged
+
+    def summary(self) -> str:
+        deep = sum(1 for record in self.hosts.values() if record.deep is not None)
+        return (f"{len(self.hosts)} hosts conhecidos, {deep} com varredura profunda, "
+                f"{self.skipped} varreduras profundas poupadas")
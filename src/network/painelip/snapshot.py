@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Snapshot da última varredura: o painel abre mostrando a rede já conhecida."""
+
+import os
+import json
+import time
+from typing import Optional
+from models import NetworkScanResult
+from config import SCAN_CACHE_FILE, SCAN_CACHE_MAX_AGE
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(result: NetworkScanResult, path: str = SCAN_CACHE_FILE) -> bool:
+    """
+    Grava o resultado em JSON compacto (escrita atômica, permissão 600).
+
+    Returns:
+        True se o arquivo foi gravado
+    """
+    tmp = f"{path}.tmp"
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"v": SNAPSHOT_VERSION, **result.to_dict()}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return True
+    except OSError as e:
+        print(f"⚠️  Snapshot da varredura não gravado: {e}")
+        return False
+
+
+def load_snapshot(path: str = SCAN_CACHE_FILE, network: Optional[str] = None,
+                  max_age: float = SCAN_CACHE_MAX_AGE) -> Optional[NetworkScanResult]:
+    """
+    Lê o último resultado gravado.
+
+    Args:
+        network: Se informada, só aceita o snapshot da mesma rede
+        max_age: Idade máxima em segundos
+
+    Returns:
+        NetworkScanResult ou None (ausente, antigo, de outra rede ou inválido)
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("v") != SNAPSHOT_VERSION:
+            return None
+        result = NetworkScanResult.from_dict(data)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"⚠️  Snapshot da varredura inválido: {e}")
+        return None
+    if time.time() - result.scan_time > max_age:
+        return None
+    if network and result.network != network:
+        return None
+    return result
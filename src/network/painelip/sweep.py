@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Descoberta de hosts sem nmap: varredura asyncio da rede.
+
+Conexões TCP não bloqueantes (prober.PortProber: concorrentes, com
+limites e prazo adaptativo) a poucas portas de cada endereço e, se o
+sistema permitir, ping por socket ICMP de datagrama (sem root:
+net.ipv4.ping_group_range). Porta
+aberta ou recusada (RST) prova que o host existe; a tabela ARP, que as
+próprias tentativas preenchem, completa o resultado com os MACs. Nos
+hosts vivos, as portas de câmera e comuns são verificadas em seguida.
+Uma /24 termina em poucos segundos, sem root. Redes com mais de
+SWEEP_MAX_HOSTS endereços são varridas em janelas: cada varredura cobre
+uma janela e a seguinte continua de onde ela parou.
+"""
+
+import sys
+import time
+import socket
+import struct
+import asyncio
+import itertools
+import ipaddress
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from models import DeviceInfo
+from neighbors import RESOLVER, neighbors_in, read_arp_table
+from network import fill_vendor
+from prober import PROBE_PORTS, PortProber, apply_results
+from config import SWEEP_CONCURRENCY, SWEEP_MAX_HOSTS, SWEEP_PORTS, SWEEP_TIMEOUT
+
+ICMP_ECHO_REQUEST = 8
+CANCEL_CHECK = 0.1  # Intervalo (s) em que a thread da varredura verifica o cancelamento
+ICMP_ECHO_REPLY = 0
+
+
+def host_count(network: str) -> int:
+    """Número de endereços de host da rede (os mesmos de hosts())."""
+    net = ipaddress.ip_network(network, strict=False)
+    if net.num_addresses <= 2:
+        return net.num_addresses
+    return net.num_addresses - 1 if net.version == 6 else net.num_addresses - 2
+
+
+def hosts_in(network: str, max_hosts: int = SWEEP_MAX_HOSTS, offset: int = 0) -> List[str]:
+    """Janela de endereços de host da rede CIDR: até max_hosts a partir do offset."""
+    net = ipaddress.ip_network(network, strict=False)
+    return [str(ip) for ip in itertools.islice(net.hosts(), offset, offset + max_hosts)]
+
+
+def _icmp_socket() -> Optional[socket.socket]:
+    """Socket ICMP de datagrama, ou None se o sistema não permite."""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    except OSError:
+        return None
+    sock.setblocking(False)
+    return sock
+
+
+async def icmp_sweep(hosts: Iterable[str], timeout: float,
+                     on_reply: Callable[[str], None]) -> bool:
+    """
+    Envia um echo request a cada host IPv4 e chama on_reply(ip) a cada
+    resposta até `timeout` segundos após o último envio.
+
+    Returns:
+        False se sockets ICMP de datagrama não estão disponíveis
+    """
+    sock = _icmp_socket()
+    if sock is None:
+        return False
+    loop = asyncio.get_running_loop()
+
+    def readable():
+        while True:
+            try:
+                data, (ip, _) = sock.recvfrom(1024)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                continue  # Erro ICMP enfileirado (ex.: host inalcançável)
+            if data[:1] == bytes([ICMP_ECHO_REPLY]):
+                on_reply(ip)
+
+    loop.add_reader(sock.fileno(), readable)
+    try:
+        for seq, ip in enumerate(hosts):
+            if ":" in ip:
+                continue
+            # O kernel preenche identificador e checksum (socket "ping")
+            packet = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, 0, seq & 0xFFFF)
+            while True:
+                try:
+                    sock.sendto(packet, (ip, 0))
+                    break
+                except (BlockingIOError, InterruptedError):
+                    await asyncio.sleep(0.001)
+                except OSError:
+                    break  # Sem rota para o host
+            if seq % 64 == 63:
+                await asyncio.sleep(0)  # Deixa as respostas serem lidas
+        await asyncio.sleep(timeout)
+    finally:
+        loop.remove_reader(sock.fileno())
+        sock.close()
+    return True
+
+
+async def sweep(targets: Iterable[str], ports: Iterable[int] = SWEEP_PORTS,
+                concurrency: int = SWEEP_CONCURRENCY, timeout: float = SWEEP_TIMEOUT,
+                icmp: bool = True, network: Optional[str] = None,
+                check_ports: Iterable[int] = PROBE_PORTS,
+                on_device: Optional[Callable[[DeviceInfo], None]] = None) -> List[DeviceInfo]:
+    """
+    Varre os hosts e devolve os que responderam.
+
+    Args:
+        targets: IPs a varrer (hosts_in(rede) para uma rede inteira)
+        ports: Portas TCP testadas em cada host
+        concurrency: Conexões simultâneas no máximo
+        timeout: Prazo das conexões a hosts ainda mudos e das respostas
+            ICMP (segundos); nos vivos, o prazo segue o RTT
+        icmp: Tenta também ping por socket ICMP de datagrama
+        network: Rede CIDR cujos vizinhos ARP entram no resultado
+        check_ports: Portas verificadas depois nos hosts vivos
+            (câmeras e serviços comuns)
+        on_device: Chamado com cada host assim que todas as suas portas
+            foram testadas (os vistos só por ICMP/ARP vêm no fim)
+
+    Returns:
+        Dispositivos encontrados, ordenados por IP
+    """
+    hosts = list(targets)
+    ports = list(ports)
+    extra = [port for port in check_ports if port not in ports]
+    # Endereço sem resposta ainda pode ser um host lento: prazo cheio
+    prober = PortProber(concurrency=concurrency, timeout=timeout, unknown_timeout=timeout)
+    devices: Dict[str, DeviceInfo] = {}
+    pinged: Set[str] = set()
+
+    async def probe_host(ip):
+        results = await prober.probe_host(ip, ports)
+        if all(result is None for result in results.values()):
+            return
+        # Vivo: o prazo já se ajustou ao RTT dele para as demais portas
+        if extra:
+            results.update(await prober.probe_host(ip, extra))
+        device = DeviceInfo(ip=ip)
+        apply_results(device, results)
+        devices[ip] = device
+        if on_device:
+            on_device(device)
+
+    tasks = [probe_host(ip) for ip in hosts]
+    if icmp:
+        tasks.append(icmp_sweep(hosts, timeout, pinged.add))
+    await asyncio.gather(*tasks)
+    print(f"🔌 {prober.summary()}")
+
+    # Respondeu só ao ping, ou só está na tabela ARP (firewall em tudo);
+    # pinged só é lido depois do gather: as portas desses hosts ficam
+    # para o nmap
+    late = []
+    table = read_arp_table()
+    arp_ips = neighbors_in(table, network) if network else []
+    for ip in sorted(pinged) + arp_ips:
+        if ip not in devices:
+            device = DeviceInfo(ip=ip, device_type="Network Device" if ip in pinged else "ARP Host")
+            devices[ip] = device
+            late.append(device)
+    for ip, device in devices.items():
+        if ip in table:
+            device.mac = table[ip].mac
+            fill_vendor(device)
+    names = RESOLVER.resolve_many(list(devices))
+    for ip, name in names.items():
+        devices[ip].hostname = name
+    if on_device:
+        for device in late:
+            on_device(device)
+
+    found = [devices[ip] for ip in sorted(devices, key=ipaddress.ip_address)]
+    return found
+
+
+def run_sweep(network: str, **kwargs) -> List[DeviceInfo]:
+    """Varredura síncrona da rede inteira (asyncio.run)."""
+    if host_count(network) > SWEEP_MAX_HOSTS:
+        print(f"⚠️  {network}: varrendo só os primeiros {SWEEP_MAX_HOSTS} endereços")
+    return asyncio.run(sweep(hosts_in(network), network=network, **kwargs))
+
+
+class SweepStream:
+    """
+    Roda sweep() numa thread, com a mesma interface do NmapStream
+    (devices, take_new, done, wait, summary), para o painel mostrar os
+    hosts enquanto a varredura anda. stop() cancela a varredura: as
+    conexões pendentes são fechadas em até CANCEL_CHECK segundos.
+    """
+
+    def __init__(self, network: str, offset: int = 0, **kwargs):
+        """
+        Args:
+            network: Rede CIDR
+            offset: Primeiro endereço da janela (redes maiores que SWEEP_MAX_HOSTS)
+        """
+        self.network = network
+        self.hosts = hosts_in(network, offset=offset)  # Endereços cobertos por esta varredura
+        self.devices: List[DeviceInfo] = []
+        self.started = time.monotonic()
+        self.first_device_after: Optional[float] = None
+        self.error: Optional[Exception] = None
+        self._kwargs = kwargs
+        self._taken = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sweep", daemon=True)
+        self._thread.start()
+
+    def _add(self, device: DeviceInfo) -> None:
+        with self._lock:
+            if self.first_device_after is None:
+                self.first_device_after = time.monotonic() - self.started
+            self.devices.append(device)
+
+    async def _sweep(self) -> None:
+        task = asyncio.ensure_future(sweep(self.hosts, network=self.network,
+                                           on_device=self._add, **self._kwargs))
+        while not task.done():
+            if self._cancel.is_set():
+                task.cancel()
+                break
+            await asyncio.wait({task}, timeout=CANCEL_CHECK)
+        try:
+            await task
+        except asyncio.CancelledError:
+            print(f"🛑 Varredura rápida de {self.network} cancelada")
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._sweep())
+        except (OSError, ValueError) as e:
+            self.error = e
+            print(f"⚠️  Varredura rápida falhou: {e}")
+        finally:
+            self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def take_new(self) -> List[DeviceInfo]:
+        """Hosts concluídos desde a última chamada."""
+        with self._lock:
+            new = self.devices[self._taken:]
+            self._taken = len(self.devices)
+        return new
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def stop(self) -> None:
+        """Cancela a varredura (sem esperar a thread terminar)."""
+        self._cancel.set()
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        first = f"{self.first_device_after:.1f} s" if self.first_device_after is not None else "-"
+        return f"{len(self.devices)} hosts da varredura rápida, primeiro em {first}, total {elapsed:.1f} s"
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Varredura rápida (asyncio) de uma rede")
+    parser.add_argument("network", help="Rede CIDR, ex.: 192.168.1.0/24")
+    parser.add_argument("--ports", default=",".join(map(str, SWEEP_PORTS)))
+    parser.add_argument("--concurrency", type=int, default=SWEEP_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=SWEEP_TIMEOUT)
+    parser.add_argument("--no-icmp", action="store_true", help="Só conexões TCP")
+    args = parser.parse_args()
+
+    ports = [int(port) for port in args.ports.split(",") if port]
+    t0 = time.perf_counter()
+    devices = run_sweep(args.network, ports=ports, concurrency=args.concurrency,
+                        timeout=args.timeout, icmp=not args.no_icmp)
+    elapsed = time.perf_counter() - t0
+    for device in devices:
+        ports_text = ",".join(map(str, sorted(device.open_ports))) or "-"
+        print(f"   {device.ip:<16} {device.mac or '-':<18} {device.device_type:<15} {ports_text}  {device.hostname}")
+    print(f"⏱️  {len(devices)} hosts em {elapsed:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
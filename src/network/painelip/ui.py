@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
 """Interface gráfica para o painel de dispositivos."""
 
+import os
+import sys
 import time
 import math
 from datetime import datetime
 from typing import List, Tuple, Union
-from PIL import Image, ImageDraw, ImageFont, ImageSequence
+from PIL import Image, ImageDraw, ImageFont
 from models import DeviceInfo
 from config import *
 
+# Adiciona src/ ao path para importar core.animation
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from core.animation import IndexedFrame, index_frames
+from core.assets import load_frames
+
 
 class PanelUI:
     """Gerenciador da interface do painel."""
@@ -24,7 +31,7 @@ class PanelUI:
         self.width = width
         self.height = height
         self._load_fonts()
-        self.loading_gif_frames: List[Image.Image] = []
+        self.loading_gif_frames: List[IndexedFrame] = []
         self.loading_gif_durations: List[int] = []
     
     def _load_fonts(self) -> None:
@@ -69,13 +76,26 @@ class PanelUI:
         return img
 
     def _load_loading_gif(self) -> None:
+        """Carrega o GIF de carregamento já redimensionado e paletizado."""
         if self.loading_gif_frames:
             return
+        compiled = load_frames(LOADING_GIF_PATH, (self.width, self.height), fit="thumbnail")
+        if compiled:
+            frames, durations = compiled
+            self.loading_gif_frames = frames
+            self.loading_gif_durations = [int(round(d * 1000)) for d in durations]
+            return
         try:
+            from PIL import ImageSequence
+            frames = []
             with Image.open(LOADING_GIF_PATH) as im:
                 for frame in ImageSequence.Iterator(im):
-                    self.loading_gif_frames.append(frame.convert("RGB"))
+                    rgb = frame.convert("RGB")
+                    rgb.thumbnail((self.width, self.height))
+                    frames.append(rgb)
                     self.loading_gif_durations.append(frame.info.get("duration", 100))
+            # Índices uint8 + LUT RGB565 por frame: 1/3 da memória do RGB
+            self.loading_gif_frames = index_frames(frames)
         except Exception as e:
             print(f"❌ Erro carregando GIF: {e}")
             self.loading_gif_frames = []
@@ -98,8 +118,7 @@ class PanelUI:
             if elapsed_ms < cumulative:
                 frame_index = i
                 break
-        frame = self.loading_gif_frames[frame_index].copy()
-        frame.thumbnail((self.width, self.height))
+        frame = self.loading_gif_frames[frame_index].to_image()
         x = (self.width - frame.width) // 2
         y = (self.height - frame.height) // 2
 
@@ -141,7 +160,8 @@ class PanelUI:
         devices: List[DeviceInfo], 
         page: int, 
         page_time: float, 
-        page_started: float
+        page_started: float,
+        status: str = ""
     ) -> Tuple[Image.Image, Union[int, Tuple[int, float]]]:
         """
         Cria uma tela com lista paginada de dispositivos.
@@ -154,6 +174,7 @@ class PanelUI:
             page: Página atual
             page_time: Tempo por página
             page_started: Timestamp do início da página
+            status: Texto no canto superior direito (idade dos dados, atualização)
             
         Returns:
             Nova página ou tupla (página, timestamp)
@@ -162,12 +183,13 @@ class PanelUI:
         draw = ImageDraw.Draw(img)
         
         # Cabeçalho
-        self._draw_header(draw, title, interface, ip_display, len(devices))
+        self._draw_header(draw, title, interface, ip_display, len(devices), status)
         
         # Lista de dispositivos
         if devices:
             devices_per_page = self._calculate_devices_per_page()
             total_pages = math.ceil(len(devices) / devices_per_page)
+            page %= total_pages  # A lista pode ter encolhido desde a última página
             
             # Controle de paginação
             current_time = time.time()
@@ -205,12 +227,18 @@ class PanelUI:
         title: str, 
         interface: str, 
         ip_display: str, 
-        device_count: int
+        device_count: int,
+        status: str = ""
     ) -> None:
         """Desenha o cabeçalho da tela."""
         # Título principal
         draw.text((10, 8), title, fill=COLOR_TITLE, font=self.font_title)
         
+        # Status (ex.: "há 3 min · atualizando...") alinhado à direita
+        if status:
+            x = self.width - 10 - draw.textlength(status, font=self.font_small)
+            draw.text((x, 14), status, fill=COLOR_INFO, font=self.font_small)
+        
         # Informações da rede
         info_text = f"{interface}: {ip_display} ({device_count} dispositivos)"
         draw.text((10, 40), info_text, fill=COLOR_INFO, font=self.font_text)
@@ -356,3 +384,16 @@ class PanelUI:
         y_pos = self.height // 2
         
         draw.text((x_pos, y_pos), message, fill=COLOR_TEXT, font=self.font_text)
+
+
+def format_age(seconds: float) -> str:
+    """Idade legível de um dado: "agora", "há 40 s", "há 3 min", "há 2 h", "há 1 d"."""
+    if seconds < 5:
+        return "agora"
+    if seconds < 60:
+        return f"há {int(seconds)} s"
+    if seconds < 3600:
+        return f"há {int(seconds // 60)} min"
+    if seconds < 86400:
+        return f"há {int(seconds // 3600)} h"
+    return f"há {int(seconds // 86400)} d"